@@ -10,5 +10,8 @@ __author__ = 'Jose Guzman and Claudia Espinoza'
 __license__ = 'GPL-2.0'
 
 # directories to load when from inet import *
-__all__ = ['utils', 'loader', 'math', 'patterns', 'motifs', 'plots'] 
+__all__ = ['utils', 'loader', 'math', 'patterns', 'motifs', 'plots',
+    'bitplanes', 'exact', 'simulations', 'store', 'engine', 'fitting',
+    'resampling', 'permutation', 'ergm', 'tissue', 'cache', 'bayesian',
+    'crossval'] 
 
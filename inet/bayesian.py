@@ -0,0 +1,557 @@
+"""
+bayesian.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:46:07 UTC 2026
+
+Approximate Bayesian computation (ABC) to compare connectivity models
+between interneurons and estimate their parameters. The parameters of
+every model are drawn from their priors, a dataset is simulated with
+them, and the parameters are kept if the summary statistics of the
+simulated dataset are close to the ones of the DataLoader:
+
+- the motifs found (see IIMotifCounter.motiflist), and
+- the probability of chemical and electrical synapses in every bin of
+  intersomatic distances (see BINS in inet.permutation).
+
+Only recordings with distances are used, so that all models are
+compared on the same data. The models are:
+
+uniform     : constant probabilities PC and PE (see IIUniformModel).
+sigmoid     : sigmoid functions (A, C, r) of the distance of chemical
+              and electrical synapses (see IISigmoidModel).
+conditional : probabilities of chemical synapses between coupled and
+              uncoupled cells, PC1 and PC0, and of electrical
+              synapses, PE (see IIConditionalModel).
+
+Datasets are simulated in batches of parameters at once, in parallel
+processes. The posterior probability of every model is the fraction
+of (weighted) parameters accepted with the model.
+
+Two algorithms are available: rejection, which keeps the simulations
+closest to the data, and sequential Monte Carlo (SMC; Toni et al.,
+2009), which perturbs the parameters accepted with a decreasing
+tolerance.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.bayesian import ABC
+>>> mydataset = DataLoader('../data/PV')
+>>> myabc = ABC(mydataset)
+>>> mypost = myabc.smc(n_particles = 1000, seed = 0, n_jobs = 4)
+>>> mypost['P'] # posterior probability of every model
+"""
+
+from __future__ import division
+
+import numpy as np
+from multiprocessing import Pool
+
+from inet.utils import II_slice
+from inet.bitplanes import decode
+from inet.fitting import BOUNDS
+from inet.permutation import BINS
+from inet.simulations import IIModel, sigmoid, _threshold, _count
+from inet.simulations import _conditional_threshold
+
+MODELS = ('uniform', 'sigmoid', 'conditional')
+
+# names and bounds of the uniform priors of the parameters
+PRIORS = {
+    'uniform': (('PC', (0., 1.)), ('PE', (0., 1.))),
+    'sigmoid': tuple(zip(('chem_A', 'chem_C', 'chem_r'), BOUNDS)) +
+        tuple(zip(('elec_A', 'elec_C', 'elec_r'), BOUNDS)),
+    'conditional': (('PC1', (0., 1.)), ('PC0', (0., 1.)), ('PE', (0., 1.))),
+    }
+
+def _planes(model, theta, dist, R):
+    """
+    returns the chemical and electrical planes of a batch of datasets.
+
+    Arguments
+    ---------
+    model : str
+        one of MODELS.
+    theta : 2D NumPy array
+        the parameters of every dataset (datasets, parameters).
+    dist : 3D NumPy array
+        the distances of the recordings (recordings, n, n).
+    R : NumPy array
+        uniform random numbers (datasets, recordings, 2, n, n).
+    """
+    p = [theta[:, i].reshape(-1, 1, 1, 1) for i in range(theta.shape[1])]
+
+    # the samplers of the null models (see inet.simulations)
+    if model == 'uniform':
+        return( _threshold(R, p[0], p[1]) )
+
+    if model == 'sigmoid':
+        return( _threshold(R, sigmoid(dist, *p[:3])/100.,
+            sigmoid(dist, *p[3:])/100.) )
+
+    return( _conditional_threshold(R, *p[:3]) )
+
+def _summaries(chem, elec, data):
+    """
+    returns the summary statistics of a batch of datasets, given their
+    planes by number of cells (chem[n] and elec[n] of shape (datasets,
+    recordings, n, n)).
+    """
+    K = len(chem[min(chem)])
+    motifs = np.zeros((K, len(IIModel.motiflist)))
+    found = np.zeros((K, 2, len(data['tested'][0])))
+
+    for n in chem:
+        nRecord = chem[n].shape[1]
+        mycount = _count(chem[n].reshape(-1, n, n), elec[n].reshape(-1, n, n))
+        motifs += mycount.reshape(K, nRecord, -1).sum(1)
+
+        C, E = data['bins'][n] # (bins, recordings, n, n)
+        found[:, 0] += np.tensordot(chem[n], C, axes=([1, 2, 3], [1, 2, 3]))
+        found[:, 1] += np.tensordot(elec[n], E, axes=([1, 2, 3], [1, 2, 3]))
+
+    prob = found/data['tested']
+    keep = data['tested'] > 0 # bins without pairs tested are not used
+
+    return( np.column_stack((motifs, prob[:, keep])) )
+
+#-------------------------------------------------------------------------
+# Simulations: every batch of parameters is simulated with its own random
+# number generator, so that the result does not depend on the number of
+# processes.
+#-------------------------------------------------------------------------
+
+_worker_data = None # distances and bins of the recordings in every process
+
+def _init_worker(data):
+    """
+    stores the recordings to simulate in a process of the pool
+    """
+    global _worker_data
+    _worker_data = data
+
+def _simulate_batch(args):
+    """
+    simulates the summary statistics of a batch of parameters
+    """
+    model, theta, key = args
+    data = _worker_data
+
+    rng = np.random.RandomState(list(key))
+    chem, elec = dict(), dict()
+    for n in sorted(data['dist']):
+        dist = data['dist'][n]
+        R = rng.random_sample((len(theta), len(dist), 2, n, n))
+        chem[n], elec[n] = _planes(model, theta, dist, R)
+
+    return( _summaries(chem, elec, data) )
+
+class ABC(object):
+    """
+    Approximate Bayesian computation of connectivity models between
+    interneurons
+    """
+
+    def __init__(self, dataset, models = MODELS, priors = None, bins = BINS):
+        """
+        Reads the recordings with distances of a dataset.
+
+        Arguments
+        ---------
+        dataset : DataLoaderObject (see DataLoader in inet module)
+
+        models : tuple
+            the models compared (see MODELS). They are equally
+            probable a priori.
+        priors : dict
+            the names and bounds of the uniform priors of the
+            parameters of every model (default PRIORS).
+        bins : 1D NumPy array
+            the edges of the bins of distances (um).
+        """
+        if priors is None:
+            priors = PRIORS
+
+        try:
+            for model in models:
+                if model not in MODELS:
+                    raise ValueError("unknown model %s" %model)
+        except ValueError:
+            raise
+
+        self.__models = tuple(models)
+        self.__priors = dict((m, tuple(priors[m])) for m in models)
+        self.__bins = np.asarray(bins)
+
+        dist, chem, elec = dict(), dict(), dict()
+        for i in range(len(dataset)):
+            nPV = int(dataset.filename(i)[0])
+            if nPV > 1:
+                D = II_slice(dataset.dist(i), nPV)
+                if not np.isnan(D[0][0]):
+                    C, E = decode(II_slice(dataset.matrix(i), nPV))
+                    dist.setdefault(nPV, list()).append( np.abs(D) )
+                    chem.setdefault(nPV, list()).append( C )
+                    elec.setdefault(nPV, list()).append( np.triu(E) )
+
+        # pairs tested in every bin of distances
+        nbins = len(self.__bins) - 1
+        data = dict(dist = dict(), bins = dict())
+        tested = np.zeros((2, nbins))
+        for n in dist:
+            D = np.array(dist[n])
+            offdiag = ~np.eye(n, dtype=bool)
+            index = np.digitize(D, self.__bins) - 1
+            C = np.array([(index == b) & offdiag for b in range(nbins)])
+            E = C & np.triu(offdiag)
+
+            data['dist'][n] = D
+            data['bins'][n] = (C.astype(float), E.astype(float))
+            tested += [C.sum(-1).sum(-1).sum(-1), E.sum(-1).sum(-1).sum(-1)]
+        data['tested'] = tested
+        self.__data = data
+
+        mychem = dict((n, np.array(chem[n])[np.newaxis]) for n in chem)
+        myelec = dict((n, np.array(elec[n])[np.newaxis]) for n in elec)
+        self.__observed = _summaries(mychem, myelec, data)[0]
+
+        names = list(IIModel.motiflist)
+        for k, synapse in enumerate(('chem', 'elec')):
+            names += ['%s_%d' %(synapse, self.__bins[b])
+                for b in range(nbins) if tested[k, b] > 0]
+        self.__names = tuple(names)
+
+        nRecord = sum(len(D) for D in data['dist'].values())
+        print('{:2d} recordings with distances'.format(nRecord))
+
+    def bounds(self, model):
+        """
+        Returns the lower and upper bounds of the priors of a model as
+        a NumPy array of shape (parameters, 2).
+        """
+        return( np.array([b for name, b in self.__priors[model]], float) )
+
+    def sample_prior(self, model, size, rng):
+        """
+        Draws parameters of a model from its prior.
+
+        Returns
+        -------
+        A NumPy array of shape (size, parameters).
+        """
+        lower, upper = self.bounds(model).T
+        return( lower + (upper - lower)*rng.random_sample((size, len(lower))) )
+
+    def simulate(self, model, theta, seed = 0, n_jobs = 1, batchsize = 500):
+        """
+        Simulates a dataset with every set of parameters of a model.
+
+        Arguments
+        ---------
+        model : str
+            one of the models.
+        theta : 2D NumPy array
+            the parameters of every dataset (datasets, parameters).
+        seed : int or tuple
+            seed for the random number generators of the batches.
+        n_jobs : int
+            number of processes to simulate batches in parallel. The
+            result does not depend on n_jobs.
+        batchsize : int
+            number of datasets simulated at once.
+
+        Returns
+        -------
+        A NumPy array with the summary statistics of every dataset
+        (datasets, statistics), see names.
+        """
+        key = tuple(np.atleast_1d(seed))
+        batches = [(model, theta[start:start + batchsize], key + (b,))
+            for b, start in enumerate(range(0, len(theta), batchsize))]
+
+        if n_jobs == 1:
+            _init_worker(self.__data)
+            stats = map(_simulate_batch, batches)
+        else:
+            pool = Pool(n_jobs, initializer=_init_worker,
+                initargs=(self.__data,))
+            # the workers are stopped even if a batch fails
+            try:
+                stats = pool.map(_simulate_batch, batches)
+            finally:
+                pool.terminate()
+                pool.join()
+
+        return( np.concatenate(stats) )
+
+    def distance(self, stats, scale):
+        """
+        Returns the Euclidean distances between the summary statistics
+        and the ones observed, divided by their scale.
+        """
+        return( np.sqrt(np.sum(((stats - self.__observed)/scale)**2, axis=1)) )
+
+    def _scale(self, stats):
+        """
+        returns the scale of the summary statistics: their median
+        absolute deviation in the simulations (or standard deviation
+        if it is zero).
+        """
+        mad = np.median(np.abs(stats - np.median(stats, axis=0)), axis=0)
+        sd = stats.std(axis=0)
+        scale = np.where(mad > 0, 1.4826*mad, sd)
+        scale[scale == 0] = 1.
+
+        return( scale )
+
+    def _result(self, model, theta, weights, epsilon, n_sim, scale):
+        """
+        returns the dictionary of the posterior of all models
+        """
+        mydict = dict(models = self.models, epsilon = epsilon,
+            n_sim = n_sim, scale = scale, names = self.names,
+            observed = self.observed)
+        mydict['P'] = np.array([weights[model == m].sum()
+            for m in range(len(self.models))])/weights.sum()
+        mydict['posterior'] = dict()
+        mydict['weights'] = dict()
+        mydict['parameters'] = dict()
+        for m, name in enumerate(self.models):
+            w = weights[model == m]
+            p = len(self.bounds(name))
+            mydict['posterior'][name] = theta[model == m, :p]
+            mydict['weights'][name] = w/w.sum() if len(w) else w
+            mydict['parameters'][name] = tuple(p for p, b in
+                self.__priors[name])
+
+        return( mydict )
+
+    def _propose_prior(self, n_sim, rng):
+        """
+        draws models with equal probabilities and their parameters
+        from the priors. Returns the model index and parameters.
+        """
+        model = rng.randint(len(self.models), size = n_sim)
+        theta = np.full((n_sim, max(len(self.bounds(m))
+            for m in self.models)), np.nan)
+        for m, name in enumerate(self.models):
+            mask = model == m
+            theta[mask, :len(self.bounds(name))] = self.sample_prior(name,
+                mask.sum(), rng)
+
+        return( model, theta )
+
+    def _simulate_models(self, model, theta, seed, n_jobs, batchsize):
+        """
+        simulates the summary statistics of parameters of all models
+        """
+        stats = np.empty((len(model), len(self.observed)))
+        for m, name in enumerate(self.models):
+            mask = model == m
+            if mask.any():
+                p = len(self.bounds(name))
+                stats[mask] = self.simulate(name, theta[mask, :p],
+                    seed + (m,), n_jobs, batchsize)
+
+        return( stats )
+
+    def rejection(self, n_sim = 10**5, quantile = 0.01, seed = None,
+        n_jobs = 1, batchsize = 500, epsilon = None, scale = None):
+        """
+        Rejection ABC: draws n_sim models and parameters from the
+        priors and keeps the fraction (quantile) of the simulations
+        closest to the data.
+
+        Arguments
+        ---------
+        n_sim : int
+            number of datasets simulated.
+        quantile : float
+            fraction of the simulations accepted.
+        seed : int
+            seed for the random number generators. If None, a seed is
+            chosen randomly.
+        n_jobs, batchsize : see simulate
+        epsilon : float
+            the tolerance. If given, the simulations closer to the data
+            are accepted instead of the quantile.
+        scale : 1D NumPy array
+            the scale of the summary statistics (e.g., the one of a
+            previous result). If None, the median absolute deviation of
+            the simulations.
+
+        Returns
+        -------
+        A dictionary with the posterior probability of every model
+        ('P'), and dictionaries whose keys are the models with the
+        parameters accepted ('posterior'), their weights ('weights') and
+        names ('parameters'). The tolerance ('epsilon'), the number
+        of simulations ('n_sim'), and the names, values observed and
+        scale of the summary statistics are also returned.
+        """
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        rng = np.random.RandomState([seed, 0])
+        model, theta = self._propose_prior(n_sim, rng)
+        stats = self._simulate_models(model, theta, (seed, 0), n_jobs,
+            batchsize)
+
+        if scale is None:
+            scale = self._scale(stats)
+        dist = self.distance(stats, scale)
+        if epsilon is None:
+            epsilon = np.percentile(dist, 100*quantile)
+        keep = dist <= epsilon
+
+        return( self._result(model[keep], theta[keep],
+            np.ones(keep.sum()), epsilon, n_sim, scale) )
+
+    def smc(self, n_particles = 1000, n_generations = 5, alpha = 0.5,
+        seed = None, n_jobs = 1, batchsize = 500):
+        """
+        Sequential Monte Carlo ABC with model selection (Toni et al.,
+        2009). The first population is the fraction alpha of the
+        datasets simulated from the priors closest to the data. In
+        every generation, the tolerance is the alpha quantile of the
+        distances of the population, and models are drawn from their
+        current probabilities and parameters from their population,
+        perturbed with a normal kernel of twice their weighted
+        covariance (Beaumont et al., 2009), until n_particles are
+        accepted.
+
+        Arguments
+        ---------
+        n_particles : int
+            the number of parameters of every population.
+        n_generations : int
+            the number of populations after the first one.
+        alpha : float
+            the quantile of the distances of a population used as the
+            tolerance of the next one.
+        seed, n_jobs, batchsize : see rejection
+
+        Returns
+        -------
+        The dictionary of rejection (see rejection) of the last
+        population, with the tolerance of every population
+        ('epsilon') and the number of simulations.
+        """
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        n_sim = int(np.ceil(n_particles/alpha))
+        rng = np.random.RandomState([seed, 0])
+        model, theta = self._propose_prior(n_sim, rng)
+        stats = self._simulate_models(model, theta, (seed, 0), n_jobs,
+            batchsize)
+
+        scale = self._scale(stats)
+        dist = self.distance(stats, scale)
+        keep = np.argsort(dist, kind='mergesort')[:n_particles]
+        model, theta, dist = model[keep], theta[keep], dist[keep]
+        weights = np.ones(n_particles)/n_particles
+        epsilon = [dist.max()]
+
+        for t in range(1, n_generations + 1):
+            eps = np.percentile(dist, 100*alpha)
+            P = np.array([weights[model == m].sum()
+                for m in range(len(self.models))])
+
+            # kernels of the parameters of every model
+            kernels = dict()
+            for m, name in enumerate(self.models):
+                mask = model == m
+                if mask.any():
+                    p = len(self.bounds(name))
+                    w = weights[mask]/weights[mask].sum()
+                    X = theta[mask, :p]
+                    cov = 2*np.atleast_2d(np.cov(X, rowvar=False, aweights=w)) \
+                        if mask.sum() > 1 else np.diag(np.diff(
+                        self.bounds(name)).ravel()**2/100.)
+                    cov += 1e-12*np.eye(p)
+                    kernels[m] = (X, w, cov)
+
+            newmodel, newtheta, newdist = list(), list(), list()
+            n_accepted, batch = 0, 0
+            while n_accepted < n_particles:
+                brng = np.random.RandomState([seed, t, batch])
+                size = max(batchsize, 2*(n_particles - n_accepted))
+                m_, theta_ = self._perturb(P, kernels, size, brng)
+                stats = self._simulate_models(m_, theta_, (seed, t, batch),
+                    n_jobs, batchsize)
+                d = self.distance(stats, scale)
+                ok = d <= eps
+                newmodel.append(m_[ok])
+                newtheta.append(theta_[ok])
+                newdist.append(d[ok])
+                n_accepted += ok.sum()
+                n_sim += size
+                batch += 1
+
+            newmodel = np.concatenate(newmodel)[:n_particles]
+            newtheta = np.concatenate(newtheta)[:n_particles]
+            newdist = np.concatenate(newdist)[:n_particles]
+
+            # importance weights: prior density over the density of the
+            # proposal. Both are normalised, because the weights are
+            # compared between models with different numbers of
+            # parameters and volumes of their priors
+            newweights = np.empty(n_particles)
+            for m, (X, w, cov) in kernels.items():
+                mask = newmodel == m
+                p = X.shape[1]
+                Y = newtheta[mask, :p]
+                L = np.linalg.cholesky(cov)
+                z = np.linalg.solve(L, (Y[:, np.newaxis] - X).reshape(-1, p).T)
+                logk = -0.5*np.sum(z**2, axis=0).reshape(len(Y), len(X)) \
+                    - 0.5*p*np.log(2*np.pi) - np.sum(np.log(np.diag(L)))
+                denom = np.dot(np.exp(logk), w)
+                prior = 1/np.prod(np.diff(self.bounds(self.models[m])))
+                newweights[mask] = prior/(P[m]*denom)
+
+            model, theta, dist = newmodel, newtheta, newdist
+            weights = newweights/newweights.sum()
+            epsilon.append(eps)
+
+        return( self._result(model, theta, weights, epsilon, n_sim, scale) )
+
+    def _perturb(self, P, kernels, size, rng):
+        """
+        draws models from their probabilities P and parameters from
+        their populations, perturbed with a normal kernel. Models and
+        parameters outside the priors are drawn again, so that the
+        proposals of all models are truncated by the same constant.
+        """
+        model = np.empty(size, dtype = int)
+        theta = np.empty((size, max(len(self.bounds(m))
+            for m in self.models)))
+
+        todo = np.arange(size)
+        while len(todo):
+            model[todo] = rng.choice(len(P), size = len(todo), p = P/P.sum())
+            theta[todo] = np.nan
+            inside = np.zeros(len(todo), dtype = bool)
+            for m, (X, w, cov) in kernels.items():
+                mask = model[todo] == m
+                if not mask.any():
+                    continue
+                lower, upper = self.bounds(self.models[m]).T
+                pick = rng.choice(len(X), size = mask.sum(), p = w)
+                Y = X[pick] + rng.multivariate_normal(np.zeros(len(lower)),
+                    cov, size = mask.sum())
+                theta[todo[mask], :len(lower)] = Y
+                inside[mask] = np.all((Y >= lower) & (Y <= upper), axis=1)
+            todo = todo[~inside]
+
+        return( model, theta )
+
+    # only getters for private attributes
+    models = property(lambda self: self.__models)
+    priors = property(lambda self: self.__priors)
+    names = property(lambda self: self.__names)
+    observed = property(lambda self: self.__observed)
+    bins = property(lambda self: self.__bins)
@@ -0,0 +1,311 @@
+"""
+bitplanes.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 21:42:26 UTC 2026
+
+Canonical bit-plane representation of connectivity matrices. Every
+matrix in the 0/1/2/3 encoding of the *.syn files is split into two
+planes:
+
+chem : a directed plane, bit (i,j) is set if cell i makes a chemical
+       synapse onto cell j.
+elec : a symmetric plane, bits (i,j) and (j,i) are set if cells i and j
+       are electrically coupled, regardless of the triangle where the
+       gap junction was written in the *.syn file.
+
+A plane of up to 8x8 cells is packed into a single 64-bit word, where
+row i occupies byte i and column j is bit j of that byte. Motifs are
+then counted with bitwise operations and population counts on
+arrays of words, so that millions of matrices can be counted at once.
+
+Example
+-------
+>>> from inet.bitplanes import syn2planes, iicount
+>>> chem, elec = syn2planes(np.array([[0,3],[1,0]]))
+>>> iicount(chem, elec)['ii_c2e']
+"""
+
+import numpy as np
+
+NMAX = 8 # maximal number of cells in a plane (one byte per row)
+
+# number of bits set in every possible byte
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# masks to transpose a 8x8 bit matrix with three delta swaps
+_K1 = np.uint64(0x5500550055005500)
+_K2 = np.uint64(0x3333000033330000)
+_K4 = np.uint64(0x0f0f0f0f00000000)
+
+def decode(matrix):
+    """
+    Splits a matrix (or a stack of matrices) in the *.syn encoding
+    into its chemical and electrical components.
+
+    Arguments
+    ---------
+    matrix : NumPy array
+        a square matrix, or a stack of square matrices along the last
+        two axes, containing <0> if no connection, <1> if chemical
+        synapse, <2> if electrical synapse and <3> if both.
+
+    Returns
+    -------
+    A tuple of boolean arrays (chem, elec) with the shape of matrix.
+    elec is always symmetric.
+    """
+    matrix = np.asarray(matrix)
+
+    try:
+        if matrix.ndim < 2 or matrix.shape[-1] != matrix.shape[-2]:
+            raise IOError("matrix must be a square matrix!")
+    except IOError:
+        raise
+
+    chem = (matrix == 1) | (matrix == 3)
+    elec = (matrix == 2) | (matrix == 3)
+    elec = elec | np.swapaxes(elec, -1, -2) # gap junctions are symmetric
+
+    return( chem, elec )
+
+def encode(chem, elec):
+    """
+    Combines chemical and electrical synapses into the *.syn encoding.
+    In coupled pairs, the entry <3> is written where the chemical
+    synapse is (in the upper triangle if both synapses exist), and
+    <2> in the upper triangle if there is no chemical synapse.
+
+    Arguments
+    ---------
+    chem : boolean NumPy array
+        a square matrix (or stack of) with the chemical synapses.
+    elec : boolean NumPy array
+        a square matrix (or stack of) with the electrical synapses.
+        Only the upper triangle is read.
+
+    Returns
+    -------
+    An integer NumPy array with the *.syn encoding.
+    """
+    chem = np.asarray(chem, dtype=bool)
+    elec = np.asarray(elec, dtype=bool)
+
+    n = chem.shape[-1]
+    upper = np.triu(np.ones((n,n), dtype=bool), 1)
+
+    E = elec & upper # gap junctions in upper triangle only
+    Et = np.swapaxes(E, -1, -2)
+    Ct = np.swapaxes(chem, -1, -2)
+
+    S = chem.astype(int)
+    S += 2*(E & chem) # 3 where chemical and upper triangle
+    S += 2*(Et & chem & ~Ct) # 3 where chemical in lower triangle only
+    S += 2*(E & ~chem & ~Ct) # 2 where only gap junction
+
+    return( S )
+
+def pack(mask):
+    """
+    Packs a boolean square matrix (or stack of) into 64-bit words.
+
+    Arguments
+    ---------
+    mask : boolean NumPy array
+        a square matrix, or a stack of them along the last two axes,
+        with at most 8 cells.
+
+    Returns
+    -------
+    A NumPy array of uint64 with the shape of the stack.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    n = mask.shape[-1]
+
+    try:
+        if n > NMAX:
+            raise ValueError('matrix must have at most %d cells' %NMAX)
+    except ValueError:
+        raise
+
+    shape = mask.shape[:-2]
+    padded = np.zeros(shape + (NMAX, NMAX), dtype=bool)
+    padded[..., :n, :n] = mask
+
+    # packbits writes the first element into the most significant bit
+    rows = np.packbits(padded[..., ::-1], axis=-1) # (..., 8, 1)
+    rows = np.ascontiguousarray(rows.reshape(shape + (NMAX,)))
+
+    return( rows.view('<u8').reshape(shape).astype(np.uint64) )
+
+def unpack(words, n):
+    """
+    Unpacks 64-bit words into boolean square matrices.
+
+    Arguments
+    ---------
+    words : NumPy array of uint64
+        packed planes.
+    n : int
+        the number of cells of the matrices.
+
+    Returns
+    -------
+    A boolean NumPy array with shape words.shape + (n, n).
+    """
+    words = np.asarray(words, dtype=np.uint64)
+    shape = words.shape
+
+    rows = words.astype('<u8').reshape(shape + (1,)).view(np.uint8)
+    bits = np.unpackbits(rows[..., np.newaxis], axis=-1)[..., ::-1]
+
+    return( bits[..., :n, :n].astype(bool) )
+
+def syn2planes(matrix):
+    """
+    Returns the packed chemical and electrical planes of a
+    matrix (or stack of) in the *.syn encoding.
+    """
+    chem, elec = decode(matrix)
+    return( pack(chem), pack(elec) )
+
+def planes2syn(chem, elec, n):
+    """
+    Returns matrices in the *.syn encoding from packed chemical
+    and electrical planes of n cells.
+    """
+    return( encode(unpack(chem, n), unpack(elec, n)) )
+
+#-------------------------------------------------------------------------
+# Bitwise kernels. All of them accept arrays of packed words and return
+# int64 arrays with the same shape.
+#-------------------------------------------------------------------------
+
+def popcount(words):
+    """
+    Returns the number of bits set in every word.
+    """
+    return( _bytecount(words).sum(axis=-1) )
+
+def _bytecount(words):
+    """
+    Returns the number of bits set in every byte of the words,
+    (i.e., the number of ones in every row of the planes).
+    """
+    words = np.asarray(words, dtype=np.uint64)
+    rows = words.astype('<u8').reshape(words.shape + (1,)).view(np.uint8)
+    return( _POPCOUNT8[rows].astype(np.int64) )
+
+def transpose(words):
+    """
+    Returns the transposed planes (i.e., swaps pre- and postsynaptic
+    cells).
+    """
+    x = np.array(words, dtype=np.uint64)
+
+    t = _K4 & (x ^ (x << np.uint64(28)))
+    x ^= t ^ (t >> np.uint64(28))
+    t = _K2 & (x ^ (x << np.uint64(14)))
+    x ^= t ^ (t >> np.uint64(14))
+    t = _K1 & (x ^ (x << np.uint64(7)))
+    x ^= t ^ (t >> np.uint64(7))
+
+    return( x )
+
+def outdegree(chem):
+    """
+    Returns the number of chemical synapses made by every cell
+    (an array with NMAX values per plane).
+    """
+    return( _bytecount(chem) )
+
+def indegree(chem):
+    """
+    Returns the number of chemical synapses received by every cell
+    (an array with NMAX values per plane).
+    """
+    return( _bytecount(transpose(chem)) )
+
+def count_chem(chem):
+    """
+    Counts chemical synapses (ii_chem)
+    """
+    return( popcount(chem) )
+
+def count_elec(elec):
+    """
+    Counts electrical synapses (ii_elec)
+    """
+    return( popcount(elec)//2 )
+
+def count_c2(chem):
+    """
+    Counts reciprocally connected chemical synapses (ii_c2)
+    """
+    return( popcount(chem & transpose(chem))//2 )
+
+def count_c1e(chem, elec):
+    """
+    Counts chemical synapses between electrically coupled cells (ii_c1e)
+    """
+    return( popcount(chem & elec) )
+
+def count_c2e(chem, elec):
+    """
+    Counts reciprocal chemical synapses between electrically coupled
+    cells (ii_c2e)
+    """
+    return( popcount(chem & transpose(chem) & elec)//2 )
+
+def count_con(chem):
+    """
+    Counts two cells converging onto a third (ii_con)
+    """
+    n_in = indegree(chem)
+    return( (n_in*(n_in-1)//2).sum(axis=-1) )
+
+def count_div(chem):
+    """
+    Counts one cell diverging onto two cells (ii_div)
+    """
+    n_out = outdegree(chem)
+    return( (n_out*(n_out-1)//2).sum(axis=-1) )
+
+def count_lin(chem):
+    """
+    Counts linear chains of three different cells (ii_lin). Every
+    cell is the middle of in*out chains, minus the ones closed by
+    reciprocal synapses.
+    """
+    paths = (indegree(chem)*outdegree(chem)).sum(axis=-1)
+    return( paths - 2*count_c2(chem) )
+
+def iicount(chem, elec):
+    """
+    Counts all inhibitory motifs found in packed planes.
+
+    Arguments
+    ---------
+    chem : NumPy array of uint64
+        packed chemical planes.
+    elec : NumPy array of uint64
+        packed electrical planes.
+
+    Returns
+    -------
+    A dictionary whose keys are the motifs of IIMotifCounter
+    and whose values are arrays with the motifs found in every plane.
+    """
+    mydict = dict()
+    mydict['ii_chem'] = count_chem(chem)
+    mydict['ii_elec'] = count_elec(elec)
+    mydict['ii_c1e'] = count_c1e(chem, elec)
+    mydict['ii_c2e'] = count_c2e(chem, elec)
+    mydict['ii_c2'] = count_c2(chem)
+    mydict['ii_con'] = count_con(chem)
+    mydict['ii_div'] = count_div(chem)
+    mydict['ii_lin'] = count_lin(chem)
+
+    return( mydict )
@@ -0,0 +1,377 @@
+"""
+cache.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:38:55 UTC 2026
+
+Memoizes expensive results (datasets loaded, motifs counted or
+simulated) on disk, so that repeating an analysis costs a file read.
+
+Every result is stored in a pickle file whose name is the name of
+the function and a SHA-1 key of its arguments. The key is computed
+from the content of the arguments, not from their identity:
+
+- datasets (DataLoader) by their fingerprint (see DataLoader),
+- models of inet.simulations by their metadata (model, parameters,
+  blocksize and dataset fingerprint), and the seed of their runs,
+- NumPy arrays by their type, shape and values,
+- numbers, strings, lists, tuples and dictionaries by their values,
+- functions by their module and name (lambdas and closures, whose
+  name does not identify them, raise TypeError).
+
+A dataset is identified by the content of its *.syn and *.dist files,
+so that a cache is not used after the files change. The size of a cache
+is bounded: the least recently used results are removed when the
+files exceed max_size bytes. The number of results found (hits) and
+computed (misses) is counted in every Cache object.
+
+Example
+-------
+>>> from inet.cache import Cache
+>>> from inet.simulations import IIUniformModel
+>>> mycache = Cache() # in $INET_CACHE or ~/.cache/inet
+>>> mydataset = mycache.load_dataset('../data/PV')
+>>> mymodel = IIUniformModel(mydataset)
+>>> mycache.run(mymodel, n_iter = 10**6, seed = 0) # a file read next time
+>>> mycache.stats()
+"""
+
+import os
+import re
+import glob
+import hashlib
+import pickle
+import numbers
+
+import numpy as np
+
+CACHEDIR = os.environ.get('INET_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'inet'))
+
+_EXT = '.p'
+
+_strings = (str, type(u''))
+
+def fingerprint(obj):
+    """
+    Returns a SHA-1 hexadecimal digest of the content of an object.
+
+    Raises TypeError if the content of the object cannot be read.
+    """
+    mysha = hashlib.sha1()
+
+    # numbers of the same value have the same key (e.g., 0 and np.int64(0))
+    if obj is None or isinstance(obj, (bool, np.bool_)):
+        mysha.update( repr(obj) )
+
+    elif isinstance(obj, numbers.Integral):
+        mysha.update( 'int' + repr(int(obj)) )
+
+    elif isinstance(obj, numbers.Real):
+        mysha.update( 'float' + repr(float(obj)) )
+
+    elif isinstance(obj, _strings):
+        mysha.update( 'str' + obj.encode('utf-8') )
+
+    elif isinstance(obj, (np.ndarray, np.generic)):
+        obj = np.ascontiguousarray(obj)
+        mysha.update( 'ndarray' + obj.dtype.str + repr(obj.shape) )
+        mysha.update( obj.tostring() )
+
+    elif isinstance(obj, (list, tuple)):
+        mysha.update( type(obj).__name__ )
+        for item in obj:
+            mysha.update( fingerprint(item) )
+
+    elif isinstance(obj, dict):
+        mysha.update( 'dict' )
+        for item in sorted(fingerprint(k) + fingerprint(v)
+            for k, v in obj.items()):
+            mysha.update( item )
+
+    elif callable(getattr(obj, 'fingerprint', None)): # DataLoader
+        mysha.update( type(obj).__name__ + obj.fingerprint() )
+
+    elif callable(getattr(obj, 'metadata', None)): # IIModel
+        mysha.update( fingerprint(obj.metadata()) )
+
+    elif callable(obj) and hasattr(obj, '__name__') and \
+        obj.__name__ != '<lambda>' and \
+        getattr(obj, '__closure__', None) is None:
+        mysha.update( 'function%s.%s' %(obj.__module__, obj.__name__) )
+
+    else:
+        try:
+            raise TypeError('cannot fingerprint %s' %type(obj).__name__)
+        except TypeError:
+            raise
+
+    return( mysha.hexdigest() )
+
+def files_fingerprint(path, patterns = ('*.syn', '*.dist')):
+    """
+    Returns a SHA-1 hexadecimal digest of the names and contents of
+    the files of a directory (by default the files read by DataLoader).
+    """
+    mysha = hashlib.sha1()
+    for pattern in patterns:
+        for fname in sorted(glob.glob(os.path.join(path, pattern))):
+            mysha.update( os.path.basename(fname) )
+            with open(fname, 'rb') as f:
+                mysha.update( f.read() )
+
+    return( mysha.hexdigest() )
+
+def _dumppickle(fname, obj):
+    """
+    writes an object in a pickle file. The file is replaced at once,
+    so that it is never left half-written.
+    """
+    tmpname = '%s.%d.tmp' %(fname, os.getpid())
+    with open(tmpname, 'wb') as f:
+        pickle.dump(obj, f, protocol = pickle.HIGHEST_PROTOCOL)
+    os.rename(tmpname, fname)
+
+class Cache(object):
+    """
+    A directory with results memoized on disk
+
+    >>> mycache.call(bootstrap, mydataset, n_boot = 10000, seed = 0)
+    >>> bootstrap = mycache.memoize(bootstrap) # the same
+    """
+
+    def __init__(self, path = CACHEDIR, max_size = 2**30):
+        """
+        Opens or creates a cache
+
+        Arguments
+        ---------
+        path : str
+            the directory of the cache (default $INET_CACHE or
+            ~/.cache/inet).
+        max_size : int
+            maximal number of bytes of the results stored (default
+            1 GB). The least recently used results are removed first.
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        self.__path = path
+        self.__max_size = max_size
+        self.__hits = 0
+        self.__misses = 0
+
+    def key(self, name, *args, **kwargs):
+        """
+        Returns the key of the result of a function (name) with the
+        arguments given.
+        """
+        return( fingerprint((name, args, kwargs)) )
+
+    def _fname(self, name, key):
+        """
+        returns the file with the result of a key
+        """
+        name = re.sub(r'[^\w.]', '_', name)
+        return( os.path.join(self.path, '%s-%s%s' %(name, key, _EXT)) )
+
+    def _glob(self, name = '*', key = '*'):
+        """
+        returns the files of the results of a function and/or key
+        """
+        if name != '*':
+            name = re.sub(r'[^\w.]', '_', name)
+        fname = '%s-%s%s' %(name, key, _EXT)
+        return( glob.glob(os.path.join(self.path, fname)) )
+
+    def _entries(self):
+        """
+        returns the files of the results stored
+        """
+        return( self._glob() )
+
+    def get(self, name, key):
+        """
+        Returns the result of a key, or raises KeyError if it is not
+        stored. The result becomes the most recently used.
+        """
+        fname = self._fname(name, key)
+        try:
+            with open(fname, 'rb') as f:
+                result = pickle.load(f)
+        except IOError:
+            self.__misses += 1
+            raise KeyError(key)
+
+        os.utime(fname, None) # last used now
+        self.__hits += 1
+
+        return( result )
+
+    def put(self, name, key, result):
+        """
+        Stores the result of a key, and removes the least recently used
+        results if the cache is too large.
+        """
+        _dumppickle(self._fname(name, key), result)
+        self.evict()
+
+    def call(self, func, *args, **kwargs):
+        """
+        Returns func(*args, **kwargs), computed only if it is not stored.
+        """
+        name = '%s.%s' %(func.__module__, func.__name__)
+        key = self.key(name, *args, **kwargs)
+
+        try:
+            return( self.get(name, key) )
+        except KeyError:
+            result = func(*args, **kwargs)
+            self.put(name, key, result)
+            return( result )
+
+    def memoize(self, func):
+        """
+        Returns a function that calls func only if its result is not
+        stored in the cache.
+        """
+        def wrapper(*args, **kwargs):
+            return( self.call(func, *args, **kwargs) )
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+
+        return( wrapper )
+
+    def load_dataset(self, path):
+        """
+        Returns DataLoader(path), read from the cache if the *.syn and
+        *.dist files did not change.
+        """
+        from inet.loader import DataLoader
+
+        name = 'inet.loader.DataLoader'
+        key = self.key(name, files_fingerprint(path))
+
+        try:
+            return( self.get(name, key) )
+        except KeyError:
+            dataset = DataLoader(path)
+            self.put(name, key, dataset)
+            return( dataset )
+
+    def run(self, model, n_iter, seed, **kwargs):
+        """
+        Runs a model of inet.simulations (see IIModel.run), or reads
+        the motifs simulated from the cache if the model, its
+        parameters, its dataset, n_iter and seed are the same. The
+        remaining arguments (n_jobs, max_memory...) do not change the
+        motifs simulated.
+
+        seed must be given: simulations with a random seed are not
+        stored. Raises TypeError if the parameters of the model cannot
+        be fingerprinted (e.g., a RecordingEngine whose model overrides
+        the sampler, see inet.engine).
+        """
+        try:
+            if seed is None:
+                raise ValueError('seed is required to store simulations')
+        except ValueError:
+            raise
+
+        # the content of the model and the seed of the run (the seed of
+        # the model is the one of its last run)
+        metadata = model.metadata()
+        metadata['seed'] = int(seed)
+
+        name = type(model).__name__ + '.run'
+        key = self.key(name, metadata, n_iter = n_iter)
+
+        try:
+            mysim = self.get(name, key)
+            model.seed = seed
+            model._setresults(mysim)
+        except KeyError:
+            model.run(n_iter, seed, **kwargs)
+            mysim = np.column_stack([model.simulated(motif)
+                for motif in model.motiflist])
+            self.put(name, key, mysim)
+
+        return( model )
+
+    def invalidate(self, name = None, key = None):
+        """
+        Removes stored results: the result of a key, all results of a
+        function (name), or all results if no argument is given.
+
+        Returns
+        -------
+        The number of results removed.
+        """
+        myfiles = self._glob('*' if name is None else name,
+            '*' if key is None else key)
+
+        for fname in myfiles:
+            os.remove(fname)
+
+        return( len(myfiles) )
+
+    def clear(self):
+        """
+        Removes all results stored.
+        """
+        return( self.invalidate() )
+
+    def evict(self):
+        """
+        Removes the least recently used results until the cache is not
+        larger than max_size bytes.
+        """
+        myfiles = list()
+        for fname in self._entries():
+            mystat = os.stat(fname)
+            myfiles.append( (mystat.st_mtime, mystat.st_size, fname) )
+
+        size = sum(x[1] for x in myfiles)
+        for mtime, fsize, fname in sorted(myfiles):
+            if size <= self.max_size:
+                break
+            os.remove(fname)
+            size -= fsize
+
+    def size(self):
+        """
+        Returns the number of bytes of the results stored
+        """
+        return( sum(os.path.getsize(fname) for fname in self._entries()) )
+
+    def __len__(self):
+        """
+        Returns the number of results stored
+        """
+        return( len(self._entries()) )
+
+    def stats(self):
+        """
+        Returns a dictionary with the results found ('hits') and
+        computed ('misses') by this object, the fraction of results
+        found ('hit_rate'), and the number ('entries') and bytes
+        ('size') of the results stored.
+        """
+        mydict = dict()
+        mydict['hits'] = self.__hits
+        mydict['misses'] = self.__misses
+        total = self.__hits + self.__misses
+        mydict['hit_rate'] = self.__hits/float(total) if total else 0.
+        mydict['entries'] = len(self)
+        mydict['size'] = self.size()
+
+        return( mydict )
+
+    # only getters for private attributes
+    path = property(lambda self: self.__path)
+    max_size = property(lambda self: self.__max_size)
+    hits = property(lambda self: self.__hits)
+    misses = property(lambda self: self.__misses)
@@ -0,0 +1,307 @@
+"""
+crossval.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:47:32 UTC 2026
+
+Cross-validation of connectivity models between interneurons. The
+recordings of a dataset are partitioned into folds; every model is
+fitted to the pairs tested in all folds but one, and scored by the
+log-likelihood of the chemical and electrical synapses of the pairs in
+the held-out fold. The models are:
+
+uniform     : constant probabilities of chemical and electrical
+              synapses (see IIUniformModel).
+sigmoid     : sigmoid functions of the distance fitted by maximum
+              likelihood (see inet.fitting and IISigmoidModel).
+conditional : probabilities of chemical synapses between coupled and
+              uncoupled cells and of electrical synapses (see
+              IIConditionalModel).
+
+Recordings, not pairs, are held out, so that the score measures how
+well a model predicts new experiments. Only recordings with distances
+are used, so that all models are scored on the same pairs.
+
+Like in inet.resampling, the folds are a (folds x pairs) matrix of
+training weights, so that constant probabilities of all folds are
+obtained with matrix products, and sigmoid functions are fitted with
+the weights of every fold (see fit_sigmoid). Models are scored in
+parallel processes.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.crossval import crossvalidate
+>>> mydataset = DataLoader('../data/PV')
+>>> mycv = crossvalidate(mydataset, n_folds = 10, n_repeats = 20, seed = 0)
+>>> mycv['best'], mycv['sigmoid']['loglik']
+"""
+
+from __future__ import division
+
+import numpy as np
+from multiprocessing import Pool
+
+from inet.utils import II_slice
+from inet.bitplanes import decode
+from inet.fitting import fit_sigmoid, _EPS
+from inet.simulations import sigmoid
+
+MODELS = ('uniform', 'sigmoid', 'conditional')
+
+def pair_table(dataset):
+    """
+    Returns the pairs tested in the recordings with distances of a
+    dataset.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    Returns
+    -------
+    A dictionary whose keys are 'chem' (every ordered pair) and 'elec'
+    (every unordered pair), and values are dictionaries of 1D NumPy
+    arrays with the distance ('x'), 1 if connected, 0 otherwise ('y'),
+    1 if the cells are electrically coupled ('coupled') and the index
+    of the recording ('recording') of every pair. The number of
+    recordings is also returned ('n_record').
+    """
+    table = dict(chem = dict(x = list(), y = list(), coupled = list(),
+        recording = list()), elec = dict(x = list(), y = list(),
+        coupled = list(), recording = list()))
+
+    n_record = 0
+    for i in range(len(dataset)):
+        nPV = int(dataset.filename(i)[0])
+        if nPV < 2:
+            continue
+
+        dist = II_slice(dataset.dist(i), nPV)
+        if np.isnan(dist).any():
+            continue
+
+        chem, elec = decode(II_slice(dataset.matrix(i), nPV))
+        elec = elec | elec.T
+        for synapse, found in (('chem', chem), ('elec', elec)):
+            if synapse == 'chem':
+                pre, post = np.nonzero(~np.eye(nPV, dtype = bool))
+            else:
+                pre, post = np.triu_indices(nPV, 1)
+            mytable = table[synapse]
+            mytable['x'].append( np.abs(dist[pre, post]) )
+            mytable['y'].append( found[pre, post].astype(float) )
+            mytable['coupled'].append( elec[pre, post].astype(float) )
+            mytable['recording'].append( np.full(len(pre), n_record,
+                dtype = int) )
+        n_record += 1
+
+    for synapse in ('chem', 'elec'):
+        table[synapse] = dict( (key, np.concatenate(value))
+            for key, value in table[synapse].items() )
+    table['n_record'] = n_record
+
+    return( table )
+
+def assign_folds(n_record, n_folds, n_repeats = 1, seed = None):
+    """
+    Assigns recordings randomly to folds of (almost) equal size.
+
+    Arguments
+    ---------
+    n_record : int
+        the number of recordings.
+    n_folds : int
+        the number of folds (n_record for leave-one-out).
+    n_repeats : int
+        the number of random partitions.
+    seed : int
+        seed for the random number generators. Every partition is
+        drawn with its own generator (seed, repeat).
+
+    Returns
+    -------
+    An integer NumPy array of shape (n_repeats, n_record) with the fold
+    of every recording in every partition.
+    """
+    try:
+        if not 1 < n_folds <= n_record:
+            raise ValueError('n_folds must be between 2 and %d' %n_record)
+    except ValueError:
+        raise
+
+    if seed is None:
+        seed = np.random.RandomState().randint(2**31)
+
+    folds = np.empty((n_repeats, n_record), dtype = int)
+    for repeat in range(n_repeats):
+        rng = np.random.RandomState([seed, repeat])
+        folds[repeat, rng.permutation(n_record)] = np.arange(n_record) % n_folds
+
+    return( folds )
+
+def _bernoulli(p, y):
+    """
+    returns the log-likelihood of every pair (y is 1 if connected)
+    given its probability of connection p
+    """
+    p = np.clip(p, _EPS, 1 - _EPS)
+    return( y*np.log(p) + (1 - y)*np.log(1 - p) )
+
+def _ratio(found, tested):
+    """
+    returns the probabilities of connection of every fold (zero if no
+    pair was tested)
+    """
+    return( found/np.maximum(tested, 1) )
+
+def _predict(model, synapse, pairs, train):
+    """
+    returns the probability of connection of every pair, with the
+    parameters of a model fitted to the training pairs of every fold.
+
+    Arguments
+    ---------
+    model : str
+        one of MODELS.
+    synapse : str
+        'chem' or 'elec'.
+    pairs : dict
+        the pairs tested (see pair_table).
+    train : 2D NumPy array
+        1 if a pair is used to fit the model, 0 otherwise (folds x
+        pairs).
+
+    Returns
+    -------
+    A NumPy array (folds x pairs).
+    """
+    x, y, c = pairs['x'], pairs['y'], pairs['coupled']
+
+    if model == 'sigmoid':
+        P = np.empty(train.shape)
+        for k, weights in enumerate(train):
+            A, C, r = fit_sigmoid(x, y, weights)
+            P[k] = sigmoid(x, A, C, r)/100.
+        return( P )
+
+    if model == 'conditional' and synapse == 'chem':
+        P1 = _ratio(np.dot(train, y*c), np.dot(train, c))
+        P0 = _ratio(np.dot(train, y*(1 - c)), np.dot(train, 1 - c))
+        return( np.where(c > 0, P1[:, np.newaxis], P0[:, np.newaxis]) )
+
+    # constant probability (electrical synapses of the conditional model
+    # are the ones of the uniform model)
+    P = _ratio(np.dot(train, y), train.sum(1))
+
+    return( np.repeat(P[:, np.newaxis], len(y), axis = 1) )
+
+#-------------------------------------------------------------------------
+# Every model is fitted and scored in all folds by one process.
+#-------------------------------------------------------------------------
+
+_worker_data = None # pairs tested and folds in every process
+
+def _init_worker(data):
+    """
+    stores the pairs tested and the folds in a process of the pool
+    """
+    global _worker_data
+    _worker_data = data
+
+def _score_model(model):
+    """
+    returns the held-out log-likelihood of chemical and electrical
+    synapses of a model in every fold (partitions x folds)
+    """
+    table, folds, n_folds = _worker_data
+    n_repeats = len(folds)
+
+    myscore = list()
+    for synapse in ('chem', 'elec'):
+        pairs = table[synapse]
+        # fold of every pair in every partition
+        pairfold = folds[:, pairs['recording']].repeat(n_folds, axis = 0)
+        heldout = (pairfold == np.tile(np.arange(n_folds), n_repeats)
+            [:, np.newaxis]).astype(float)
+
+        P = _predict(model, synapse, pairs, 1 - heldout)
+        ll = np.sum(heldout*_bernoulli(P, pairs['y']), axis = 1)
+        myscore.append( ll.reshape(n_repeats, n_folds) )
+
+    return( tuple(myscore) )
+
+def crossvalidate(dataset, models = MODELS, n_folds = 10, n_repeats = 1,
+    seed = None, n_jobs = 1):
+    """
+    Scores connectivity models by the log-likelihood of the synapses of
+    held-out recordings.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    models : tuple
+        the models scored (see MODELS).
+    n_folds : int
+        the number of folds (None for leave-one-recording-out).
+    n_repeats : int
+        the number of random partitions of the recordings into folds.
+    seed : int
+        seed for the partitions (see assign_folds).
+    n_jobs : int
+        number of processes to score models in parallel.
+
+    Returns
+    -------
+    A dictionary whose keys are the models, and values are dictionaries
+    with the held-out log-likelihood of chemical ('chem') and
+    electrical ('elec') synapses in every fold (partitions x folds),
+    the sum of both ('total'), the log-likelihood of all held-out
+    pairs averaged over partitions ('loglik') and its standard error
+    between partitions ('SE'). The best model ('best'), the folds of
+    every recording ('folds') and the number of pairs ('n_pairs') are
+    also returned.
+    """
+    try:
+        for model in models:
+            if model not in MODELS:
+                raise ValueError("unknown model %s" %model)
+    except ValueError:
+        raise
+
+    table = pair_table(dataset)
+    if n_folds is None:
+        n_folds = table['n_record']
+    folds = assign_folds(table['n_record'], n_folds, n_repeats, seed)
+    data = (table, folds, n_folds)
+
+    if n_jobs == 1:
+        _init_worker(data)
+        scores = map(_score_model, models)
+    else:
+        pool = Pool(n_jobs, initializer = _init_worker, initargs = (data,))
+        # the workers are stopped even if a model fails
+        try:
+            scores = pool.map(_score_model, models)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    mydict = dict()
+    for model, (chem, elec) in zip(models, scores):
+        total = chem + elec
+        loglik = total.sum(1) # every pair is held out once per partition
+        mydict[model] = dict(chem = chem, elec = elec, total = total,
+            loglik = loglik.mean(),
+            SE = loglik.std(ddof = 1)/np.sqrt(n_repeats) if n_repeats > 1
+            else np.nan)
+
+    mydict['best'] = max(models, key = lambda model: mydict[model]['loglik'])
+    mydict['folds'] = folds
+    mydict['n_pairs'] = dict(chem = len(table['chem']['y']),
+        elec = len(table['elec']['y']))
+
+    return( mydict )
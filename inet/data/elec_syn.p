@@ -0,0 +1,36 @@
+cnumpy.core.multiarray
+_reconstruct
+p0
+(cnumpy
+ndarray
+p1
+(I0
+tp2
+S'b'
+p3
+tp4
+Rp5
+(I1
+(I3
+tp6
+cnumpy
+dtype
+p7
+(S'f8'
+p8
+I0
+I1
+tp9
+Rp10
+(I3
+S'<'
+p11
+NNNI-1
+I-1
+I0
+tp12
+bI00
+S'\\\xd6\xc0JE7J@r\xdd>\xa6<\xa2f@\xf7\xadWr\xf6\xe21@'
+p13
+tp14
+b.
\ No newline at end of file
@@ -0,0 +1,462 @@
+"""
+engine.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:19:16 UTC 2026
+
+A simulation engine for full recordings with interneurons (I) and
+principal cells (E). A recording of n cells with nIN interneurons is a
+n x n matrix in the *.syn encoding whose first nIN cells are
+interneurons (see inet.utils), with four blocks:
+
+II : synapses between interneurons (IIMotifCounter)
+IE : synapses from interneurons onto principal cells (IEMotifCounter)
+EI : synapses from principal cells onto interneurons (EIMotifCounter)
+EE : synapses between principal cells (EEMotifCounter)
+
+A connectivity model (a RecordingModel) only supplies a batched sampler
+of recordings, given the number of interneurons and the distances
+between the cells. The engine (RecordingEngine) replays the recording
+configurations of a dataset, simulates them in blocks (in parallel, with
+checkpoints and stores, see IIModel in inet.simulations) and counts the
+motifs of all counters.
+
+Checkpoints and stores identify a model by the fingerprint of the
+probabilities of the recordings replayed, so that models with other
+distance functions are never mixed. Models that override the sampler
+cannot be fingerprinted, and their simulations are not checkpointed or
+stored.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.engine import RecordingEngine, UniformRecordingModel
+>>> mydataset = DataLoader('../data/PV')
+>>> mymodel = UniformRecordingModel.from_dataset(mydataset)
+>>> engine = RecordingEngine(mydataset, mymodel)
+>>> engine.run(n_iter = 1000, seed = 0)
+>>> engine.simulated('e2i')
+"""
+
+from __future__ import division
+
+import hashlib
+
+import numpy as np
+
+from inet.motifs import IIMotifCounter, EIMotifCounter, IEMotifCounter
+from inet.motifs import EEMotifCounter
+from inet.utils import enum
+from inet.bitplanes import NMAX, encode, syn2planes, iicount
+from inet.simulations import IIModel, fchem, felec
+
+# probabilities of the model for every block type
+SYNAPSES = ['ii_chem', 'ii_elec', 'ie', 'ei', 'ee_chem', 'ee_elec']
+
+# number of cells of every recording configuration
+_ncells = dict((label, n) for n, label in enum.items())
+
+def count_recordings(S, nIN):
+    """
+    Counts the motifs of all counters in a stack of recordings.
+
+    Arguments
+    ---------
+    S : NumPy array
+        recordings in the *.syn encoding of shape (..., n, n), the
+        first nIN cells are interneurons.
+    nIN : int
+        the number of interneurons.
+
+    Returns
+    -------
+    A dictionary whose keys are the motifs of IIMotifCounter,
+    EIMotifCounter, IEMotifCounter and EEMotifCounter, and whose values
+    are arrays with the motifs found in every recording.
+    """
+    S = np.asarray(S)
+
+    mydict = iicount(*syn2planes(S[..., :nIN, :nIN]))
+
+    EE = iicount(*syn2planes(S[..., nIN:, nIN:]))
+    for key in IIMotifCounter.motiflist:
+        mydict['ee' + key[2:]] = EE[key]
+
+    # EIMotifCounter and IEMotifCounter count every non-zero element
+    syn = np.count_nonzero(S[..., nIN:, :nIN], axis = -2) # per interneuron
+    mydict['ei'] = syn.sum(axis = -1)
+    mydict['e2i'] = (syn*(syn-1)//2).sum(axis = -1)
+    mydict['e3i'] = (syn*(syn-1)*(syn-2)//6).sum(axis = -1)
+    mydict['ie'] = np.count_nonzero(S[..., :nIN, nIN:], axis = (-2, -1))
+
+    return( mydict )
+
+class RecordingModel(object):
+    """
+    Base class for models of full recordings. Daughter classes define
+    the probabilities of chemical and electrical synapses between the
+    cells of the recordings in probabilities(), or a batched sampler
+    of recordings from uniform random numbers in sample().
+    """
+    distances = False # True if the model requires the distances
+
+    def probabilities(self, nIN, dist):
+        """
+        Returns the probabilities of connection of a stack of
+        recordings.
+
+        Arguments
+        ---------
+        nIN : int
+            the number of interneurons.
+        dist : NumPy array
+            the distances between the cells of every recording (shape
+            (m, n, n)). They are NaN if the model does not require
+            distances.
+
+        Returns
+        -------
+        A tuple of NumPy arrays (Pchem, Pelec) of shape (m, n, n) with the
+        probabilities of chemical and electrical synapses. Only the
+        upper triangle of Pelec is read.
+        """
+        raise NotImplementedError
+
+    def sample(self, R, nIN, dist):
+        """
+        Simulates a stack of recordings from uniform random numbers.
+
+        Arguments
+        ---------
+        R : NumPy array
+            uniform random numbers of shape (k, m, 2, n, n), to simulate
+            k times the m recordings of the stack. The engine draws
+            them iteration after iteration, so that the simulations
+            do not depend on how many iterations are simulated at once.
+        nIN : int
+            the number of interneurons.
+        dist : NumPy array
+            the distances of every recording (see probabilities).
+
+        Returns
+        -------
+        An integer NumPy array of shape (k, m, n, n) with the recordings
+        in the *.syn encoding.
+        """
+        Pchem, Pelec = self.probabilities(nIN, dist)
+        n = Pchem.shape[-1]
+
+        offdiag = ~np.eye(n, dtype = bool)
+        upper = np.triu(offdiag)
+
+        chem = (R[:, :, 0] < Pchem) & offdiag
+        elec = (R[:, :, 1] < Pelec) & upper
+
+        return( encode(chem, elec) )
+
+    def fingerprint(self, recordings):
+        """
+        Returns a SHA-1 hexadecimal digest of the probabilities of
+        connection of a set of recordings, or None if the model does not
+        simulate recordings from its probabilities (it overrides
+        sample() or does not define probabilities()).
+
+        Arguments
+        ---------
+        recordings : dict
+            the distances of the recordings (see
+            RecordingEngine.recordings).
+        """
+        if type(self).sample.__func__ is not RecordingModel.sample.__func__:
+            return( None )
+
+        mysha = hashlib.sha1()
+        for key in sorted(recordings):
+            try:
+                Pchem, Pelec = self.probabilities(key[0], recordings[key])
+            except NotImplementedError:
+                return( None )
+            mysha.update( repr(key) )
+            for P in (Pchem, Pelec):
+                mysha.update( np.ascontiguousarray(P, dtype = float).tostring() )
+
+        return( mysha.hexdigest() )
+
+    def _blocks(self, nIN, n, prob):
+        """
+        Returns a n x n matrix with the values of the dictionary prob
+        in the II, IE, EI and EE blocks (prob keys are 'II', 'IE', 'EI'
+        and 'EE').
+        """
+        P = np.empty((n, n))
+        P[:nIN, :nIN] = prob['II']
+        P[:nIN, nIN:] = prob['IE']
+        P[nIN:, :nIN] = prob['EI']
+        P[nIN:, nIN:] = prob['EE']
+
+        return( P )
+
+class UniformRecordingModel(RecordingModel):
+    """
+    A model where the probabilities of connection only depend on the
+    type of the cells. Gap junctions between interneurons and
+    principal cells are not simulated.
+    """
+
+    def __init__(self, prob):
+        """
+        Arguments
+        ---------
+        prob : dict
+            the probability of connection of every block type (keys are
+            SYNAPSES, e.g. {'ii_chem': 0.29, 'ei': 0.08, ...}). Missing
+            keys have probability zero.
+        """
+        self.__prob = dict((key, float(prob.get(key, 0))) for key in SYNAPSES)
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """
+        Returns a model with the probabilities found in a dataset
+        (connections found divided by connections tested). Block
+        types that are not in the dataset have probability zero.
+        """
+        prob = dict()
+        for key in dataset.motif:
+            tested = dataset.motif[key]['tested']
+            if key in SYNAPSES and tested:
+                prob[key] = dataset.motif[key]['found']/tested
+
+        return( cls(prob) )
+
+    def probabilities(self, nIN, dist):
+        """
+        Returns the probabilities of connection of a stack of
+        recordings (see RecordingModel).
+        """
+        m, n = dist.shape[:2]
+        p = self.prob
+
+        Pchem = self._blocks(nIN, n, {'II': p['ii_chem'], 'IE': p['ie'],
+            'EI': p['ei'], 'EE': p['ee_chem']})
+        Pelec = self._blocks(nIN, n, {'II': p['ii_elec'], 'IE': 0,
+            'EI': 0, 'EE': p['ee_elec']})
+
+        return( np.repeat(Pchem[np.newaxis], m, axis = 0),
+            np.repeat(Pelec[np.newaxis], m, axis = 0) )
+
+    # only getters for private attributes
+    prob = property(lambda self: self.__prob)
+
+class DistanceRecordingModel(RecordingModel):
+    """
+    A model where the probabilities of connection are functions of the
+    intersomatic distance that depend on the type of the cells. Gap
+    junctions between interneurons and principal cells are not
+    simulated.
+    """
+    distances = True
+
+    def __init__(self, functions):
+        """
+        Arguments
+        ---------
+        functions : dict
+            the probability of connection (between 0 and 1) of every
+            block type as a function of the absolute distance (keys
+            are SYNAPSES). A number is a constant probability, and
+            missing keys have probability zero.
+        """
+        self.__functions = dict()
+        for key in SYNAPSES:
+            f = functions.get(key, 0)
+            if not callable(f):
+                f = lambda x, p = float(f): np.full(np.shape(x), p)
+            self.__functions[key] = f
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """
+        Returns a model with the sigmoid functions of chemical and
+        electrical synapses between interneurons (see fchem and felec
+        in inet.simulations), and the constant probabilities found in
+        the dataset for the other block types.
+        """
+        functions = UniformRecordingModel.from_dataset(dataset).prob
+        functions['ii_chem'] = lambda x: fchem(x)/100.
+        functions['ii_elec'] = lambda x: felec(x)/100.
+
+        return( cls(functions) )
+
+    def probabilities(self, nIN, dist):
+        """
+        Returns the probabilities of connection of a stack of
+        recordings (see RecordingModel).
+        """
+        dist = np.abs(dist)
+        f = self.functions
+
+        Pchem, Pelec = np.zeros(dist.shape), np.zeros(dist.shape)
+        I, E = slice(None, nIN), slice(nIN, None)
+
+        Pchem[:, I, I] = f['ii_chem'](dist[:, I, I])
+        Pchem[:, I, E] = f['ie'](dist[:, I, E])
+        Pchem[:, E, I] = f['ei'](dist[:, E, I])
+        Pchem[:, E, E] = f['ee_chem'](dist[:, E, E])
+
+        Pelec[:, I, I] = f['ii_elec'](dist[:, I, I])
+        Pelec[:, E, E] = f['ee_elec'](dist[:, E, E])
+
+        return( Pchem, Pelec )
+
+    # only getters for private attributes
+    functions = property(lambda self: self.__functions)
+
+class RecordingEngine(IIModel):
+    """
+    Simulates the recordings of a dataset with a RecordingModel and
+    counts the motifs of all counters. Recordings with the same number
+    of interneurons and cells are simulated at once.
+
+    It has the methods of IIModel (run, run_sequential, save, load),
+    and the motifs simulated are returned by simulated(motif). The 
+    methods that change the parameters of an IIModel (with_parameters,
+    sweep) or tilt its pairs of interneurons (run_importance) are not
+    available.
+    """
+    motiflist = IIMotifCounter.motiflist + EIMotifCounter.motiflist + \
+        IEMotifCounter.motiflist + EEMotifCounter.motiflist
+
+    def __init__(self, dataset, model):
+        """
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module)
+
+        model: RecordingModel
+            the model to simulate recordings. If model.distances is
+            True, the distances of every recording are replayed
+            (recordings without distances are not simulated).
+            Otherwise, only the configurations in dataset.IN are
+            replayed.
+        """
+        super(RecordingEngine, self).__init__(dataset)
+        self.__model = model
+
+        # distances of all recordings with nIN interneurons and n cells
+        self.__recordings = dict()
+        if model.distances:
+            for i in range(len(dataset)):
+                dist = dataset.dist(i)
+                if dist is None or np.isnan(dist).any():
+                    continue
+                nIN = int(dataset.filename(i)[0])
+                self.__recordings.setdefault((nIN, dist.shape[0]), list())
+                self.__recordings[(nIN, dist.shape[0])].append(dist)
+
+            for key in self.__recordings:
+                self.__recordings[key] = np.array(self.__recordings[key])
+        else:
+            for nIN, conf in enumerate(dataset.IN):
+                for label, nRecord in conf.items():
+                    if nRecord:
+                        n = _ncells[label]
+                        self.__recordings[(nIN, n)] = \
+                            np.full((nRecord, n, n), np.nan)
+
+        nRecord = sum(len(x) for x in self.__recordings.values())
+        print('{:2d} recordings replayed'.format(nRecord))
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates n_iter datasets with the model.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        groups = sorted(self.__recordings)
+        ndraws = [self.__recordings[key].size*2 for key in groups]
+        R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        start = 0
+        for (nIN, n), size in zip(groups, ndraws):
+            dist = self.__recordings[(nIN, n)]
+            myR = R[:, start:start+size].reshape(n_iter, len(dist), 2, n, n)
+            start += size
+
+            S = self.model.sample(myR, nIN, dist) # (k, m, n, n)
+
+            mycount = count_recordings(S, nIN)
+            for i, key in enumerate(self.motiflist):
+                mysim[:, i] += mycount[key].sum(axis = 1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # probabilities and random numbers (float), planes (bool), the
+        # recordings (int) and the padded planes of two blocks
+        nbytes = 0
+        for (nIN, n), dist in self.__recordings.items():
+            nbytes += len(dist) * (2*n*n*(8 + 8 + 2) + 8*n*n + 4*NMAX*NMAX)
+
+        return( nbytes )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the name of the model, the fingerprint
+        of the probabilities of the recordings replayed (see
+        RecordingModel.fingerprint) and, for uniform models, its
+        probabilities.
+
+        Raises TypeError if the model cannot be fingerprinted, so that
+        its simulations are not checkpointed or stored.
+        """
+        mydict = dict()
+        mydict['model'] = type(self.model).__name__
+        mydict['probabilities'] = self.model.fingerprint(self.recordings)
+        if isinstance(self.model, UniformRecordingModel):
+            mydict['prob'] = self.model.prob
+
+        try:
+            if mydict['probabilities'] is None:
+                raise TypeError('cannot fingerprint %s' %mydict['model'])
+        except TypeError:
+            raise
+
+        return( mydict )
+
+    def with_parameters(self, **kwargs):
+        """
+        Not available: the engine does not know the parameters of its
+        RecordingModel. Create an engine with another model instead.
+        """
+        raise NotImplementedError('the parameters of a RecordingEngine '
+            'cannot be changed, create an engine with another model')
+
+    def sweep(self, grid, n_iter, **kwargs):
+        """
+        Not available (see with_parameters).
+        """
+        raise NotImplementedError('a RecordingEngine cannot sweep '
+            'parameters, create an engine for every model')
+
+    def run_importance(self, motif, **kwargs):
+        """
+        Not available: the states of the pairs of cells of a 
+        RecordingModel cannot be tilted.
+        """
+        raise NotImplementedError('a RecordingEngine cannot be simulated '
+            'with importance sampling')
+
+    # only getters for private attributes
+    model = property(lambda self: self.__model)
+    recordings = property(lambda self: self.__recordings)
@@ -0,0 +1,383 @@
+"""
+ergm.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:28:36 UTC 2026
+
+Exponential random graph model (ERGM) of the connections between the
+interneurons of all recordings of a dataset. The probability of the
+II matrices of all recordings is
+
+P(G) = exp( theta . s(G) ) / Z(theta)
+
+where s(G) are the motifs found in all recordings (the terms of the
+model, e.g. ii_chem, ii_elec, ii_c2, ii_c2e and the triads ii_con,
+ii_div and ii_lin) and theta their parameters. Unlike the null models
+of inet.simulations, all terms are fitted jointly, so that a positive
+ii_c2 parameter means more reciprocal chemical synapses than expected
+from the chemical synapses, gap junctions and triads together.
+
+The parameters are fitted by Markov chain Monte Carlo maximum
+likelihood (Geyer and Thompson, 1992; Hunter and Handcock, 2006):
+
+1. theta starts at the maximum pseudo-likelihood estimate.
+2. The matrices are sampled at theta with Metropolis chains that
+   toggle one synapse at a time; the change of the motifs is
+   updated incrementally (see IIDeltaCounter in inet.motifs).
+   Chains run in parallel processes.
+3. theta is moved to the maximum of the importance-sampling
+   approximation of the likelihood, with shorter steps if the
+   effective sample size of the approximation is too small.
+
+Steps 2 and 3 are repeated until the motifs observed are within tol
+standard deviations of the motifs simulated. Standard errors are
+the square roots of the diagonal of the inverse covariance matrix of
+the motifs simulated at the estimate (the inverse Fisher information).
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.ergm import IIERGM
+>>> mydataset = DataLoader('../data/PV')
+>>> mymodel = IIERGM(mydataset)
+>>> myfit = mymodel.fit(seed = 0, n_jobs = 4)
+>>> myfit['param'], myfit['SE']
+"""
+
+from __future__ import division
+
+import numpy as np
+from scipy.optimize import minimize
+from multiprocessing import Pool
+
+from inet.utils import II_slice
+from inet.motifs import IIMotifCounter, IIDeltaCounter
+
+TERMS = ('ii_chem', 'ii_elec', 'ii_c2', 'ii_c2e', 'ii_con', 'ii_div',
+    'ii_lin')
+
+def _dyads(matrices):
+    """
+    returns the list of synapses that can be toggled, as tuples
+    (recording, synapse, i, j) where synapse is 'chem' or 'elec'
+    """
+    mylist = list()
+    for k, matrix in enumerate(matrices):
+        n = len(matrix)
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    mylist.append( (k, 'chem', i, j) )
+                if i < j:
+                    mylist.append( (k, 'elec', i, j) )
+
+    return( mylist )
+
+def _change(counter, synapse, i, j, terms):
+    """
+    returns the change of the terms if a synapse is toggled
+    """
+    if synapse == 'chem':
+        mydelta = counter.delta_chem(i, j)
+    else:
+        mydelta = counter.delta_elec(i, j)
+
+    return( np.array([mydelta[key] for key in terms], dtype = float) )
+
+def _toggle(counter, synapse, i, j):
+    """
+    toggles a synapse in a counter
+    """
+    if synapse == 'chem':
+        counter.toggle_chem(i, j)
+    else:
+        counter.toggle_elec(i, j)
+
+#-------------------------------------------------------------------------
+# Metropolis chains: every chain has its own random number generator,
+# seeded by (seed, round, chain), so that the samples do not depend on
+# the number of processes.
+#-------------------------------------------------------------------------
+
+_worker_data = None # matrices and terms of the model in every process
+
+def _init_worker(data):
+    """
+    stores the matrices and terms of the model in a process of the pool
+    """
+    global _worker_data
+    _worker_data = data
+
+def _run_chain(args):
+    """
+    samples the motifs of a Metropolis chain in a process of the pool
+    """
+    key, theta, n_samples, burnin, interval = args
+    matrices, terms = _worker_data
+
+    rng = np.random.RandomState(list(key))
+    counters = [IIDeltaCounter(matrix) for matrix in matrices]
+    dyads = _dyads(matrices)
+
+    stats = np.array([sum(c[t]['found'] for c in counters) for t in terms],
+        dtype = float)
+
+    n_steps = burnin + n_samples*interval
+    pick = rng.randint(len(dyads), size = n_steps)
+    logu = np.log(rng.random_sample(n_steps))
+
+    samples = np.empty((n_samples, len(terms)))
+    for step in range(n_steps):
+        k, synapse, i, j = dyads[pick[step]]
+        delta = _change(counters[k], synapse, i, j, terms)
+        if logu[step] < np.dot(theta, delta):
+            _toggle(counters[k], synapse, i, j)
+            stats += delta
+
+        sample, rest = divmod(step - burnin + 1, interval)
+        if step >= burnin and rest == 0:
+            samples[sample - 1] = stats
+
+    return( samples )
+
+def _ess(weights):
+    """
+    returns the effective sample size of normalized weights
+    """
+    return( 1/np.sum(weights**2) )
+
+def _weights(delta, S):
+    """
+    returns the importance weights of samples S (centered on the motifs
+    observed) for a change of the parameters delta
+    """
+    logw = np.dot(S, delta)
+    w = np.exp(logw - logw.max())
+
+    return( w/w.sum() )
+
+class IIERGM(object):
+    """
+    An exponential random graph model of the II matrices of a dataset
+    """
+
+    def __init__(self, dataset, terms = TERMS):
+        """
+        Reads the II matrices with more than one interneuron.
+
+        Arguments
+        ---------
+        dataset : DataLoaderObject (see DataLoader in inet module)
+
+        terms : tuple
+            the motifs of the model (see IIMotifCounter.motiflist).
+        """
+        try:
+            for key in terms:
+                if key not in IIMotifCounter.motiflist:
+                    raise ValueError("unknown term %s" %key)
+        except ValueError:
+            raise
+
+        self.__terms = tuple(terms)
+
+        self.__matrices = list()
+        for i in range(len(dataset)):
+            nPV = int(dataset.filename(i)[0])
+            if nPV > 1:
+                self.__matrices.append( II_slice(dataset.matrix(i), nPV) )
+
+        counters = [IIMotifCounter(matrix) for matrix in self.__matrices]
+        self.__observed = np.array([sum(c[key]['found'] for c in counters)
+            for key in self.__terms], dtype = float)
+
+    def mple(self):
+        """
+        Returns the maximum pseudo-likelihood estimate of the parameters,
+        a logistic regression of every synapse on the change of the
+        motifs when it is added given the rest of synapses.
+        """
+        counters = [IIDeltaCounter(matrix) for matrix in self.__matrices]
+
+        X, y = list(), list()
+        for k, synapse, i, j in _dyads(self.__matrices):
+            delta = _change(counters[k], synapse, i, j, self.__terms)
+            if synapse == 'chem':
+                present = counters[k].chem[i, j]
+            else:
+                present = counters[k].elec[i, j]
+            X.append( -delta if present else delta ) # change 0 -> 1
+            y.append( float(present) )
+        X, y = np.array(X), np.array(y)
+
+        def negloglik(theta):
+            """
+            returns the negative log-pseudo-likelihood and its gradient
+            """
+            eta = np.dot(X, theta)
+            p = 1/(1 + np.exp(-eta))
+            nll = np.sum(np.logaddexp(0, eta)) - np.dot(y, eta)
+            return( nll, np.dot(X.T, p - y) )
+
+        res = minimize(negloglik, np.zeros(len(self.__terms)), jac = True,
+            method = 'BFGS')
+
+        return( res.x )
+
+    def simulate(self, theta, n_samples = 1000, n_chains = 4, burnin = None,
+        interval = None, seed = None, n_jobs = 1):
+        """
+        Samples the motifs of the model with Metropolis chains.
+
+        Arguments
+        ---------
+        theta : 1D NumPy array
+            the parameters of the terms.
+        n_samples : int
+            the number of samples of every chain.
+        n_chains : int
+            the number of chains. Every chain starts at the matrices of
+            the dataset.
+        burnin : int
+            the number of toggles discarded at the start of every chain
+            (default 10 times the number of synapses that can be toggled).
+        interval : int
+            the number of toggles between samples (default the number of
+            synapses that can be toggled).
+        seed : int or tuple
+            seed for the random number generators. If None, a seed is
+            chosen randomly.
+        n_jobs : int
+            number of processes to run chains in parallel. The result
+            does not depend on n_jobs.
+
+        Returns
+        -------
+        A NumPy array of shape (n_chains*n_samples, terms) with the
+        motifs of every sample.
+        """
+        n_dyads = len(_dyads(self.__matrices))
+        if burnin is None:
+            burnin = 10*n_dyads
+        if interval is None:
+            interval = n_dyads
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        key = tuple(np.atleast_1d(seed))
+        theta = np.asarray(theta, dtype = float)
+        chains = [(key + (c,), theta, n_samples, burnin, interval)
+            for c in range(n_chains)]
+        data = (self.__matrices, self.__terms)
+
+        if n_jobs == 1:
+            _init_worker(data)
+            samples = map(_run_chain, chains)
+        else:
+            pool = Pool(n_jobs, initializer = _init_worker, initargs = (data,))
+            # the workers are stopped even if a chain fails
+            try:
+                samples = pool.map(_run_chain, chains)
+            finally:
+                pool.terminate()
+                pool.join()
+
+        return( np.concatenate(samples) )
+
+    def _maximize(self, theta, S, min_ess, max_newton = 50):
+        """
+        returns the maximum of the importance-sampling approximation of
+        the log-likelihood ratio around theta, with samples S at theta.
+        """
+        S = S - self.__observed # the approximation is centered at zero
+        delta = np.zeros(len(theta))
+        for _ in range(max_newton):
+            w = _weights(delta, S)
+            mean = np.dot(w, S)
+            cov = np.dot(w*(S - mean).T, S - mean)
+            step = np.dot(np.linalg.pinv(cov), -mean)
+            delta += step
+            if np.max(np.abs(step)) < 1e-8:
+                break
+
+        # shorter steps while the approximation is not reliable
+        while _ess(_weights(delta, S)) < min_ess*len(S) and \
+            np.max(np.abs(delta)) > 1e-6:
+            delta /= 2
+
+        return( theta + delta )
+
+    def fit(self, n_rounds = 20, n_samples = 1000, n_chains = 4,
+        burnin = None, interval = None, tol = 0.1, min_ess = 0.1,
+        seed = None, n_jobs = 1):
+        """
+        Fits the parameters by Markov chain Monte Carlo maximum
+        likelihood.
+
+        Arguments
+        ---------
+        n_rounds : int
+            the maximal number of simulations and updates of theta.
+        tol : float
+            the fit converges when the mean of every motif simulated is
+            within tol standard deviations of the motif observed.
+        min_ess : float
+            the minimal effective sample size (as a fraction of the
+            samples) to trust the approximation of the likelihood.
+        n_samples, n_chains, burnin, interval, seed, n_jobs : see
+            simulate
+
+        Returns
+        -------
+        A dictionary with the terms ('terms'), the parameters ('param')
+        and their standard errors ('SE'), the motifs observed
+        ('observed') and the mean of the motifs simulated at the
+        parameters ('expected'), the t-ratios between both ('tratio'),
+        whether the fit converged ('converged') and the number of rounds.
+        """
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        theta = self.mple()
+        converged = False
+        for n in range(n_rounds):
+            S = self.simulate(theta, n_samples, n_chains, burnin, interval,
+                seed = (seed, n), n_jobs = n_jobs)
+
+            sd = S.std(axis = 0)
+            sd[sd == 0] = np.inf
+            tratio = (S.mean(axis = 0) - self.__observed)/sd
+            if np.all(np.abs(tratio) < tol):
+                converged = True
+                break
+
+            theta = self._maximize(theta, S, min_ess)
+
+        if not converged: # samples at the last parameters
+            S = self.simulate(theta, n_samples, n_chains, burnin, interval,
+                seed = (seed, n_rounds), n_jobs = n_jobs)
+            sd = S.std(axis = 0)
+            sd[sd == 0] = np.inf
+            tratio = (S.mean(axis = 0) - self.__observed)/sd
+
+        # inverse Fisher information
+        SE = np.sqrt(np.diag(np.linalg.pinv(np.cov(S, rowvar = False))))
+
+        mydict = dict()
+        mydict['terms'] = self.__terms
+        mydict['param'] = theta
+        mydict['SE'] = SE
+        mydict['observed'] = self.__observed.copy()
+        mydict['expected'] = S.mean(axis = 0)
+        mydict['tratio'] = tratio
+        mydict['converged'] = converged
+        mydict['n_rounds'] = n + 1
+
+        return( mydict )
+
+    # only getters for private attributes
+    terms = property(lambda self: self.__terms)
+    matrices = property(lambda self: self.__matrices)
+    observed = property(lambda self: self.__observed)
@@ -0,0 +1,337 @@
+"""
+exact.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 21:47:22 UTC 2026
+
+Exact distributions of inhibitory motifs when chemical and electrical
+synapses are drawn independently with uniform probabilities (see
+IIUniformModel in inet/simulations.py).
+
+The number of motifs in a recording of n cells has a finite
+distribution (probability mass function, pmf):
+
+ii_chem, ii_elec, ii_c2, ii_c1e and ii_c2e are sums over independent
+pairs of cells, ii_con and ii_div are sums over independent cells (the
+synapses received or sent by every cell), and ii_lin is computed by
+enumerating the chemical configurations of n <= MAXENUM cells. The
+enumeration is grouped by the number of synapses, so that it does not
+depend on the probability of connection and is computed only once.
+
+Recordings of up to MAXFULL cells enumerate all configurations. Larger
+recordings enumerate them up to isomorphism: ii_lin only depends on the
+in- and out-degrees of the cells and on the number of reciprocal pairs
+(see count_lin in inet.bitplanes), so cells are added one at a time to
+the classes of configurations with the same degrees, weighted by the
+number of configurations of every class. The number of classes grows
+quickly (about 1.5e5 for 6 cells), and recordings of more than MAXENUM
+cells are not enumerated (ValueError).
+
+The distribution in a dataset is the convolution of the distributions
+of all its recordings. It is computed directly (the supports are
+small): sums of products of probabilities keep their relative
+precision, so that P-values far below the round-off errors of FFTs
+(about 1e-16) are exact.
+
+Example
+-------
+>>> from inet.exact import dataset_pmf, pvalue
+>>> pmf = dataset_pmf('ii_c2', [(2, 41), (3, 10), (4, 1)], 0.29, 0.43)
+>>> pvalue(pmf, 14)
+"""
+
+from __future__ import division
+
+from collections import defaultdict, Counter
+
+import numpy as np
+from scipy.stats import binom
+from scipy.special import comb
+
+from inet.bitplanes import NMAX, count_lin
+
+MAXFULL = 4 # largest recording to enumerate fully (2**12 configurations)
+MAXENUM = 6 # largest recording to enumerate up to isomorphism
+
+_lincache = dict() # enumerated ii_lin motifs for every number of cells
+
+def _binomial(n, p):
+    """
+    pmf of a binomial distribution with n trials and probability p
+    """
+    return( binom.pmf(np.arange(n+1), n, p) )
+
+def _power(pmf, k):
+    """
+    pmf of the sum of k independent variables with the same pmf
+    """
+    return( convolve([pmf]*k) )
+
+def _choose2(pmf):
+    """
+    pmf of X*(X-1)/2 when X has the pmf given
+    """
+    x = np.arange(len(pmf))
+    mypmf = np.zeros(x[-1]*(x[-1]-1)//2 + 1)
+    np.add.at(mypmf, x*(x-1)//2, pmf)
+
+    return( mypmf )
+
+def convolve(pmflist):
+    """
+    Computes the pmf of the sum of independent variables by direct
+    convolution of their pmfs.
+
+    Arguments
+    ---------
+    pmflist : list
+        a list of 1D NumPy arrays with the pmf of every variable.
+
+    Returns
+    -------
+    a 1D NumPy array with the pmf of the sum
+    """
+    mypmf = np.ones(1)
+    for pmf in pmflist:
+        mypmf = np.convolve(mypmf, pmf)
+
+    return( mypmf/mypmf.sum() )
+
+def _enumerate_lin(n):
+    """
+    returns the number of configurations of n cells with k chemical
+    synapses and l linear chains, enumerating all configurations
+    """
+    offdiag = [(i,j) for i in range(n) for j in range(n) if i != j]
+    m = len(offdiag) # number of possible chemical synapses
+    maxlin = n*(n-1)*(n-2)
+
+    H = np.zeros((m+1, maxlin+1), dtype=np.int64)
+    chunk = 2**16
+    for start in range(0, 2**m, chunk):
+        config = np.arange(start, min(start + chunk, 2**m), dtype=np.uint64)
+
+        # every bit of the configuration is a non-diagonal element
+        words = np.zeros(config.shape, dtype=np.uint64)
+        nsyn = np.zeros(config.shape, dtype=np.int64)
+        for b, (i,j) in enumerate(offdiag):
+            bit = (config >> np.uint64(b)) & np.uint64(1)
+            words |= bit << np.uint64(i*NMAX + j)
+            nsyn += bit.astype(np.int64)
+
+        index = nsyn*(maxlin+1) + count_lin(words)
+        H += np.bincount(index, minlength=H.size).reshape(H.shape)
+
+    return( H )
+
+def _pairstates(m):
+    """
+    yields the number of cells of a class of m cells that have no
+    synapse (a), a synapse from (b), a synapse to (c) and reciprocal
+    synapses (d) with a new cell, and the number of ways to choose them
+    """
+    for a in range(m+1):
+        for b in range(m+1-a):
+            for c in range(m+1-a-b):
+                d = m - a - b - c
+                yield a, b, c, d, comb(m, a, exact=True)*comb(m - a, b,
+                    exact=True)*comb(m - a - b, c, exact=True)
+
+def _add_cell(classes):
+    """
+    adds a cell to classes of configurations. A class is a sorted tuple
+    with the (in-degree, out-degree) of every cell and the number of
+    reciprocal pairs, and its value the number of configurations.
+    Cells with the same degrees are equivalent, and only the number of
+    them connected to the new cell is enumerated.
+    """
+    newclasses = defaultdict(int)
+    for (degrees, c2), weight in classes.items():
+        # (degrees of the old cells, in- and out-degree of the new
+        # cell, new reciprocal pairs)
+        partial = {((), 0, 0, 0): 1}
+        for (i, o), m in sorted(Counter(degrees).items()):
+            mypartial = defaultdict(int)
+            for a, b, c, d, ways in _pairstates(m):
+                mydegrees = ((i, o),)*a + ((i+1, o),)*b + ((i, o+1),)*c + \
+                    ((i+1, o+1),)*d
+                for (old, nin, nout, nc2), w in partial.items():
+                    mypartial[(old + mydegrees, nin + c + d, nout + b + d,
+                        nc2 + d)] += w*ways
+            partial = mypartial
+
+        for (old, nin, nout, nc2), w in partial.items():
+            newclasses[(tuple(sorted(old + ((nin, nout),))), c2 + nc2)] += \
+                weight*w
+
+    return( newclasses )
+
+def _orbit_lin(n):
+    """
+    returns the number of configurations of n cells with k chemical
+    synapses and l linear chains, enumerating classes of
+    configurations with the same degrees (see _add_cell). The last
+    cell only updates the number of synapses and chains of every
+    class, l = sum(in*out) - 2*c2.
+    """
+    classes = {(((0, 0),), 0): 1}
+    for _ in range(n - 2):
+        classes = _add_cell(classes)
+
+    H = np.zeros((n*(n-1) + 1, n*(n-1)*(n-2) + 1), dtype=np.int64)
+    for (degrees, c2), weight in classes.items():
+        k = sum(o for i, o in degrees)
+
+        # (in- and out-degree of the last cell, chains of the old cells)
+        partial = {(0, 0, -2*c2): 1}
+        for (i, o), m in Counter(degrees).items():
+            mypartial = defaultdict(int)
+            for a, b, c, d, ways in _pairstates(m):
+                lin = a*i*o + b*(i+1)*o + c*i*(o+1) + d*(i+1)*(o+1) - 2*d
+                for (nin, nout, l), w in partial.items():
+                    mypartial[(nin + c + d, nout + b + d, l + lin)] += w*ways
+            partial = mypartial
+
+        for (nin, nout, l), w in partial.items():
+            H[k + nin + nout, l + nin*nout] += weight*w
+
+    return( H )
+
+def lin_histogram(n):
+    """
+    Enumerates the chemical configurations between n cells and returns
+    the number of configurations with k synapses and l linear chains
+    (ii_lin). Recordings of up to MAXFULL cells are fully enumerated,
+    and larger ones up to isomorphism. Results are cached.
+
+    Arguments
+    ---------
+    n : int
+        the number of cells (at most MAXENUM)
+
+    Returns
+    -------
+    a 2D NumPy array whose element [k, l] is the number of
+    configurations with k chemical synapses and l linear motifs.
+    """
+    if n in _lincache:
+        return( _lincache[n] )
+
+    try:
+        if n > MAXENUM:
+            raise ValueError('cannot enumerate %d cells (maximum %d)' \
+                %(n, MAXENUM))
+    except ValueError:
+        raise
+
+    if n <= MAXFULL:
+        H = _enumerate_lin(n)
+    else:
+        H = _orbit_lin(n)
+
+    _lincache[n] = H
+    return( H )
+
+def recording_pmf(motif, n, pchem, pelec):
+    """
+    Computes the distribution of a motif in a recording of n cells.
+
+    Arguments
+    ---------
+    motif : str
+        a motif of IIMotifCounter (e.g., 'ii_c2')
+    n : int
+        the number of cells recorded
+    pchem : float
+        the probability of chemical synapses
+    pelec : float
+        the probability of electrical synapses
+
+    Returns
+    -------
+    a 1D NumPy array whose element k is the probability of finding k
+    motifs.
+    """
+    npairs = n*(n-1)//2
+
+    if motif == 'ii_chem':
+        return( _binomial(2*npairs, pchem) )
+
+    elif motif == 'ii_elec':
+        return( _binomial(npairs, pelec) )
+
+    elif motif == 'ii_c2':
+        return( _binomial(npairs, pchem**2) )
+
+    elif motif == 'ii_c2e':
+        return( _binomial(npairs, pelec*pchem**2) )
+
+    elif motif == 'ii_c1e':
+        # 0, 1 or 2 chemical synapses in every electrically coupled pair
+        pair = pelec*_binomial(2, pchem)
+        pair[0] += 1 - pelec
+        return( _power(pair, npairs) )
+
+    elif motif in ('ii_con', 'ii_div'):
+        # synapses received (or sent) by every cell are independent
+        cell = _choose2( _binomial(n-1, pchem) )
+        return( _power(cell, n) )
+
+    elif motif == 'ii_lin':
+        H = lin_histogram(n)
+        k = np.arange(H.shape[0])
+        weight = pchem**k * (1 - pchem)**(H.shape[0] - 1 - k)
+        return( weight.dot(H) )
+
+    else:
+        raise ValueError('unknown motif %s' %motif)
+
+def dataset_pmf(motif, PVconf, pchem, pelec):
+    """
+    Computes the distribution of a motif in a dataset of recordings.
+
+    Arguments
+    ---------
+    motif : str
+        a motif of IIMotifCounter (e.g., 'ii_c2')
+    PVconf : list
+        a list of tuples (nPV, nRecord) with the number of recordings
+        (nRecord) with nPV cells (see IIUniformModel.PVconf).
+    pchem : float
+        the probability of chemical synapses
+    pelec : float
+        the probability of electrical synapses
+
+    Returns
+    -------
+    a 1D NumPy array whose element k is the probability of finding k
+    motifs in the dataset.
+    """
+    pmflist = list()
+    for nPV, nRecord in PVconf:
+        pmflist += [recording_pmf(motif, nPV, pchem, pelec)]*nRecord
+
+    return( convolve(pmflist) )
+
+def pvalue(pmf, n_found, larger=True):
+    """
+    Returns the probability of finding more (or less) than n_found
+    motifs. This is the same definition used in inet.plots.barplot
+
+    Arguments
+    ---------
+    pmf : 1D NumPy array
+        the distribution of the motif.
+    n_found : int
+        the number of motifs found empirically.
+    larger: bool (default True)
+        if 'True' calculates the probability of finding more than
+        n_found motifs, otherwise the probability of finding less.
+    """
+    n_found = int(n_found)
+    if larger:
+        return( pmf[n_found+1:].sum() )
+    else:
+        return( pmf[:max(n_found, 0)].sum() )
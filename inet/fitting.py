@@ -0,0 +1,290 @@
+"""
+fitting.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:21:00 UTC 2026
+
+Fits the probability of connection between interneurons as a function
+of the intersomatic distance to a sigmoid function (see sigmoid in
+inet.simulations):
+
+f(x; A, C, r ) = A / ( 1 + exp((x-C)/r) )
+
+where A is the maximal probability (in percent), C is the half point
+and r the rate of the sigmoid.
+
+Every pair of cells tested is a Bernoulli trial with probability
+f(x)/100, and the parameters maximize the binomial likelihood of all
+pairs tested in the dataset. Confidence intervals of the parameters
+are obtained by bootstrapping the pairs, with the resamples fitted in
+parallel.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.fitting import fit_dataset
+>>> mydataset = DataLoader('../data/PV')
+>>> myfit = fit_dataset(mydataset, 'chem', n_boot = 1000, seed = 0)
+>>> myfit['param'], myfit['CI']
+"""
+
+from __future__ import division
+
+import numpy as np
+from scipy.optimize import minimize
+from multiprocessing import Pool
+
+from inet.utils import II_slice
+from inet.bitplanes import decode
+
+# initial guess and bounds of (A, C, r), as in the notebook
+# Sigmoids function to model connection probabilities
+PINIT = (50., 150., 15.)
+BOUNDS = ((0., 100.), (0., 300.), (15., 100.))
+
+_EPS = 1e-12 # probabilities are clipped to (EPS, 1-EPS)
+
+def tested_pairs(dataset, synapse = 'chem', groups = False):
+    """
+    Returns the distances between the interneurons of every pair tested
+    in a dataset and whether they were connected. Recordings without
+    distances are not used.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    synapse : str
+        'chem' for chemical synapses (every ordered pair of cells is
+        tested) or 'elec' for electrical synapses (every unordered
+        pair is tested).
+    groups : bool
+        if True, returns also the index of the recording of every pair.
+
+    Returns
+    -------
+    A tuple of 1D NumPy arrays (x, y) with the absolute distance of
+    every pair tested and 1 if it was connected, 0 otherwise, or
+    (x, y, recording) if groups is True.
+    """
+    try:
+        if synapse not in ('chem', 'elec'):
+            raise ValueError("synapse must be 'chem' or 'elec'")
+    except ValueError:
+        raise
+
+    x, y, recording = list(), list(), list()
+    for i in range(len(dataset)):
+        nPV = int(dataset.filename(i)[0])
+        if nPV < 2:
+            continue
+
+        dist = II_slice(dataset.dist(i), nPV)
+        if np.isnan(dist).any():
+            continue
+
+        chem, elec = decode(II_slice(dataset.matrix(i), nPV))
+        if synapse == 'chem':
+            pre, post = np.nonzero(~np.eye(nPV, dtype = bool))
+            found = chem
+        else:
+            pre, post = np.triu_indices(nPV, 1)
+            found = elec
+
+        x.append( np.abs(dist[pre, post]) )
+        y.append( found[pre, post].astype(int) )
+        recording.append( np.full(len(pre), i, dtype = int) )
+
+    if groups:
+        return( np.concatenate(x), np.concatenate(y), 
+            np.concatenate(recording) )
+
+    return( np.concatenate(x), np.concatenate(y) )
+
+def negloglik(param, x, y, weights = None):
+    """
+    Returns the negative log-likelihood of the sigmoid parameters and
+    its gradient.
+
+    Arguments
+    ---------
+    param : tuple
+        the parameters (A, C, r) of the sigmoid function.
+    x : 1D NumPy array
+        the distances of the pairs tested.
+    y : 1D NumPy array
+        1 if the pair was connected, 0 otherwise.
+    weights : 1D NumPy array
+        the number of times every pair is counted (default one).
+
+    Returns
+    -------
+    A tuple with the negative log-likelihood and a NumPy array with
+    its gradient.
+    """
+    A, C, r = param
+    if weights is None:
+        weights = np.ones(len(x))
+
+    s = 1/(1 + np.exp((x - C)/r))
+    p = np.clip(A*s/100., _EPS, 1 - _EPS)
+
+    nll = -np.dot(weights, y*np.log(p) + (1 - y)*np.log(1 - p))
+
+    # derivatives of the probability with respect to A, C and r
+    dp = np.array([s/100., A*s*(1 - s)/(100.*r),
+        A*s*(1 - s)*(x - C)/(100.*r*r)])
+    dnll = -np.dot(dp, weights*(y/p - (1 - y)/(1 - p)))
+
+    return( nll, dnll )
+
+def fit_sigmoid(x, y, weights = None, p0 = PINIT, bounds = BOUNDS):
+    """
+    Fits the sigmoid function by maximum likelihood.
+
+    Arguments
+    ---------
+    x : 1D NumPy array
+        the distances of the pairs tested.
+    y : 1D NumPy array
+        1 if the pair was connected, 0 otherwise.
+    weights : 1D NumPy array
+        the number of times every pair is counted (default one).
+    p0 : tuple
+        the initial guess of (A, C, r).
+    bounds : tuple
+        the lower and upper bounds of A, C and r.
+
+    Returns
+    -------
+    A tuple of floats with the parameters (A, C, r)
+    """
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+
+    res = minimize(negloglik, p0, args = (x, y, weights), jac = True,
+        method = 'L-BFGS-B', bounds = bounds)
+
+    return( tuple(float(p) for p in res.x) )
+
+#-------------------------------------------------------------------------
+# Bootstrap: every resample draws the pairs with its own random number
+# generator, seeded by the pair (seed, resample), so that the result
+# does not depend on the number of processes.
+#-------------------------------------------------------------------------
+
+_worker_data = None # pairs tested and options fitted in every process
+
+def _init_worker(data):
+    """
+    stores the pairs tested to fit in a process of the pool
+    """
+    global _worker_data
+    _worker_data = data
+
+def _fit_resample(args):
+    """
+    fits a resample of the pairs tested in a process of the pool
+    """
+    seed, resample = args
+    x, y, p0, bounds = _worker_data
+
+    rng = np.random.RandomState([seed, resample])
+    weights = np.bincount(rng.randint(len(x), size = len(x)),
+        minlength = len(x))
+
+    return( fit_sigmoid(x, y, weights, p0, bounds) )
+
+def bootstrap(x, y, n_boot = 1000, seed = None, n_jobs = 1,
+    p0 = PINIT, bounds = BOUNDS):
+    """
+    Fits the sigmoid function to resamples of the pairs tested, drawn
+    with replacement. Resamples are weights of the pairs, so that the
+    likelihood is not computed on copies of the data.
+
+    Arguments
+    ---------
+    x : 1D NumPy array
+        the distances of the pairs tested.
+    y : 1D NumPy array
+        1 if the pair was connected, 0 otherwise.
+    n_boot : int
+        the number of resamples.
+    seed : int
+        seed for the random number generators. If None, a seed is
+        chosen randomly.
+    n_jobs : int
+        number of processes to fit resamples in parallel. The result
+        does not depend on n_jobs.
+    p0, bounds : see fit_sigmoid
+
+    Returns
+    -------
+    A NumPy array of shape (n_boot, 3) with the parameters (A, C, r)
+    of every resample.
+    """
+    if seed is None:
+        seed = np.random.RandomState().randint(2**31)
+
+    data = (np.asarray(x, dtype = float), np.asarray(y, dtype = float),
+        p0, bounds)
+    resamples = [(seed, i) for i in range(n_boot)]
+
+    if n_jobs == 1:
+        _init_worker(data)
+        params = map(_fit_resample, resamples)
+    else:
+        pool = Pool(n_jobs, initializer = _init_worker, initargs = (data,))
+        # the workers are stopped even if a fit fails
+        try:
+            params = pool.map(_fit_resample, resamples)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    return( np.array(params) )
+
+def fit_dataset(dataset, synapse = 'chem', n_boot = 0, confident = 0.975,
+    seed = None, n_jobs = 1):
+    """
+    Fits the probability of connection as a function of the distance
+    between the interneurons of a dataset.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    synapse : str
+        'chem' for chemical synapses or 'elec' for electrical synapses.
+    n_boot : int
+        the number of bootstrap resamples (default 0, no confidence
+        intervals).
+    confident : float
+        value of confidence. For a two-tailed 95% confident interval
+        confidence is 0.975 (default, as in inet.math).
+    seed, n_jobs : see bootstrap
+
+    Returns
+    -------
+    A dictionary with the parameters (A, C, r) ('param'), and if
+    n_boot > 0 the lower and upper limits of the confidence
+    intervals of the parameters ('CI', an array of shape (2, 3)) and
+    the parameters of every resample ('bootstrap'). The parameters can
+    be given to IISigmoidModel (e.g., chem_param = myfit['param'])
+    """
+    x, y = tested_pairs(dataset, synapse)
+
+    mydict = dict()
+    mydict['param'] = fit_sigmoid(x, y)
+    mydict['found'] = int(y.sum())
+    mydict['tested'] = len(y)
+
+    if n_boot:
+        params = bootstrap(x, y, n_boot, seed, n_jobs)
+        mydict['CI'] = np.percentile(params, [100*(1 - confident),
+            100*confident], axis = 0)
+        mydict['bootstrap'] = params
+
+    return( mydict )
@@ -19,6 +19,7 @@ Example:
 from __future__ import division
 
 import glob, os
+import hashlib
 import numpy as np
 
 import warnings
@@ -262,6 +263,23 @@ class DataLoader(object):
         """
         return self.experiment[index]['dist']
 
+    def fingerprint(self):
+        """
+        returns a SHA-1 hexadecimal digest of the filenames, matrices 
+        and distances of all experiments. It does not depend on the
+        order in which the files were loaded, and identifies the 
+        dataset used to obtain simulations (see inet.store).
+        """
+        mysha = hashlib.sha1()
+        for mydict in sorted(self.experiment, key=lambda x: x['fname']):
+            mysha.update( mydict['fname'].encode('utf-8') )
+            mysha.update( np.ascontiguousarray(mydict['matrix'], 
+                dtype='<i8').tostring() )
+            mysha.update( np.ascontiguousarray(mydict['dist'], 
+                dtype='<f8').tostring() )
+
+        return( mysha.hexdigest() )
+
     # only getters for private attributes 
     IN = property(lambda self: self.__IN)
     nPC = property(lambda self: self.__nPC)
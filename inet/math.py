@@ -14,6 +14,7 @@ import numpy as np
 
 from scipy.stats import t as T
 from scipy.stats import norm
+from scipy.stats import beta
 
 def binomial_CI(trials, p_success, confident=0.975):
     """
@@ -74,6 +75,50 @@ def binomial_CI(trials, p_success, confident=0.975):
 
     return z * np.sqrt( (p * (1-p))/n )
 
+def clopper_pearson(trials, successes, confident=0.975):
+    """
+    Computes the exact (Clopper-Pearson) confident interval of the 
+    proportion of successes in a binomial process. It is given by the
+    quantiles of the beta distribution:
+
+    lower = B(alpha; k, n-k+1), upper = B(1-alpha; k+1, n-k)
+
+    where k is the number of successes, n is the number of trials and
+    alpha = 1 - confident. Unlike binomial_CI, it is valid for 
+    proportions close or equal to zero.
+
+    For details check:
+    https://en.wikipedia.org/wiki/Binomial_proportion_confidence_interval
+
+    Arguments:
+    ----------
+    trials      -- (int) number of samples or trials
+    successes   -- (int) number of successes
+    confident   -- (float) value of confidence e.g. 0.95 for 95%. For a
+                    two-tailed 95% confident interval confidence is 0.975
+                    (default).
+
+    Returns:
+    --------
+    A tuple with the lower and the upper confident intervals
+    """
+    n = trials
+    k = successes
+
+    # test number of successes between 0 and number of trials
+    try:
+        if k < 0 or k > n:
+            raise ValueError('Successes must be between 0 and trials')
+    except ValueError:
+        raise
+
+    alpha = 1 - confident
+
+    lower = beta.ppf(alpha, k, n - k + 1) if k > 0 else 0.0
+    upper = beta.ppf(1 - alpha, k + 1, n - k) if k < n else 1.0
+
+    return( lower, upper )
+
 def linear_CI(fit, data, confident=0.975):
     """
     Computes the upper and lower confident intervals for the 
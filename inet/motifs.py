@@ -16,6 +16,8 @@ from scipy.misc import comb
 from itertools import permutations
 from terminaltables import AsciiTable
 
+from inet.bitplanes import decode, encode
+
 class MotifCounter(dict):
     """
     General porpose class that involves an extended dictionary 
@@ -368,6 +370,205 @@ class IIMotifCounter(MotifCounter):
             setattr(self, key+'_found' ,self[key]['found' ]) 
     
     
+class IIDeltaCounter(IIMotifCounter):
+    """
+    An IIMotifCounter object that keeps a connectivity matrix between
+    inhibitory neurons and updates the motifs found when a single
+    chemical or electrical synapse is added or removed. The in- and
+    out-degrees of the cells are kept with the matrix, so that every
+    update takes constant time instead of a full recount. This is
+    what Markov chains over networks (e.g., rewiring) need.
+
+    Adding a chemical synapse i->j changes the motifs by:
+
+    ii_chem : 1
+    ii_c2   : A[j,i]
+    ii_c1e  : E[i,j]
+    ii_c2e  : E[i,j]*A[j,i]
+    ii_con  : in-degree of j
+    ii_div  : out-degree of i
+    ii_lin  : in-degree of i + out-degree of j - 2*A[j,i]
+
+    and adding a gap junction i-j by:
+
+    ii_elec : 1
+    ii_c1e  : A[i,j] + A[j,i]
+    ii_c2e  : A[i,j]*A[j,i]
+
+    where A and E are the chemical and electrical synapses (and the
+    degrees) without the synapse added. Removing a synapse changes the
+    motifs by the same values with opposite sign.
+
+    Example
+    -------
+    >>> mycounter = IIDeltaCounter(n = 4) # empty matrix of 4 cells
+    >>> mycounter.toggle_chem(0, 1) # adds a chemical synapse
+    >>> mycounter.ii_chem_found
+    1
+    """
+
+    def __init__(self, matrix = None, n = None):
+        """
+        Counts connectivity motifs between inhibitory neurons
+
+        Argument
+        --------
+        matrix: 2D NumpyArray
+            a connectivity matrix in the *.syn encoding (see decode in
+            inet.bitplanes).
+        n : int
+            the number of cells of an empty matrix, if matrix is None.
+        """
+        try:
+            if matrix is None and n is None:
+                raise ValueError("matrix or n must be given")
+        except ValueError:
+            raise
+
+        if matrix is None:
+            matrix = np.zeros((n, n), dtype = int)
+
+        chem, elec = decode(matrix)
+        self.__chem = chem.astype(int)
+        self.__elec = elec.astype(int)
+        self.__indegree = self.__chem.sum(0)
+        self.__outdegree = self.__chem.sum(1)
+
+        # canonical encoding, so that gap junctions are counted once
+        super(IIDeltaCounter, self).__init__(self.matrix)
+
+    def __call__(self, matrix = None, n = None):
+        """
+        Returns a IIDeltaCounter object with counts of motifs
+        """
+        return IIDeltaCounter(matrix, n)
+
+    def _checkpair(self, i, j):
+        """
+        raises ValueError if i and j are not two different cells
+        """
+        try:
+            if i == j:
+                raise ValueError("a synapse requires two different cells")
+            if not (0 <= i < self.n and 0 <= j < self.n):
+                raise ValueError("cells must be between 0 and %d" %(self.n-1))
+        except ValueError:
+            raise
+
+    def delta_chem(self, pre, post):
+        """
+        Returns a dictionary with the change of the motifs found if the
+        chemical synapse pre->post is toggled, without toggling it.
+        """
+        self._checkpair(pre, post)
+        A, E = self.__chem, self.__elec
+
+        s = 1 - 2*A[pre, post] # +1 to add, -1 to remove
+        back = A[post, pre]
+
+        # degrees without the synapse toggled
+        indeg = self.__indegree[post] - A[pre, post]
+        outdeg = self.__outdegree[pre] - A[pre, post]
+
+        mydelta = dict()
+        mydelta['ii_chem'] = s
+        mydelta['ii_elec'] = 0
+        mydelta['ii_c1e'] = s*E[pre, post]
+        mydelta['ii_c2e'] = s*E[pre, post]*back
+        mydelta['ii_c2'] = s*back
+        mydelta['ii_con'] = s*indeg
+        mydelta['ii_div'] = s*outdeg
+        mydelta['ii_lin'] = s*(self.__indegree[pre] +
+            self.__outdegree[post] - 2*back)
+
+        return( mydelta )
+
+    def delta_elec(self, i, j):
+        """
+        Returns a dictionary with the change of the motifs found if the
+        gap junction between i and j is toggled, without toggling it.
+        """
+        self._checkpair(i, j)
+        A = self.__chem
+
+        s = 1 - 2*self.__elec[i, j] # +1 to add, -1 to remove
+
+        mydelta = dict.fromkeys(self.motiflist, 0)
+        mydelta['ii_elec'] = s
+        mydelta['ii_c1e'] = s*(A[i, j] + A[j, i])
+        mydelta['ii_c2e'] = s*A[i, j]*A[j, i]
+
+        return( mydelta )
+
+    def _update(self, mydelta):
+        """
+        adds the changes of the motifs found
+        """
+        for key in self.motiflist:
+            if mydelta[key]:
+                self[key]['found'] += int(mydelta[key])
+                setattr(self, key+'_found', self[key]['found'])
+
+    def toggle_chem(self, pre, post):
+        """
+        Adds the chemical synapse pre->post if it does not exist, or
+        removes it otherwise, and updates the motifs found.
+
+        Returns
+        -------
+        A dictionary with the change of the motifs found.
+        """
+        mydelta = self.delta_chem(pre, post)
+        s = mydelta['ii_chem']
+
+        self.__chem[pre, post] += s
+        self.__indegree[post] += s
+        self.__outdegree[pre] += s
+        self._update(mydelta)
+
+        return( mydelta )
+
+    def toggle_elec(self, i, j):
+        """
+        Adds a gap junction between i and j if it does not exist, or
+        removes it otherwise, and updates the motifs found.
+
+        Returns
+        -------
+        A dictionary with the change of the motifs found.
+        """
+        mydelta = self.delta_elec(i, j)
+        s = mydelta['ii_elec']
+
+        self.__elec[i, j] += s
+        self.__elec[j, i] += s
+        self._update(mydelta)
+
+        return( mydelta )
+
+    def recount(self):
+        """
+        Returns an IIMotifCounter object with the motifs of the current
+        matrix counted from scratch.
+        """
+        return( IIMotifCounter(self.matrix) )
+
+    def verify(self):
+        """
+        Returns True if the motifs found are those of a full recount
+        of the current matrix.
+        """
+        mycount = self.recount()
+        return( all(self[key]['found'] == mycount[key]['found']
+            for key in self.motiflist) )
+
+    # only getters for private attributes
+    chem = property(lambda self: self.__chem.astype(bool))
+    elec = property(lambda self: self.__elec.astype(bool))
+    matrix = property(lambda self: encode(self.__chem, self.__elec))
+    n = property(lambda self: self.__chem.shape[0])
+
+
 class IIConMotifCounter(MotifCounter):
     """
     Create a MotifCounter type object with convergent connectivity motifs
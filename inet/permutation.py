@@ -0,0 +1,204 @@
+"""
+permutation.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:22:30 UTC 2026
+
+Permutation tests of the dependence of the connection probability on
+the intersomatic distance. Under the null hypothesis, the connections
+found do not depend on the distance, and the distances of the pairs
+tested can be permuted among the pairs of the same recording (or of
+recordings with the same number of interneurons).
+
+Permuting the distances is the same as permuting the connections
+found among the pairs, which is done for many permutations at once:
+every permutation sorts random keys within every stratum of pairs, and
+the statistics of all permutations are computed with matrix products:
+
+slope : the slope of the linear regression of the connections on the
+        distance.
+bins  : the probability of connection in every bin of distances, and
+        the chi-square statistic of their heterogeneity.
+
+P-values are (1 + b)/(1 + n_perm), where b is the number of
+permutations with a statistic at least as extreme as the one
+observed. Within strata, the slope of the permutations is not centred
+at zero (strata with more connections may have other distances), so
+two-sided p-values count the permutations at least as far from the
+mean of the permutations, which is computed exactly.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.permutation import permutation_test
+>>> mydataset = DataLoader('../data/PV')
+>>> mytest = permutation_test(mydataset, 'chem', n_perm = 10**5, seed = 0)
+>>> mytest['slope']['pvalue']
+"""
+
+from __future__ import division
+
+import numpy as np
+
+from inet.fitting import tested_pairs
+
+BINS = np.arange(0, 351, 50) # bins of distances (um), as in the notebook
+
+def _pvalue(null, observed, alternative, center = 0.):
+    """
+    returns the permutation p-value of an observed statistic (two-sided
+    p-values are distances to the center of the permutations)
+    """
+    if alternative == 'greater':
+        b = np.sum(null >= observed, axis = 0)
+    elif alternative == 'less':
+        b = np.sum(null <= observed, axis = 0)
+    else:
+        b = np.sum(np.abs(null - center) >= np.abs(observed - center),
+            axis = 0)
+
+    return( (1 + b)/(1 + len(null)) )
+
+def permute(y, strata, n_perm, rng):
+    """
+    Permutes the connections found among the pairs of every stratum.
+
+    Arguments
+    ---------
+    y : 1D NumPy array
+        1 if the pair was connected, 0 otherwise.
+    strata : 1D NumPy array
+        an integer label of the stratum of every pair.
+    n_perm : int
+        the number of permutations.
+    rng : RandomState
+        the random number generator. The random numbers are drawn one
+        permutation after the other.
+
+    Returns
+    -------
+    A NumPy array of shape (n_perm, len(y)) with one permutation of
+    the connections per row.
+    """
+    # keys are sorted first by stratum and then randomly
+    labels = np.unique(strata, return_inverse = True)[1]
+    order = np.argsort(labels, kind = 'mergesort')
+
+    keys = labels[order] + rng.random_sample((n_perm, len(y)))
+    index = order[np.argsort(keys, axis = 1)]
+
+    perm = np.empty((n_perm, len(y)), dtype = y.dtype)
+    perm[:, order] = y[index]
+
+    return( perm )
+
+def permutation_test(dataset, synapse = 'chem', n_perm = 10**5,
+    strata = 'recording', bins = BINS, alternative = 'two-sided',
+    seed = None, max_memory = 2**27):
+    """
+    Tests whether the probability of connection between interneurons
+    depends on the intersomatic distance.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    synapse : str
+        'chem' for chemical synapses or 'elec' for electrical synapses
+        (see tested_pairs in inet.fitting).
+    n_perm : int
+        the number of permutations.
+    strata : str
+        'recording' permutes the distances among the pairs of every
+        recording, and 'size' among the pairs of all recordings with
+        the same number of interneurons.
+    bins : 1D NumPy array
+        the edges of the bins of distances.
+    alternative : str
+        the alternative hypothesis for the slope: 'two-sided'
+        (default), 'less' (the probability decreases with distance)
+        or 'greater'.
+    seed : int
+        seed for the random number generator.
+    max_memory : int
+        maximal number of bytes used to compute permutations at once
+        (default 128 MB). The result does not depend on it.
+
+    Returns
+    -------
+    A dictionary with the dictionaries:
+    'slope' with the slope observed ('observed'), its mean in the
+    permutations ('expected') and its p-value,
+    'bins' with the edges, the pairs found and tested, the probability
+    of connection ('prob') and the p-values of a probability larger
+    ('pvalue_larger') or smaller ('pvalue_smaller') than in the
+    permutations in every bin,
+    'chi2' with the chi-square statistic of the bins and its p-value.
+    """
+    try:
+        if strata not in ('recording', 'size'):
+            raise ValueError("strata must be 'recording' or 'size'")
+        if alternative not in ('two-sided', 'less', 'greater'):
+            raise ValueError("alternative must be 'two-sided', 'less' \
+or 'greater'")
+    except ValueError:
+        raise
+
+    x, y, recording = tested_pairs(dataset, synapse, groups = True)
+    if strata == 'size':
+        recording = np.array([int(dataset.filename(i)[0]) for i in recording])
+
+    # linear statistics of the connections: slope and found per bin
+    xc = (x - x.mean())/np.sum((x - x.mean())**2)
+    onehot = (np.digitize(x, bins) == np.arange(1, len(bins))[:, np.newaxis])
+    onehot = onehot.T.astype(float) # (pairs, bins)
+
+    tested = onehot.sum(0)
+    p0 = y.mean()
+    var = tested*p0*(1 - p0)
+    var[var == 0] = np.inf
+
+    def statistics(Y):
+        """
+        returns the slope, found per bin and chi-square of connections
+        """
+        found = np.dot(Y, onehot)
+        chi2 = np.sum((found - tested*p0)**2/var, axis = -1)
+        return( np.dot(Y, xc), found, chi2 )
+
+    slope, found, chi2 = statistics(y.astype(float))
+
+    # every pair has the mean connections of its stratum on average
+    _, stratum = np.unique(recording, return_inverse = True)
+    ymean = np.bincount(stratum, y)/np.bincount(stratum)
+    expected = np.dot(ymean[stratum], xc)
+
+    rng = np.random.RandomState(seed)
+    chunk = max(1, int(max_memory//(len(y)*8*4)))
+
+    null_slope = np.empty(n_perm)
+    null_found = np.empty((n_perm, len(tested)))
+    null_chi2 = np.empty(n_perm)
+    for start in range(0, n_perm, chunk):
+        stop = min(start + chunk, n_perm)
+        Y = permute(y, recording, stop - start, rng).astype(float)
+        null_slope[start:stop], null_found[start:stop], \
+            null_chi2[start:stop] = statistics(Y)
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        prob = found/tested
+
+    mydict = dict()
+    mydict['slope'] = {'observed': slope, 'expected': expected,
+        'pvalue': _pvalue(null_slope, slope, alternative, expected)}
+    mydict['bins'] = {'edges': bins, 'found': found, 'tested': tested,
+        'prob': prob,
+        'pvalue_larger': _pvalue(null_found, found, 'greater'),
+        'pvalue_smaller': _pvalue(null_found, found, 'less')}
+    mydict['chi2'] = {'observed': chi2,
+        'pvalue': _pvalue(null_chi2, chi2, 'greater')}
+    mydict['n_perm'] = n_perm
+
+    return( mydict )
@@ -0,0 +1,203 @@
+"""
+resampling.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:21:33 UTC 2026
+
+Bootstrap and jackknife of the recordings of a dataset. Unlike
+binomial_CI (see inet.math), the confident intervals take into account
+the variability between recordings.
+
+The motifs found and tested in every recording are counted only once
+in a table (recordings x motifs). A replicate of the dataset is a
+vector with the number of times every recording is drawn, and the
+probability of every motif in all replicates is then obtained with two
+matrix products:
+
+P = (counts . found) / (counts . tested)
+
+where counts is a (replicates x recordings) matrix.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.resampling import bootstrap
+>>> mydataset = DataLoader('../data/PV')
+>>> mydict = bootstrap(mydataset, n_boot = 10000, seed = 0)
+>>> mydict['ii_c2']['CI']
+"""
+
+from __future__ import division
+
+import numpy as np
+
+def count_table(dataset, motifs = None):
+    """
+    Returns the motifs found and tested in every recording of a dataset.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    motifs : list
+        the motifs to count (default all motifs of the dataset).
+
+    Returns
+    -------
+    A tuple (motifs, found, tested), where found and tested are integer
+    NumPy arrays of shape (recordings, motifs).
+    """
+    if motifs is None:
+        motifs = sorted(dataset.motif.keys())
+
+    found = np.zeros((len(dataset), len(motifs)), dtype = int)
+    tested = np.zeros((len(dataset), len(motifs)), dtype = int)
+    for i in range(len(dataset)):
+        mymotif = dataset.motifs(i)
+        for j, key in enumerate(motifs):
+            found[i, j] = mymotif[key]['found']
+            tested[i, j] = mymotif[key]['tested']
+
+    return( list(motifs), found, tested )
+
+def bootstrap_counts(n_record, n_boot, rng = None):
+    """
+    Returns the number of times every recording is drawn with
+    replacement in every bootstrap replicate.
+
+    Arguments
+    ---------
+    n_record : int
+        the number of recordings.
+    n_boot : int
+        the number of replicates.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    An integer NumPy array of shape (n_boot, n_record)
+    """
+    if rng is None:
+        rng = np.random
+
+    return( rng.multinomial(n_record, np.ones(n_record)/n_record,
+        size = n_boot) )
+
+def jackknife_counts(n_record):
+    """
+    Returns the number of times every recording is in every
+    leave-one-out replicate (replicate i leaves out recording i).
+
+    Returns
+    -------
+    An integer NumPy array of shape (n_record, n_record)
+    """
+    return( 1 - np.eye(n_record, dtype = int) )
+
+def replicate_probabilities(counts, found, tested):
+    """
+    Computes the probability of every motif in every replicate.
+
+    Arguments
+    ---------
+    counts : NumPy array
+        the number of times every recording is in every replicate,
+        of shape (replicates, recordings).
+    found : NumPy array
+        the motifs found in every recording (recordings, motifs).
+    tested : NumPy array
+        the motifs tested in every recording (recordings, motifs).
+
+    Returns
+    -------
+    A NumPy array of shape (replicates, motifs) with the motifs found
+    divided by the motifs tested in every replicate (NaN if no motif
+    was tested).
+    """
+    nfound = np.dot(counts, found).astype(float)
+    ntested = np.dot(counts, tested).astype(float)
+
+    P = np.full(nfound.shape, np.nan)
+    np.divide(nfound, ntested, out = P, where = ntested > 0)
+
+    return( P )
+
+def bootstrap(dataset, n_boot = 10000, confident = 0.975, seed = None,
+    motifs = None):
+    """
+    Computes percentile bootstrap confident intervals of the
+    probabilities of the motifs, resampling the recordings of a dataset.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    n_boot : int
+        the number of bootstrap replicates.
+    confident : float
+        value of confidence. For a two-tailed 95% confident interval
+        confidence is 0.975 (default), as in inet.math.
+    seed : int
+        seed for the random number generator.
+    motifs : list
+        the motifs (default all motifs of the dataset).
+
+    Returns
+    -------
+    A dictionary whose keys are the motifs and values are dictionaries
+    with the probability in the dataset ('P'), the standard error ('SE')
+    and the lower and upper confident intervals ('CI').
+    """
+    motifs, found, tested = count_table(dataset, motifs)
+
+    rng = np.random.RandomState(seed)
+    counts = bootstrap_counts(len(found), n_boot, rng)
+    P = replicate_probabilities(counts, found, tested)
+    P0 = replicate_probabilities(np.ones((1, len(found))), found, tested)[0]
+
+    lower = np.nanpercentile(P, 100*(1 - confident), axis = 0)
+    upper = np.nanpercentile(P, 100*confident, axis = 0)
+    SE = np.nanstd(P, axis = 0, ddof = 1)
+
+    mydict = dict()
+    for j, key in enumerate(motifs):
+        mydict[key] = {'P': P0[j], 'SE': SE[j], 'CI': (lower[j], upper[j])}
+
+    return( mydict )
+
+def jackknife(dataset, motifs = None):
+    """
+    Computes the jackknife standard errors and bias of the
+    probabilities of the motifs, leaving out one recording at a time.
+
+    Arguments
+    ---------
+    dataset : DataLoaderObject (see DataLoader in inet module)
+
+    motifs : list
+        the motifs (default all motifs of the dataset).
+
+    Returns
+    -------
+    A dictionary whose keys are the motifs and values are dictionaries
+    with the probability in the dataset ('P'), the jackknife standard
+    error ('SE') and bias ('bias').
+    """
+    motifs, found, tested = count_table(dataset, motifs)
+    n = len(found)
+
+    P = replicate_probabilities(jackknife_counts(n), found, tested)
+    P0 = replicate_probabilities(np.ones((1, n)), found, tested)[0]
+
+    mean = np.nanmean(P, axis = 0)
+    SE = np.sqrt( (n - 1)/n * np.nansum((P - mean)**2, axis = 0) )
+    bias = (n - 1)*(mean - P0)
+
+    mydict = dict()
+    for j, key in enumerate(motifs):
+        mydict[key] = {'P': P0[j], 'SE': SE[j], 'bias': bias[j]}
+
+    return( mydict )
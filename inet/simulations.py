@@ -0,0 +1,2344 @@
+"""
+simulations.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Wed Oct 25 10:22:47 CEST 2017
+
+Contains models to simulate different null hypothesis to be
+tested againts the empirical data.
+
+The parameters of the sigmoid functions are read from the package
+data (inet/data/chem_syn.p and inet/data/elec_syn.p) the first time
+they are needed, and cached in every process. They can also be passed
+explicitly to the functions and models that use them.
+
+Example
+-------
+>>> from inet import DataLoader
+>>> from inet.simulations import IISigmoidModel
+>>> mydataset = DataLoader('../data/PV')
+>>> sigmodel = IISigmoidModel(mydataset, chem_param = (43.8, 158.3, 28.6))
+"""
+
+from __future__ import division
+
+import os
+import sys
+import copy
+import warnings
+import numpy as np
+import pickle
+from multiprocessing import Pool
+from scipy.optimize import minimize
+from scipy.special import ndtri
+
+from inet.motifs import IIMotifCounter
+from inet.utils import II_slice 
+from inet.bitplanes import NMAX, decode, encode, pack, iicount
+from inet.exact import dataset_pmf, pvalue
+from inet.math import clopper_pearson
+from inet.store import ResultStore, METAFILE
+from inet.fitting import fit_sigmoid
+
+# motifs of IIMotifCounter and the model attributes where they are stored
+MOTIF_ATTR = {'ii_chem': 'nchem', 'ii_elec': 'nelec', 'ii_c2': 'nbid',
+    'ii_con': 'ncon', 'ii_div': 'ndiv', 'ii_lin': 'nlin', 
+    'ii_c1e': 'nc1e', 'ii_c2e': 'nc2e'}
+
+# the 8 states of a pair of cells (i,j), i<j, are a + 2*b + 4*e, where 
+# a is a chemical synapse i->j, b a chemical synapse j->i and e an 
+# electrical synapse. Motifs found in every state:
+_A = np.array([0, 1, 0, 1, 0, 1, 0, 1])
+_B = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+_E = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+PAIR_MOTIF = {'ii_chem': _A + _B, 'ii_elec': _E, 'ii_c2': _A*_B, 
+    'ii_c1e': _E*(_A + _B), 'ii_c2e': _E*_A*_B}
+
+def sigmoid(x, A, C, r):
+    """
+    solves for the following function:
+    f(x; A, C, r ) = ( A  / ( 1 + np.exp((x-C)/r)))
+    
+    where x is the independent variable,
+    A is the maximal amplitude of the curve,
+    C is the half point of the sigmoidal function,
+    r is rate of maximum population growth.
+    """
+    return  A  / ( 1 + np.exp((x-C)/r) )
+
+# the probability of connection is given by the distance between
+# interneuron in a sigmoid-like function. We obtain the parameters by
+# fitting the data in the notebook called
+# Sigmoid functions to model connections probabilities
+# param for https://github.com/ClaudiaEsp/inet/Analysis/Sigmoids.ipynb
+DATADIR = os.path.join(os.path.dirname(__file__), 'data')
+
+_param = dict() # sigmoid parameters loaded in this process
+
+def sigmoid_param(synapse):
+    """
+    Returns the parameters (A, C, r) of the sigmoid function of 
+    chemical or electrical synapses. They are read from the package 
+    data only once per process.
+
+    Arguments
+    ---------
+    synapse : str
+        'chem' for chemical synapses or 'elec' for electrical synapses.
+
+    Returns
+    -------
+    a tuple of floats (A, C, r), see sigmoid
+    """
+    try:
+        if synapse not in ('chem', 'elec'):
+            raise ValueError("synapse must be 'chem' or 'elec'")
+    except ValueError:
+        raise
+
+    if synapse not in _param:
+        fname = os.path.join(DATADIR, '%s_syn.p' %synapse)
+        with open(fname, 'rb') as f:
+            _param[synapse] = tuple( float(x) for x in pickle.load(f) )
+
+    return( _param[synapse] )
+
+def fchem(x, param = None):
+    """
+    Returns the probability of chemical synapses (in percent) between
+    interneurons at distance x. param are the parameters of the 
+    sigmoid function (default are the ones of the package data).
+    """
+    if param is None:
+        param = sigmoid_param('chem')
+    return( sigmoid(x, *param) )
+
+def felec(x, param = None):
+    """
+    Returns the probability of electrical synapses (in percent) between
+    interneurons at distance x. param are the parameters of the 
+    sigmoid function (default are the ones of the package data).
+    """
+    if param is None:
+        param = sigmoid_param('elec')
+    return( sigmoid(x, *param) )
+
+def _random(rng):
+    """
+    returns the random number generator to use: the global NumPy 
+    random state if rng is None, or rng otherwise.
+    """
+    if rng is None:
+        return( np.random )
+    return( rng )
+
+def _attr(motif):
+    """
+    returns the model attribute where a motif simulated is stored
+    (e.g., 'nbid' for 'ii_c2', or 'nei' for motifs not in MOTIF_ATTR)
+    """
+    return( MOTIF_ATTR.get(motif, 'n' + motif) )
+
+def _threshold(R, pchem, pelec):
+    """
+    transforms random numbers into chemical and electrical planes.
+    Chemical synapses are taken from all non-diagonal elements and 
+    electrical synapses from the upper triangle only.
+
+    Arguments
+    ---------
+    R : NumPy array
+        uniform random numbers of shape (..., 2, n, n), the first
+        matrix of the pair is used for chemical synapses and the 
+        second one for electrical synapses.
+    pchem : float or NumPy array
+        the probability of chemical synapses.
+    pelec : float or NumPy array
+        the probability of electrical synapses.
+
+    Returns
+    -------
+    a tuple of boolean NumPy arrays (chem, elec) of shape (..., n, n)
+    """
+    n = R.shape[-1]
+    offdiag = ~np.eye(n, dtype = bool)
+    upper = np.triu(offdiag)
+
+    chem = (R[..., 0, :, :] < pchem) & offdiag
+    elec = (R[..., 1, :, :] < pelec) & upper
+
+    return( chem, elec )
+
+def _conditional_threshold(R, pcoupled, puncoupled, pelec):
+    """
+    transforms random numbers into electrical planes, and then into
+    chemical planes given the electrical ones (see _threshold and
+    IIConditionalModel).
+
+    Arguments
+    ---------
+    R : NumPy array
+        uniform random numbers of shape (..., 2, n, n) (see _threshold).
+    pcoupled : float or NumPy array
+        the probability of chemical synapses between coupled cells.
+    puncoupled : float or NumPy array
+        the probability of chemical synapses between uncoupled cells.
+    pelec : float or NumPy array
+        the probability of electrical synapses.
+
+    Returns
+    -------
+    a tuple of boolean NumPy arrays (chem, elec) of shape (..., n, n)
+    """
+    n = R.shape[-1]
+    offdiag = ~np.eye(n, dtype = bool)
+
+    elec = (R[..., 1, :, :] < pelec) & np.triu(offdiag)
+    coupled = elec | np.swapaxes(elec, -1, -2)
+    chem = (R[..., 0, :, :] < np.where(coupled, pcoupled, puncoupled))
+    chem &= offdiag
+
+    return( chem, elec )
+
+def _squareplanes(k, size, pchem, pelec, rng = None):
+    """
+    generates k chemical and k electrical random planes from a single
+    draw of random numbers. Chemical synapses are drawn for all
+    non-diagonal elements and electrical synapses for the upper
+    triangle only.
+
+    Arguments
+    ---------
+    k : int
+        the number of matrices
+    size : int
+        the size of the square matrices
+    pchem : float
+        the probability of chemical synapses.
+    pelec : float
+        the probability of electrical synapses.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a tuple of boolean NumPy arrays (chem, elec) of shape (k, size, size)
+    """
+    R = _random(rng).random_sample((k, 2, size, size)) 
+
+    return( _threshold(R, pchem, pelec) )
+
+def _count(chem, elec):
+    """
+    counts the inhibitory motifs in a stack of chemical and electrical 
+    planes (elec is only read in the upper triangle).
+
+    Returns
+    -------
+    an integer NumPy array with one row per matrix and one column 
+    per motif in IIModel.motiflist
+    """
+    elec = elec | np.swapaxes(elec, -1, -2)
+    mycount = iicount(pack(chem), pack(elec))
+
+    return( np.column_stack([mycount[key] for key in IIModel.motiflist]) )
+
+def ii_squarestack(k, size, pchem, pelec, rng = None):
+    """
+    generates k square random matrices with chemical synapses
+    with probability 'pchem' and electrical synapses with probability
+    'pelec'. It does not take into account the diagonal, which is always
+    zero.
+
+    Arguments
+    ---------
+    k : int
+        the number of matrices
+    size : int
+        the size of the square matrices
+    pchem : float
+        the probability of chemical synapses.
+    pelec : float
+        the probability of electrical synapses.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a 3D NumPy array of shape (k, size, size) containing <0> if no 
+    connection, <1> if chemical synapse, <2> if electrical synapse and
+    <3> if both (see inet.bitplanes.encode).
+    """
+    chem, elec = _squareplanes(k, size, pchem, pelec, rng)
+
+    return( encode(chem, elec) )
+
+def chem_squarestack(k, size, prob, rng = None):
+    """
+    generates k square random matrices with a probability 'prob'
+    of having ones, zero otherwise. It does not take into account
+    the diagonal, which is always zero.
+
+    Arguments
+    ---------
+    k : int
+        the number of matrices
+    size : int
+        the size of the square matrices
+    prob : float
+        the probability of having ones.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a 3D NumPy array of shape (k, size, size)
+    """
+    n = size
+    offdiag = ~np.eye(n, dtype = bool)
+    R = _random(rng).random_sample((k, n, n))
+
+    return( ((R < prob) & offdiag)*1 )
+
+def elec_squarestack(k, size, prob, rng = None):
+    """
+    generates k square random matrices with a probability 'prob'
+    of having values == 2 in the upper triangle, zero otherwise. 
+
+    Arguments
+    ---------
+    k : int
+        the number of matrices
+    size : int
+        the size of the square matrices
+    prob : float
+        the probability of having twos.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a 3D NumPy array of shape (k, size, size)
+    """
+    n = size
+    upper = np.triu(np.ones((n,n), dtype = bool), 1)
+    R = _random(rng).random_sample((k, n, n))
+
+    return( ((R < prob) & upper)*2 )
+
+def chem_squarematrix(size, prob, rng = None):
+    """
+    generates a square random matrix with a probability 'prob'
+    of having ones, zero otherwise. It does not take into account
+    the diagonal, which is always zero.
+
+    Arguments
+    ---------
+    size : int
+        the size of the square matrix
+    prob : float
+        the probability of having ones.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a 2D Numpy matrix.
+    """
+    return( chem_squarestack(1, size, prob, rng)[0] )
+
+def elec_squarematrix(size, prob, rng = None):
+    """
+    generates a square random matrix with a probability 'prob'
+    of having values == 2, zero otherwise. It does not take into account
+    the diagonal, which is always zero.
+
+    Arguments
+    ---------
+    size : int
+        the size of the square matrix
+    prob : float
+        the probability of having twos.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    a 2D Numpy matrix.
+    """
+    return( elec_squarestack(1, size, prob, rng)[0] )
+        
+def chem_distmatrix(matrix, rng = None, param = None):
+    """
+    generates a square random matrix with a probability based on a 
+    sigmoid function.
+
+    Arguments
+    ---------
+    matrix : 2D NumPy 
+        a matrix with intersomatic distances
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+    param : tuple
+        the parameters of the sigmoid function (see fchem)
+
+    Returns
+    -------
+    a 2D Numpy matrix with one if there is a connection, zero otherwise.
+    """
+
+    distp = fchem(np.abs(matrix), param)/100. # matrix of probabilities
+    rand = _random(rng).random_sample(matrix.shape) #random number
+    prop = (rand < distp)*1 # if random < probability of found
+
+    # set to zero diagonal elements
+    prop[np.where(np.eye(prop.shape[0]))] = 0
+
+    return( prop )
+        
+def elec_distmatrix(matrix, rng = None, param = None):
+    """
+    generates a square random matrix with a probability based on a 
+    sigmoid function.
+
+    Arguments
+    ---------
+    matrix : 2D NumPy 
+        a matrix with intersomatic distances
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+    param : tuple
+        the parameters of the sigmoid function (see felec)
+
+    Returns
+    -------
+    a 2D Numpy matrix with two if there is a connection, zero otherwise.
+    """
+    n = matrix.shape[0] # matrix is square, size nxn
+
+    R = _random(rng).random_sample((n,n)) 
+    P = felec(np.abs(matrix), param)/100. # matrix of distance-prob
+    
+    # all possible unique 2-cells combinations (upper triangle)
+    upper = np.triu(np.ones((n,n), dtype = bool), 1)
+
+    return( ((R < P) & upper)*2 )
+
+#-------------------------------------------------------------------------
+# Parallel simulations: every block of iterations is simulated with its
+# own random number generator, seeded by the pair (seed, block). The 
+# result only depends on the seed and the block size, but not on the
+# number of processes used to simulate the blocks.
+#-------------------------------------------------------------------------
+
+_worker_model = None # model simulated in every process of the pool
+
+def _init_worker(model):
+    """
+    stores the model to simulate in a process of the pool
+    """
+    global _worker_model
+    _worker_model = model
+
+def _run_block(args):
+    """
+    simulates a block of iterations in a process of the pool
+    """
+    seed, block, n_iter, max_memory = args
+    return( block, _worker_model.simulate_block(seed, block, n_iter, 
+        max_memory) )
+
+_worker_grid = None # models of the grid points simulated in the pool
+
+def _init_sweep(models):
+    """
+    stores the models of the grid points in a process of the pool
+    """
+    global _worker_grid
+    _worker_grid = models
+
+def _run_sweep(args):
+    """
+    simulates all iterations of a grid point in a process of the pool
+    """
+    index, n_iter, seed, max_memory = args
+    return( index, _worker_grid[index]._simulate_blocks(n_iter, seed, 
+        max_memory=max_memory) )
+
+class IIModel(object):
+    """
+    Base class for connectivity models between interneurons. Daughter
+    classes only define how to simulate a number of iterations
+    (datasets) with a given random number generator in _simulate(). 
+    """
+    motiflist = IIMotifCounter.motiflist
+    blocksize = 1000 # number of iterations with the same generator
+
+    def __init__(self, dataset):
+        """
+        set all the motifs simulated to zero
+
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module) 
+        """
+        self.seed = None
+        self.tilt = None # (motif, theta) for importance sampling
+        self.fingerprint = dataset.fingerprint() # see DataLoader
+
+        # motifs found in the dataset (none if the dataset does not have
+        # the cells of the motif, e.g. interneurons in an EE dataset)
+        self.found = dict((key, 0) for key in self.motiflist)
+        for key in dataset.motif:
+            if key in self.found:
+                self.found[key] = dataset.motif[key]['found']
+
+        self.nchem = np.empty(0) # chemical synapse (ii_chem)
+        self.nelec = np.empty(0) # electrical synapse (ii_elec) 
+
+        self.nbid = np.empty(0) # bidirectional chemical synapse (ii_c2)
+        self.ncon = np.empty(0) # convergent inhibitory motifs (ii_con)
+        self.ndiv = np.empty(0) # divergent inhibitory motifs (ii_div)
+        self.nlin = np.empty(0) # linear inhibitory motifs (ii_lin)
+
+        self.nc1e = np.empty(0) # electrical and unidirectional chemical (ii_c1e)
+        self.nc2e = np.empty(0) # electrical and bidirectional chemical (ii_c2e)
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates n_iter datasets with the random number generator 
+        rng. The random numbers must be drawn iteration after iteration
+        so that simulating 2*n iterations gives the same result as
+        simulating two times n iterations.
+
+        Returns
+        -------
+        an integer NumPy array with one row per iteration and one 
+        column per motif in motiflist.
+        """
+        raise NotImplementedError
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        raise NotImplementedError
+
+    def chunksize(self, max_memory):
+        """
+        Returns the number of iterations that can be simulated at once
+        with less than 'max_memory' bytes.
+        """
+        return( max(1, int(max_memory//self.nbytes())) )
+
+    def simulate_block(self, seed, block, n_iter, max_memory=2**27):
+        """
+        Simulates a block of iterations with the random number 
+        generator of the block.
+
+        Arguments:
+        seed: int
+            the seed of the simulation.
+        block: int
+            the index of the block.
+        n_iter: int
+            the number of iterations of the block.
+        max_memory: int
+            maximal number of bytes used to simulate iterations at once.
+
+        Returns
+        -------
+        an integer NumPy array with one row per iteration and one 
+        column per motif in motiflist.
+        """
+        rng = np.random.RandomState([seed, block])
+        chunk = self.chunksize(max_memory)
+
+        if self.tilt is None:
+            simulate = self._simulate
+        else:
+            simulate = self._simulate_tilted
+
+        mysim = np.empty((n_iter, len(self.motiflist)), dtype=int)
+        for start in range(0, n_iter, chunk):
+            stop = min(start + chunk, n_iter)
+            mysim[start:stop] = simulate(stop - start, rng)
+
+        return( mysim )
+
+    def run(self, n_iter, seed=None, n_jobs=1, max_memory=2**27, 
+        progress=False, checkpoint=None):
+        """
+        Run the simulation
+
+        Arguments:
+        n_iter:  int      
+            Number of iterations
+
+        seed: int
+            seed for the random number generators. If None, a seed
+            is chosen randomly and stored in the attribute seed.
+
+        n_jobs: int
+            number of processes to simulate blocks of iterations in
+            parallel. The result does not depend on n_jobs.
+
+        max_memory: int
+            maximal number of bytes used to simulate iterations at once 
+            in every process (default 128 MB). 
+
+        progress: bool
+            if True, report the number of iterations simulated.
+
+        checkpoint: str
+            if given, a directory where every block of iterations is 
+            written as soon as it is simulated (see ResultStore in 
+            inet.store). The blocks completed are written in the 
+            metadata of the store. If the store exists, the run is 
+            resumed: only the blocks missing are simulated, and the 
+            result is identical to an uninterrupted run. The motifs
+            are then memory-mapped from the store. A ValueError is
+            raised if the store was simulated with another model,
+            parameters, dataset, seed or number of iterations.
+
+        Update the number of motifs found in the lists
+        """
+        if checkpoint is not None:
+            mysim = self._resume(n_iter, seed, n_jobs, max_memory, progress,
+                checkpoint)
+            self._setresults(mysim)
+            return
+
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+        self.seed = seed
+
+        mysim = self._simulate_blocks(n_iter, seed, n_jobs, max_memory, 
+            progress)
+        self._setresults(mysim)
+
+    def _resume(self, n_iter, seed, n_jobs, max_memory, progress, 
+        checkpoint):
+        """
+        Simulates n_iter iterations (see run) keeping a checkpoint on 
+        disk, and returns the ResultStore with them.
+        """
+        if os.path.exists(os.path.join(checkpoint, METAFILE)):
+            store = ResultStore(checkpoint, mode='a')
+            metadata = store.metadata
+
+            try:
+                if metadata['model'] != type(self).__name__:
+                    raise ValueError('checkpoint of a %s' %metadata['model'])
+                if len(store) != n_iter:
+                    raise ValueError('checkpoint of %d iterations' %len(store))
+                if metadata['blocksize'] != self.blocksize:
+                    raise ValueError('checkpoint with blocks of %d iterations'\
+                        %metadata['blocksize'])
+                if seed is not None and seed != metadata['seed']:
+                    raise ValueError('checkpoint with seed %d' \
+                        %metadata['seed'])
+                if metadata['parameters'] != self.parameters():
+                    raise ValueError('checkpoint with parameters %s' \
+                        %metadata['parameters'])
+                if metadata['fingerprint'] != self.fingerprint:
+                    raise ValueError('checkpoint of another dataset')
+            except ValueError:
+                raise
+
+            self.seed = metadata['seed']
+
+        else:
+            if seed is None:
+                seed = np.random.RandomState().randint(2**31)
+            self.seed = seed
+
+            store = ResultStore(checkpoint, mode='w', 
+                motifs=self.motiflist, metadata=self.metadata())
+            store.resize(n_iter)
+            store.update(done=list())
+
+        done = list(store.metadata['done'])
+
+        def save(block, blocksim):
+            """
+            writes the block simulated and marks it as completed
+            """
+            store.write(block*self.blocksize, blocksim)
+            done.append(block)
+            store.update(done=done)
+
+        self._simulate_blocks(n_iter, self.seed, n_jobs, max_memory, 
+            progress, skip=set(done), callback=save)
+
+        return( store )
+
+    def _simulate_blocks(self, n_iter, seed, n_jobs=1, max_memory=2**27, 
+        progress=False, skip=(), callback=None):
+        """
+        Simulates n_iter iterations in blocks (see run) and returns
+        them in an array with one row per iteration and one column
+        per motif.
+
+        The blocks in skip are not simulated. If callback is given, 
+        callback(block, blocksim) is called with every block simulated
+        instead, and None is returned.
+        """
+        if callback is None:
+            mysim = np.empty((n_iter, len(self.motiflist)), dtype=int)
+
+        blocks = list()
+        done = 0
+        for block, start in enumerate(range(0, n_iter, self.blocksize)):
+            stop = min(start + self.blocksize, n_iter)
+            if block in skip:
+                done += stop - start
+            else:
+                blocks.append( (seed, block, stop - start, max_memory) )
+
+        # blocks are returned as soon as they are simulated
+        if n_jobs == 1:
+            _init_worker(self)
+            results = (_run_block(args) for args in blocks)
+        else:
+            pool = Pool(n_jobs, initializer=_init_worker, initargs=(self,))
+            results = pool.imap_unordered(_run_block, blocks)
+
+        # the workers are stopped even if a block fails
+        try:
+            for block, blocksim in results:
+                if callback is None:
+                    start = block*self.blocksize
+                    mysim[start:start + len(blocksim)] = blocksim
+                else:
+                    callback(block, blocksim)
+
+                done += len(blocksim)
+                if progress:
+                    sys.stdout.write('\r{:8d}/{} iterations'.format(done,
+                        n_iter))
+                    sys.stdout.flush()
+        finally:
+            if n_jobs != 1:
+                pool.terminate()
+                pool.join()
+        if progress:
+            sys.stdout.write('\n')
+
+        if callback is None:
+            return( mysim )
+
+    def _setresults(self, mysim):
+        """
+        set pointers to the motifs simulated (one column per motif of 
+        an array, or the memory-mapped motifs of a ResultStore)
+        """
+        for i, key in enumerate(self.motiflist):
+            if isinstance(mysim, ResultStore):
+                setattr(self, _attr(key), mysim[key])
+            else:
+                setattr(self, _attr(key), mysim[:,i])
+
+    def simulated(self, motif):
+        """
+        Returns the motifs simulated in every iteration
+        """
+        return( getattr(self, _attr(motif)) )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the parameters of the model
+        """
+        return( dict() )
+
+    def metadata(self):
+        """
+        Returns a dictionary with the model, its parameters, the seed
+        and the fingerprint of the dataset simulated.
+        """
+        mydict = dict()
+        mydict['model'] = type(self).__name__
+        mydict['parameters'] = self.parameters()
+        mydict['seed'] = None if self.seed is None else int(self.seed)
+        mydict['blocksize'] = self.blocksize
+        mydict['fingerprint'] = self.fingerprint
+
+        return( mydict )
+
+    def save(self, path):
+        """
+        Writes the motifs simulated in a ResultStore (see inet.store)
+        with the metadata of the model.
+
+        Arguments:
+        path: str
+            the directory of the store (it is overwritten).
+
+        Returns:
+        The ResultStore
+        """
+        store = ResultStore(path, mode='w', motifs=self.motiflist,
+            metadata=self.metadata())
+        store.append( dict((key, self.simulated(key)) 
+            for key in self.motiflist) )
+
+        return( store )
+
+    def load(self, path):
+        """
+        Reads the motifs simulated from a ResultStore. They are 
+        memory-mapped, so that they are not loaded in memory until 
+        they are used.
+
+        Arguments:
+        path: str
+            the directory of the store (see save).
+        """
+        store = ResultStore(path)
+
+        try:
+            if store.metadata['model'] != type(self).__name__:
+                raise ValueError('store of a %s' %store.metadata['model'])
+        except ValueError:
+            raise
+
+        if store.metadata['fingerprint'] != self.fingerprint:
+            warnings.warn('store simulated with another dataset')
+
+        self.seed = store.metadata['seed']
+        self._setresults(store)
+
+    def _setparameters(self, **kwargs):
+        """
+        Changes the parameters of the model (see with_parameters).
+        """
+        raise NotImplementedError
+
+    def with_parameters(self, **kwargs):
+        """
+        Returns a copy of the model with other parameters (e.g., 
+        PC=0.3 for IIUniformModel or chem_param=(40, 150, 30) for 
+        IISigmoidModel). The motifs simulated are not copied.
+        """
+        try:
+            unknown = set(kwargs) - set(self.parameters())
+            if unknown:
+                raise ValueError('unknown parameters %s' %', '.join(unknown))
+        except ValueError:
+            raise
+
+        mymodel = copy.copy(self)
+        mymodel._setparameters(**kwargs)
+        mymodel._setresults(np.empty((0, len(self.motiflist)), dtype=int))
+
+        return( mymodel )
+
+    def sweep(self, grid, n_iter, seed=None, n_jobs=1, max_memory=2**27,
+        progress=False):
+        """
+        Simulates the model with every point of a grid of parameters
+        with common random numbers: all grid points are simulated 
+        with the same seed, and thus the same uniform random numbers
+        are thresholded against different probabilities. Differences
+        between grid points are then only due to the parameters.
+
+        Arguments:
+        grid: list
+            a list of dictionaries with the parameters of every grid 
+            point (see with_parameters), e.g. [{'PC': 0.2}, {'PC': 0.3}]
+
+        n_iter: int
+            number of iterations of every grid point.
+
+        seed: int
+            seed for the random number generators. If None, a seed
+            is chosen randomly and stored in the attribute seed.
+
+        n_jobs: int
+            number of processes to simulate grid points in parallel. 
+            The result does not depend on n_jobs.
+
+        max_memory: int
+            maximal number of bytes used to simulate iterations at once 
+            in every process (default 128 MB). 
+
+        progress: bool
+            if True, report the number of grid points simulated.
+
+        Returns:
+        An integer NumPy array of shape (grid points, iterations, motifs)
+        with the motifs simulated (ordered as motiflist).
+        """
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+        self.seed = seed
+
+        models = [self.with_parameters(**point) for point in grid]
+        points = [(i, n_iter, seed, max_memory) for i in range(len(grid))]
+
+        if n_jobs == 1:
+            _init_sweep(models)
+            results = (_run_sweep(args) for args in points)
+        else:
+            pool = Pool(n_jobs, initializer=_init_sweep, initargs=(models,))
+            results = pool.imap_unordered(_run_sweep, points)
+
+        mysweep = np.empty((len(grid), n_iter, len(self.motiflist)), 
+            dtype=int)
+        # the workers are stopped even if a grid point fails
+        try:
+            for done, (i, mysim) in enumerate(results):
+                mysweep[i] = mysim
+                if progress:
+                    sys.stdout.write('\r{:4d}/{} grid points'.format(
+                        done + 1, len(grid)))
+                    sys.stdout.flush()
+        finally:
+            if n_jobs != 1:
+                pool.terminate()
+                pool.join()
+        if progress:
+            sys.stdout.write('\n')
+
+        return( mysweep )
+
+    def run_sequential(self, alpha=0.05, larger=True, max_iter=10**6,
+        confident=0.995, seed=None, n_jobs=1, max_memory=2**27):
+        """
+        Run the simulation in blocks of iterations until the P-value of
+        every motif found in the dataset is clearly above or below 
+        alpha, or until max_iter iterations are simulated. 
+        
+        A motif is decided when the Clopper-Pearson confident interval 
+        of its P-value does not contain alpha. After that, new 
+        iterations are not used to compute its P-value. The P-values
+        are defined as in inet.plots.barplot. The first iterations 
+        are the iterations simulated by run() with the same seed.
+
+        Arguments:
+        alpha: float
+            the significance level.
+
+        larger: bool (default True)
+            if 'True' calculates the p-value that the data are above 
+            the null-hypothese. Otherwise, the data is bellow.
+
+        max_iter: int
+            maximal number of iterations.
+
+        confident: float
+            confidence of the interval. For a two-tailed 99% confident 
+            interval confidence is 0.995 (default). The interval is 
+            computed with this level at every check (after every 
+            block), without correction for the number of checks.
+
+        seed, n_jobs, max_memory: see run()
+
+        Returns:
+        A dictionary whose keys are the motifs and values are 
+        dictionaries with the P-value ('P'), its confident interval 
+        ('CI'), the number of iterations used ('n_iter') and whether
+        the P-value is smaller than alpha ('significant', None if
+        it was not decided after max_iter iterations).
+        """
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+        self.seed = seed
+
+        nmotifs = len(self.motiflist)
+        found = np.array([self.found[key] for key in self.motiflist])
+
+        counts = np.zeros(nmotifs, dtype=int) # simulations above found
+        n_used = np.zeros(nmotifs, dtype=int) # iterations used
+        decided = np.zeros(nmotifs, dtype=bool)
+        interval = [(0.0, 1.0)]*nmotifs
+
+        simlist = list()
+        done = 0
+
+        if n_jobs == 1:
+            _init_worker(self)
+        else:
+            pool = Pool(n_jobs, initializer=_init_worker, initargs=(self,))
+
+        try:
+            while done < max_iter and not decided.all():
+
+                # simulate one block per process
+                blocks = list()
+                for i in range(n_jobs):
+                    start = done + i*self.blocksize
+                    stop = min(start + self.blocksize, max_iter)
+                    if start < stop:
+                        blocks.append( (seed, start//self.blocksize, 
+                            stop - start, max_memory) )
+
+                if n_jobs == 1:
+                    results = map(_run_block, blocks)
+                else:
+                    results = pool.map(_run_block, blocks)
+
+                # update the P-values of the motifs not decided block after
+                # block, so that the result does not depend on n_jobs
+                for _, mysim in results:
+                    if decided.all():
+                        break
+                    simlist.append(mysim)
+                    done += len(mysim)
+
+                    if larger:
+                        above = (mysim > found).sum(0)
+                    else:
+                        above = (mysim < found).sum(0)
+
+                    for i in np.flatnonzero(~decided):
+                        counts[i] += above[i]
+                        n_used[i] += len(mysim)
+                        interval[i] = clopper_pearson(n_used[i], counts[i], 
+                            confident)
+                        decided[i] = interval[i][1] < alpha or \
+                            interval[i][0] > alpha
+        finally:
+            if n_jobs != 1:
+                pool.terminate()
+                pool.join()
+
+        self._setresults( np.concatenate(simlist) )
+
+        mydict = dict()
+        for i, key in enumerate(self.motiflist):
+            significant = interval[i][1] < alpha if decided[i] else None
+            mydict[key] = {'P': counts[i]/n_used[i], 'CI': interval[i], 
+                'n_iter': n_used[i], 'significant': significant}
+
+        return( mydict )
+
+    def _probabilities(self):
+        """
+        Returns a dictionary whose keys are the number of cells of the
+        simulated recordings and values are tuples with two stacks 
+        of matrices (one per recording) with the probabilities of 
+        chemical and electrical synapses.
+        """
+        raise NotImplementedError
+
+    def _stateprobabilities(self, n):
+        """
+        Returns the probabilities of the 8 states (see _A, _B and _E) 
+        of every pair of cells in the recordings with n cells, as an 
+        array with one row per pair. Chemical and electrical synapses
+        are independent given their probabilities (see _probabilities).
+        """
+        Pchem, Pelec = self._probabilities()[n]
+        i, j = np.triu_indices(n, 1)
+
+        pa = Pchem[:, i, j].ravel()[:, np.newaxis] # i->j
+        pb = Pchem[:, j, i].ravel()[:, np.newaxis] # j->i
+        pe = Pelec[:, i, j].ravel()[:, np.newaxis]
+
+        return( np.where(_A, pa, 1 - pa) * np.where(_B, pb, 1 - pb) * 
+            np.where(_E, pe, 1 - pe) )
+
+    def _pairstates(self, n, motif, theta):
+        """
+        Computes the probabilities of the 8 states of every pair of
+        cells in the recordings with n cells, tilted towards a motif.
+        The probability of every state is multiplied by 
+        exp(theta*m) and normalized by Z, where m is the number of 
+        motifs in the state (see PAIR_MOTIF).
+
+        Returns
+        -------
+        A tuple with the cumulative probabilities of the states (one
+        row per pair) and the sum of log(Z) over all pairs.
+        """
+        P = self._stateprobabilities(n) # (pairs, states)
+
+        Q = P*np.exp(theta*PAIR_MOTIF[motif])
+        Z = Q.sum(1)
+
+        return( np.cumsum(Q/Z[:, np.newaxis], axis=1), np.log(Z).sum() )
+
+    def _simulate_tilted(self, n_iter, rng):
+        """
+        Simulates n_iter datasets with the states of every pair of cells
+        tilted towards a motif (see _pairstates).
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        motif, theta = self.tilt
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+        for n in sorted(self._probabilities()):
+            cumQ, _ = self._pairstates(n, motif, theta)
+            i, j = np.triu_indices(n, 1)
+
+            R = rng.random_sample((n_iter, len(cumQ)))
+            state = (R[..., np.newaxis] > cumQ[:, :-1]).sum(-1)
+            state = state.reshape(-1, len(i)) # (iterations*recordings, pairs)
+
+            chem = np.zeros((len(state), n, n), dtype=bool)
+            elec = np.zeros((len(state), n, n), dtype=bool)
+            chem[:, i, j] = _A[state]
+            chem[:, j, i] = _B[state]
+            elec[:, i, j] = _E[state]
+
+            mycount = _count(chem, elec).reshape(n_iter, -1, len(self.motiflist))
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def tiltmean(self, motif, theta):
+        """
+        Returns the average number of motifs in the datasets tilted
+        towards a pair motif (see _pairstates).
+        """
+        m = PAIR_MOTIF[motif]
+
+        mean = 0.0
+        for n in self._probabilities():
+            cumQ, _ = self._pairstates(n, motif, theta)
+            Q = np.diff(np.column_stack([np.zeros(len(cumQ)), cumQ]), axis=1)
+            mean += Q.dot(m).sum()
+
+        return( mean )
+
+    def run_importance(self, motif, n_iter=10000, theta=None, larger=True,
+        seed=None, n_jobs=1, max_memory=2**27):
+        """
+        Estimates the P-value of a pair motif (see PAIR_MOTIF) with 
+        importance sampling. Datasets are simulated with the states of
+        every pair of cells tilted towards the tail of the motif (their
+        probabilities are multiplied by exp(theta*m), where m is the 
+        number of motifs in the state) and weighted by the likelihood
+        ratio between the model and the tilted model:
+
+        w = exp( -theta*S + sum(log(Z)) ),
+
+        where S is the number of motifs simulated and Z the 
+        normalization constant of every pair. 
+        
+        It gives accurate P-values of pair motifs far below 1/n_iter.
+        Motifs of three cells (ii_con, ii_div and ii_lin) are not
+        sums over independent pairs, and cannot be tilted in this way
+        (ValueError); use run_sequential or the exact P-values of 
+        IIUniformModel instead. The simulations are not stored in the
+        n* arrays.
+
+        Arguments:
+        motif: str
+            a pair motif of IIMotifCounter (e.g., 'ii_c2')
+
+        n_iter: int
+            number of iterations with the tilted model.
+
+        theta: float
+            the tilt. If None, the tilt whose average motif is one 
+            motif above (or below) the motif found is searched. The 
+            average is computed exactly (see tiltmean).
+
+        larger: bool (default True)
+            if 'True' calculates the p-value that the data are above 
+            the null-hypothese. Otherwise, the data is bellow.
+
+        seed, n_jobs, max_memory: see run()
+
+        Returns:
+        A dictionary with the P-value ('P'), its standard error ('SE'), 
+        the effective sample size ('ESS') and the tilt used ('theta').
+        """
+        try:
+            if motif not in PAIR_MOTIF:
+                raise ValueError('%s is not a pair motif, it cannot be '
+                    'tilted' %motif)
+        except ValueError:
+            raise
+
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        index = self.motiflist.index(motif)
+        found = self.found[motif]
+        target = found + 1 if larger else found - 1
+
+        if theta is None:
+            # bisection of the tilt, the average increases with theta
+            low, high = (0.0, 10.0) if larger else (-10.0, 0.0)
+            for _ in range(30):
+                theta = (low + high)/2
+                if self.tiltmean(motif, theta) < target:
+                    low = theta
+                else:
+                    high = theta
+
+        self.tilt = (motif, theta)
+        try:
+            mysim = self._simulate_blocks(n_iter, seed + 1, n_jobs, 
+                max_memory)
+        finally:
+            self.tilt = None
+
+        logZ = sum(self._pairstates(n, motif, theta)[1] 
+            for n in self._probabilities())
+
+        w = np.exp(-theta*mysim[:, index] + logZ)
+
+        if larger:
+            x = w*(mysim[:, index] > found)
+        else:
+            x = w*(mysim[:, index] < found)
+
+        mydict = dict()
+        mydict['P'] = x.mean()
+        mydict['SE'] = x.std()/np.sqrt(n_iter)
+        mydict['ESS'] = w.sum()**2/np.sum(w**2)
+        mydict['theta'] = theta
+
+        return( mydict )
+
+class IIUniformModel(IIModel):
+    """
+    This is a connectivity model that assumes a constant and uniform
+    connection probability between interneurons.
+    """        
+
+    def __init__(self, dataset):
+        """
+        
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module) 
+        """
+        super(IIUniformModel, self).__init__(dataset)
+
+        # get a list with elements (nPV, nRecord)
+        # nPV -> this the number of simultaneously recorded PV cells
+        # nRecord -> this is the number of set where recorded with nPV
+        self.__PVconf = list()
+        for nPV in range(2,9): # between 2 and 8 simultaneous cells
+            nRecord = np.sum( dataset.IN[nPV].values() )
+            if nRecord: # larger than zero recordings
+                self.PVconf.append((nPV, nRecord))
+                print('{:2d} recordings with {} PV-cells'.format(nRecord,nPV ))
+
+        self.__PC = dataset.motif.ii_chem_found/dataset.motif.ii_chem_tested
+        self.__PE = dataset.motif.ii_elec_found/dataset.motif.ii_elec_tested
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates chemical and electrical synapses with an 
+        average connectivity given as arguments. The recordings with 
+        the same number of PV-cells of all iterations are simulated 
+        at once as a stack of matrices.
+
+        Arguments:
+        n_iter: int
+            Number of iterations (datasets) to simulate.
+        rng: RandomState
+            the random number generator.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """ 
+        ndraws = [nRecord*2*nPV*nPV for nPV, nRecord in self.PVconf]
+        R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        # simulates the nubmer of PVs and how many recordings
+        start = 0
+        for (nPV, nRecord), size in zip(self.PVconf, ndraws):
+            myR = R[:, start:start+size].reshape(n_iter*nRecord, 2, nPV, nPV)
+            start += size
+
+            chem, elec = _threshold(myR, self.PC, self.PE)
+
+            # sum all recordings of the same iteration
+            mycount = _count(chem, elec).reshape(n_iter, nRecord, -1)
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # random numbers (float) and planes (bool) of the two
+        # synapse types, plus the padded planes to pack them
+        nbytes = 0
+        for nPV, nRecord in self.PVconf:
+            nbytes += nRecord * (2*nPV*nPV*(8 + 2) + 2*NMAX*NMAX) 
+
+        return( nbytes )
+
+    def _probabilities(self):
+        """
+        Returns a dictionary whose keys are the number of cells of the
+        simulated recordings and values are tuples with two stacks 
+        of matrices (one per recording) with the probabilities of 
+        chemical and electrical synapses.
+        """
+        mydict = dict()
+        for nPV, nRecord in self.PVconf:
+            mydict[nPV] = ( np.full((nRecord, nPV, nPV), self.PC), 
+                np.full((nRecord, nPV, nPV), self.PE) )
+
+        return( mydict )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the probabilities of chemical (PC)
+        and electrical (PE) synapses.
+        """
+        return( dict(PC = float(self.PC), PE = float(self.PE)) )
+
+    def _setparameters(self, PC = None, PE = None):
+        """
+        Changes the probabilities of chemical and electrical synapses
+        (see with_parameters).
+        """
+        if PC is not None:
+            self.__PC = PC
+        if PE is not None:
+            self.__PE = PE
+
+    def pmf(self, motif):
+        """
+        Returns the exact distribution of a motif in the simulated 
+        datasets (see inet.exact). It raises a ValueError if the
+        recordings are too large to be enumerated.
+
+        Arguments:
+        motif: str
+            a motif of IIMotifCounter (e.g., 'ii_c2')
+        """
+        return( dataset_pmf(motif, self.PVconf, self.PC, self.PE) )
+
+    def pvalues(self, larger=True, n_iter=10000, seed=None):
+        """
+        Returns the P-values of the motifs found in the dataset (see
+        inet.plots.barplot). P-values are exact when the distribution
+        of the motif can be computed, otherwise they are estimated from
+        n_iter simulations.
+
+        Arguments:
+        larger: bool (default True)
+            if 'True' calculates the p-value that the data are above 
+            the null-hypothese. Otherwise, the data is bellow.
+        n_iter: int
+            number of iterations if simulations are necessary.
+        seed: int
+            seed for the simulations.
+
+        Returns:
+        A dictionary whose keys are the motifs and values are tuples
+        with the P-value and the method ('exact' or 'simulation').
+        Simulations are run in a copy of the model, so that the motifs
+        simulated by the model are not changed.
+        """
+        mymodel = self
+        mydict = dict()
+        for key in self.motiflist:
+            try:
+                P = pvalue(self.pmf(key), self.found[key], larger)
+                mydict[key] = (P, 'exact')
+
+            except ValueError as err:
+                warnings.warn('%s: %s, using simulations' %(key, err))
+
+                sim = mymodel.simulated(key)
+                if len(sim) < n_iter:
+                    mymodel = copy.copy(self)
+                    mymodel.run(n_iter, seed)
+                    sim = mymodel.simulated(key)
+
+                if larger:
+                    P = np.mean(sim > self.found[key])
+                else:
+                    P = np.mean(sim < self.found[key])
+                mydict[key] = (P, 'simulation')
+
+        return( mydict )
+
+    # only getters for private attributes 
+    PVconf = property(lambda self: self.__PVconf)
+    PC = property(lambda self: self.__PC)
+    PE = property(lambda self: self.__PE)
+
+
+class IISigmoidModel(IIModel):
+    """
+    This is a connectivity model that assumes a sigmoid-like  
+    relation between the connection probability and the distance between 
+    interneurons. The parameters are slightly different for chemical
+    and electrical connections.
+
+    The probabilities of connection of all distance matrices are 
+    computed once and stacked by the number of PV-cells, so that all 
+    recordings of the same size are simulated at once.
+    """        
+    def __init__(self, dataset, precision = 'double', chem_param = None, 
+        elec_param = None):
+        """
+        
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module) 
+
+        precision: str (default 'double')
+            if 'single', connections are drawn by comparing 32-bit 
+            random integers against the probabilities scaled to 2**32, 
+            which halves the memory and doubles the iterations simulated
+            at once. The probabilities are then resolved to 2**-32.
+
+        chem_param, elec_param: tuple
+            the parameters (A, C, r) of the sigmoid functions of 
+            chemical and electrical synapses (see sigmoid). Default 
+            are the parameters of the package data.
+        """
+        super(IISigmoidModel, self).__init__(dataset)
+
+        if chem_param is None:
+            chem_param = sigmoid_param('chem')
+        if elec_param is None:
+            elec_param = sigmoid_param('elec')
+        self.__chem_param = tuple(chem_param)
+        self.__elec_param = tuple(elec_param)
+
+        try:
+            if precision not in ('double', 'single'):
+                raise ValueError("precision must be 'double' or 'single'")
+        except ValueError:
+            raise
+        self.__precision = precision
+
+        # get a list with inhibitory connectivity matrices
+        self.__PVdist = list() # the list of matrices of distances
+        self.__chem_dist = list() # intersomatic distances of chemical syn
+        self.__elec_dist = list() # intersomatic distances of electrical syn
+        for i in range(len(dataset)):
+            nPV= int(dataset.filename(i)[0])
+
+            if nPV>1: # read distances from 2 or more PV-cells
+                imatrix = II_slice(dataset.dist(i), nPV)
+
+                if not np.isnan( imatrix[0][0] ): # TODO:remove NaN
+                    self.PVdist.append( imatrix )
+                    dist = imatrix.ravel()[np.flatnonzero(imatrix)] 
+                    self.__chem_dist +=list( np.abs(dist) )
+                    self.__elec_dist +=list( np.unique(np.abs(dist)) )
+
+        print('{:2d} distances matrices loaded'.format( len(self.PVdist) ))
+        print('{:2d} distances of chemical synapses'.format( len(self.chem_dist) ))
+        print('{:2d} distances of electrical synapses'.format( len(self.elec_dist) ))
+
+        self.__PC = dataset.motif.ii_chem_found/dataset.motif.ii_chem_tested
+        self.__PE = dataset.motif.ii_elec_found/dataset.motif.ii_elec_tested
+
+        self._precompute()
+
+    def _precompute(self):
+        """
+        Computes the probabilities of connection of all distance 
+        matrices and the thresholds of 32-bit random integers.
+        """
+        # probability tensors stacked by the number of PV-cells
+        self.__Pdist = dict()
+        for dist in self.PVdist:
+            n = dist.shape[0]
+            Pchem, Pelec = self.__Pdist.setdefault(n, (list(), list()))
+            Pchem.append( fchem(np.abs(dist), self.chem_param)/100. )
+            Pelec.append( felec(np.abs(dist), self.elec_param)/100. )
+
+        for n in self.__Pdist:
+            Pchem, Pelec = self.__Pdist[n]
+            self.__Pdist[n] = ( np.array(Pchem), np.array(Pelec) )
+
+        # thresholds of 32-bit random integers
+        self.__Tdist = dict()
+        for n, (Pchem, Pelec) in self.__Pdist.items():
+            T = np.clip(np.round(np.array([Pchem, Pelec])*2**32), 0, 2**32-1)
+            T = T.astype(np.uint32).swapaxes(0, 1) # (recordings, 2, n, n)
+            self.__Tdist[n] = T
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates chemical and electrical synapses with a distance-
+        dependent connection probability which is obtained from a sigmoid
+        funciton fitted to the empirical data. The recordings with the
+        same number of PV-cells of all iterations are simulated at once 
+        against their stack of probabilities.
+
+        Arguments:
+        n_iter: int
+            Number of iterations (datasets) to simulate.
+        rng: RandomState
+            the random number generator.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        sizes = sorted(self.__Pdist)
+        ndraws = [self.__Tdist[n].size for n in sizes]
+        if self.precision == 'single':
+            R = rng.randint(0, 2**32, size = (n_iter, sum(ndraws)), 
+                dtype = np.uint32)
+        else:
+            R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        start = 0
+        for n, size in zip(sizes, ndraws):
+            nRecord = len(self.__Tdist[n])
+            myR = R[:, start:start+size].reshape(n_iter, nRecord, 2, n, n)
+            start += size
+
+            if self.precision == 'single':
+                T = self.__Tdist[n]
+                chem, elec = _threshold(myR, T[:, 0], T[:, 1])
+            else:
+                chem, elec = _threshold(myR, *self.__Pdist[n])
+
+            # sum all recordings of the same iteration
+            chem = chem.reshape(n_iter*nRecord, n, n)
+            elec = elec.reshape(n_iter*nRecord, n, n)
+            mycount = _count(chem, elec).reshape(n_iter, nRecord, -1)
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # random numbers (float or 32-bit integers) and planes (bool)
+        # of the two synapse types, plus the padded planes to pack them
+        itemsize = 4 if self.precision == 'single' else 8
+
+        nbytes = 0
+        for dist in self.PVdist:
+            n = dist.shape[0]
+            nbytes += 2*n*n*(itemsize + 2) + 2*NMAX*NMAX
+
+        return( nbytes )
+
+    def _probabilities(self):
+        """
+        Returns a dictionary whose keys are the number of cells of the
+        simulated recordings and values are tuples with two stacks 
+        of matrices (one per recording) with the probabilities of 
+        chemical and electrical synapses.
+        """
+        return( self.__Pdist )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the parameters of the sigmoid 
+        functions and the precision of the simulations.
+        """
+        mydict = dict()
+        mydict['chem_param'] = list(self.chem_param)
+        mydict['elec_param'] = list(self.elec_param)
+        mydict['precision'] = self.precision
+
+        return( mydict )
+
+    def _setparameters(self, chem_param = None, elec_param = None, 
+        precision = None):
+        """
+        Changes the parameters of the sigmoid functions or the 
+        precision (see with_parameters).
+        """
+        if precision is not None:
+            try:
+                if precision not in ('double', 'single'):
+                    raise ValueError("precision must be 'double' or 'single'")
+            except ValueError:
+                raise
+            self.__precision = precision
+        if chem_param is not None:
+            self.__chem_param = tuple(chem_param)
+        if elec_param is not None:
+            self.__elec_param = tuple(elec_param)
+
+        self._precompute()
+
+    # only getters for private attributes 
+    PVdist = property(lambda self: self.__PVdist)
+    precision = property(lambda self: self.__precision)
+    chem_param = property(lambda self: self.__chem_param)
+    elec_param = property(lambda self: self.__elec_param)
+    chem_dist = property(lambda self: self.__chem_dist)
+    elec_dist = property(lambda self: self.__elec_dist)
+    PC = property(lambda self: self.__PC)
+    PE = property(lambda self: self.__PE)
+
+class IIConditionalModel(IIModel):
+    """
+    This is a connectivity model where electrical synapses are drawn
+    first, and chemical synapses are then drawn with a probability
+    that depends on whether the two interneurons are electrically
+    coupled. Unlike IIUniformModel and IISigmoidModel, chemical
+    synapses are more frequent between coupled cells if they are
+    in the dataset.
+
+    The probabilities are estimated from the dataset: constant
+    probabilities are the fractions of pairs tested with synapses,
+    and distance-dependent probabilities are sigmoid functions of
+    the intersomatic distance fitted by maximum likelihood (see
+    inet.fitting) to the pairs of coupled and uncoupled cells.
+    """
+    def __init__(self, dataset, distance = False, chem_param = None,
+        elec_param = None):
+        """
+
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module)
+
+        distance: bool (default False)
+            if True, the probabilities depend on the distance between
+            the interneurons, and only recordings with distances are
+            simulated.
+
+        chem_param: tuple
+            only if distance is True, the parameters (A, C, r) of the
+            sigmoid functions of chemical synapses between coupled
+            and uncoupled cells, as a tuple (coupled, uncoupled).
+            Default are fitted to the dataset.
+
+        elec_param: tuple
+            only if distance is True, the parameters (A, C, r) of the
+            sigmoid function of electrical synapses. Default are the
+            parameters of the package data.
+        """
+        super(IIConditionalModel, self).__init__(dataset)
+        self.__distance = distance
+
+        # probabilities of synapses (see IIUniformModel)
+        motif = dataset.motif
+        coupled = 2*motif.ii_elec_found # ordered pairs tested
+        self.__PE = motif.ii_elec_found/motif.ii_elec_tested
+        self.__PC = ( motif.ii_c1e_found/coupled,
+            (motif.ii_chem_found - motif.ii_c1e_found)/
+            (motif.ii_chem_tested - coupled) )
+
+        self.__PVconf = list()
+        for nPV in range(2,9): # between 2 and 8 simultaneous cells
+            nRecord = np.sum( dataset.IN[nPV].values() )
+            if nRecord: # larger than zero recordings
+                self.PVconf.append((nPV, nRecord))
+
+        # distances and synapses of the recordings with distances
+        self.__PVdist = list()
+        x, y, c = list(), list(), list() # chemical pairs tested
+        for i in range(len(dataset)):
+            nPV = int(dataset.filename(i)[0])
+
+            if nPV > 1:
+                dist = II_slice(dataset.dist(i), nPV)
+                if not np.isnan( dist[0][0] ):
+                    self.PVdist.append( dist )
+                    chem, elec = decode(II_slice(dataset.matrix(i), nPV))
+                    pre, post = np.nonzero(~np.eye(nPV, dtype=bool))
+                    x.append( np.abs(dist[pre, post]) )
+                    y.append( chem[pre, post] )
+                    c.append( elec[pre, post] )
+
+        if distance:
+            if chem_param is None:
+                x, y, c = np.concatenate(x), np.concatenate(y), \
+                    np.concatenate(c)
+                chem_param = ( fit_sigmoid(x[c], y[c]),
+                    fit_sigmoid(x[~c], y[~c]) )
+            if elec_param is None:
+                elec_param = sigmoid_param('elec')
+            chem_param = tuple(tuple(p) for p in chem_param)
+            elec_param = tuple(elec_param)
+
+            print('{:2d} distances matrices loaded'.format(len(self.PVdist)))
+        else:
+            for nPV, nRecord in self.PVconf:
+                print('{:2d} recordings with {} PV-cells'.format(nRecord,nPV))
+
+        self.__chem_param = chem_param
+        self.__elec_param = elec_param
+
+        self._precompute()
+
+    def _precompute(self):
+        """
+        Computes the probabilities of chemical synapses between coupled
+        and uncoupled cells and of electrical synapses, stacked by the
+        number of PV-cells.
+        """
+        self.__Pdist = dict()
+        if self.distance:
+            coupled, uncoupled = self.chem_param
+            for dist in self.PVdist:
+                n, d = dist.shape[0], np.abs(dist)
+                P = self.__Pdist.setdefault(n, (list(), list(), list()))
+                P[0].append( sigmoid(d, *coupled)/100. )
+                P[1].append( sigmoid(d, *uncoupled)/100. )
+                P[2].append( felec(d, self.elec_param)/100. )
+
+            for n in self.__Pdist:
+                self.__Pdist[n] = tuple(np.array(P) for P in self.__Pdist[n])
+        else:
+            for nPV, nRecord in self.PVconf:
+                shape = (nRecord, nPV, nPV)
+                self.__Pdist[nPV] = ( np.full(shape, self.PC[0]),
+                    np.full(shape, self.PC[1]), np.full(shape, self.PE) )
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates electrical synapses and then chemical synapses given
+        the electrical ones. The recordings with the same number of
+        PV-cells of all iterations are simulated at once.
+
+        Arguments:
+        n_iter: int
+            Number of iterations (datasets) to simulate.
+        rng: RandomState
+            the random number generator.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        sizes = sorted(self.__Pdist)
+        ndraws = [2*self.__Pdist[n][0].size for n in sizes]
+        R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        start = 0
+        for n, size in zip(sizes, ndraws):
+            Pcoupled, Puncoupled, Pelec = self.__Pdist[n]
+            nRecord = len(Pelec)
+            myR = R[:, start:start+size].reshape(n_iter, nRecord, 2, n, n)
+            start += size
+
+            chem, elec = _conditional_threshold(myR, Pcoupled, Puncoupled,
+                Pelec)
+
+            # sum all recordings of the same iteration
+            chem = chem.reshape(n_iter*nRecord, n, n)
+            elec = elec.reshape(n_iter*nRecord, n, n)
+            mycount = _count(chem, elec).reshape(n_iter, nRecord, -1)
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # random numbers (float), the probabilities of chemical synapses
+        # (float) and planes (bool), plus the padded planes to pack them
+        nbytes = 0
+        for n, P in self.__Pdist.items():
+            nbytes += len(P[0]) * (n*n*(2*8 + 8 + 3) + 2*NMAX*NMAX)
+
+        return( nbytes )
+
+    def _probabilities(self):
+        """
+        Returns a dictionary whose keys are the number of cells of the
+        simulated recordings and values are tuples with two stacks
+        of matrices (one per recording) with the probabilities of
+        chemical and electrical synapses. The probabilities of
+        chemical synapses are averaged over the electrical ones.
+        """
+        mydict = dict()
+        for n, (Pcoupled, Puncoupled, Pelec) in self.__Pdist.items():
+            mydict[n] = (Pelec*Pcoupled + (1 - Pelec)*Puncoupled, Pelec)
+
+        return( mydict )
+
+    def _stateprobabilities(self, n):
+        """
+        Returns the probabilities of the 8 states of every pair of
+        cells in the recordings with n cells (see
+        IIModel._stateprobabilities), where chemical synapses depend
+        on the electrical one.
+        """
+        Pcoupled, Puncoupled, Pelec = self.__Pdist[n]
+        i, j = np.triu_indices(n, 1)
+
+        pe = Pelec[:, i, j].ravel()[:, np.newaxis]
+        P = list()
+        for Pchem in (Pcoupled, Puncoupled):
+            pa = Pchem[:, i, j].ravel()[:, np.newaxis] # i->j
+            pb = Pchem[:, j, i].ravel()[:, np.newaxis] # j->i
+            P.append( np.where(_A, pa, 1 - pa)*np.where(_B, pb, 1 - pb) )
+
+        return( np.where(_E, pe*P[0], (1 - pe)*P[1]) )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the probabilities of chemical
+        synapses between coupled and uncoupled cells (PC) and of
+        electrical synapses (PE), or the parameters of their sigmoid
+        functions if they depend on the distance.
+        """
+        mydict = dict(distance = self.distance)
+        if self.distance:
+            mydict['chem_param'] = [list(p) for p in self.chem_param]
+            mydict['elec_param'] = list(self.elec_param)
+        else:
+            mydict['PC'] = [float(p) for p in self.PC]
+            mydict['PE'] = float(self.PE)
+
+        return( mydict )
+
+    def _setparameters(self, PC = None, PE = None, chem_param = None,
+        elec_param = None):
+        """
+        Changes the probabilities (PC is a tuple with the probability
+        between coupled and uncoupled cells) or the parameters of the
+        sigmoid functions (see with_parameters).
+        """
+        if PC is not None:
+            self.__PC = tuple(PC)
+        if PE is not None:
+            self.__PE = PE
+        if chem_param is not None:
+            self.__chem_param = tuple(tuple(p) for p in chem_param)
+        if elec_param is not None:
+            self.__elec_param = tuple(elec_param)
+
+        self._precompute()
+
+    # only getters for private attributes
+    distance = property(lambda self: self.__distance)
+    PVconf = property(lambda self: self.__PVconf)
+    PVdist = property(lambda self: self.__PVdist)
+    PC = property(lambda self: self.__PC)
+    PE = property(lambda self: self.__PE)
+    chem_param = property(lambda self: self.__chem_param)
+    elec_param = property(lambda self: self.__elec_param)
+
+#-------------------------------------------------------------------------
+# Heterogeneous propensities: the probability of a synapse is the
+# logistic function of the propensities of the two cells (normal random
+# effects), plus an optional offset of the distance between them.
+#-------------------------------------------------------------------------
+
+def _expit(x):
+    """
+    returns the logistic function of x
+    """
+    return( 0.5*(1 + np.tanh(0.5*x)) )
+
+def _logit(p):
+    """
+    returns the inverse of the logistic function
+    """
+    return( np.log(p) - np.log1p(-p) )
+
+def _normal(u):
+    """
+    transforms uniform random numbers into standard normal ones
+    """
+    return( ndtri(np.maximum(u, np.finfo(float).tiny)) )
+
+def _chem_logits(param, Z, offset = 0.):
+    """
+    returns the logits of chemical synapses of a stack of matrices.
+    Z are standard normal numbers of shape (..., 2, n) with the out-
+    and in-propensities of every cell before scaling.
+    """
+    mu, sout, sin, rho = param
+    U = Z[..., 0, :]
+    V = rho*Z[..., 0, :] + np.sqrt(1 - rho*rho)*Z[..., 1, :]
+
+    return( mu + sout*U[..., :, np.newaxis] + sin*V[..., np.newaxis, :] +
+        offset )
+
+def _elec_logits(param, W, offset = 0.):
+    """
+    returns the logits of electrical synapses of a stack of matrices.
+    W are standard normal numbers of shape (..., n) with the
+    propensity of every cell before scaling.
+    """
+    mu, s = param
+
+    return( mu + s*(W[..., :, np.newaxis] + W[..., np.newaxis, :]) + offset )
+
+def _propensity_nll(param, synapse, planes, offsets, Z):
+    """
+    returns the negative log-likelihood of the recorded matrices, with
+    the propensities integrated by Monte Carlo.
+
+    Arguments
+    ---------
+    param : tuple
+        (mu, sout, sin, rho) for chemical synapses, or (mu, s) for
+        electrical synapses.
+    synapse : str
+        'chem' or 'elec'.
+    planes : dict
+        the boolean stacks of matrices (recordings, n, n) by size n.
+    offsets : dict
+        the logit offsets of every matrix (recordings, n, n) by size n.
+    Z : dict
+        standard normal numbers (draws, 2, n) by size n.
+    """
+    nll = 0.
+    for n, A in planes.items():
+        if synapse == 'chem':
+            mask = ~np.eye(n, dtype=bool)
+            eta = _chem_logits(param, Z[n])
+        else:
+            mask = np.triu(~np.eye(n, dtype=bool))
+            eta = _elec_logits(param, Z[n][:, 0])
+
+        # (recordings, draws, n, n)
+        eta = eta[np.newaxis] + offsets[n][:, np.newaxis]
+        ll = -np.logaddexp(0, np.where(A[:, np.newaxis], -eta, eta))
+        ll = (ll*mask).sum(-1).sum(-1)
+
+        llmax = ll.max(1)
+        nll -= np.sum(llmax + np.log(np.mean(np.exp(ll - llmax[:, np.newaxis]),
+            axis=1)))
+
+    return( nll )
+
+class IIPropensityModel(IIModel):
+    """
+    This is a connectivity model where every interneuron has its own
+    propensity to make and receive chemical synapses and to be
+    electrically coupled, so that some cells are hubs. In every
+    iteration, cell i draws normal out- and in-propensities u_i and
+    v_i (with correlation rho) and an electrical propensity w_i, and
+
+    logit P(i->j) = mu + sout*u_i + sin*v_j [+ logit fchem(d_ij)]
+    logit P(i-j)  = mue + se*(w_i + w_j)    [+ logit felec(d_ij)]
+
+    where the distance terms are only used if distance is True. With
+    zero standard deviations, the model is IIUniformModel (or
+    IISigmoidModel with mu = mue = 0).
+
+    The parameters are fitted by maximum likelihood of the recorded
+    matrices, where the propensities are integrated by Monte Carlo.
+    The likelihood depends on the heterogeneity through the degrees
+    of the cells: synapses concentrated on a few cells increase the
+    standard deviations.
+    """
+    def __init__(self, dataset, distance = False, chem = None, elec = None,
+        chem_param = None, elec_param = None, n_draws = 2000, seed = 0):
+        """
+
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module)
+
+        distance: bool (default False)
+            if True, the logits of the sigmoid functions of the
+            distance are added, and only recordings with distances are
+            simulated.
+
+        chem: tuple
+            the parameters (mu, sout, sin, rho) of chemical synapses.
+            Default are fitted to the dataset.
+
+        elec: tuple
+            the parameters (mue, se) of electrical synapses. Default
+            are fitted to the dataset.
+
+        chem_param, elec_param: tuple
+            only if distance is True, the parameters (A, C, r) of the
+            sigmoid functions (see sigmoid). Default are the
+            parameters of the package data.
+
+        n_draws: int
+            number of Monte Carlo draws of the propensities to fit.
+
+        seed: int
+            seed of the Monte Carlo draws to fit.
+        """
+        super(IIPropensityModel, self).__init__(dataset)
+        self.__distance = distance
+
+        if chem_param is None:
+            chem_param = sigmoid_param('chem')
+        if elec_param is None:
+            elec_param = sigmoid_param('elec')
+        self.__chem_param = tuple(chem_param)
+        self.__elec_param = tuple(elec_param)
+
+        motif = dataset.motif
+        self.__P = ( motif.ii_chem_found/motif.ii_chem_tested,
+            motif.ii_elec_found/motif.ii_elec_tested )
+
+        # recorded synapses and logit offsets by number of PV-cells
+        planes, offsets = dict(), dict()
+        for i in range(len(dataset)):
+            nPV = int(dataset.filename(i)[0])
+            if nPV < 2:
+                continue
+
+            dist = np.abs(II_slice(dataset.dist(i), nPV))
+            if distance and np.isnan(dist[0][0]):
+                continue
+
+            C, E = decode(II_slice(dataset.matrix(i), nPV))
+            myplanes = planes.setdefault(nPV, (list(), list()))
+            myplanes[0].append( C )
+            myplanes[1].append( E )
+
+            myoffsets = offsets.setdefault(nPV, (list(), list()))
+            if distance:
+                myoffsets[0].append( _logit(fchem(dist, chem_param)/100.) )
+                myoffsets[1].append( _logit(felec(dist, elec_param)/100.) )
+            else:
+                myoffsets[0].append( np.zeros((nPV, nPV)) )
+                myoffsets[1].append( np.zeros((nPV, nPV)) )
+
+        self.__planes = dict( (n, tuple(np.array(x) for x in planes[n]))
+            for n in planes )
+        self.__offsets = dict( (n, tuple(np.array(x) for x in offsets[n]))
+            for n in offsets )
+
+        nRecord = sum(len(C) for C, E in self.__planes.values())
+        print('{:2d} matrices loaded'.format(nRecord))
+
+        if chem is None or elec is None:
+            fitchem, fitelec = self.fit(n_draws, seed)
+        self.__chem = tuple(fitchem if chem is None else chem)
+        self.__elec = tuple(fitelec if elec is None else elec)
+
+    def fit(self, n_draws = 2000, seed = 0):
+        """
+        Fits the parameters of chemical and electrical synapses by
+        maximum likelihood of the recorded matrices.
+
+        Arguments:
+        n_draws: int
+            number of Monte Carlo draws of the propensities of every
+            recording (the same draws are used for all parameters).
+        seed: int
+            seed of the Monte Carlo draws.
+
+        Returns:
+        A tuple with the parameters (mu, sout, sin, rho) of chemical
+        synapses and (mue, se) of electrical synapses.
+        """
+        rng = np.random.RandomState(seed)
+        Z = dict( (n, rng.standard_normal((n_draws, 2, n)))
+            for n in sorted(self.__planes) )
+
+        myfit = list()
+        for k, synapse in enumerate(('chem', 'elec')):
+            planes = dict( (n, P[k]) for n, P in self.__planes.items() )
+            offsets = dict( (n, O[k]) for n, O in self.__offsets.items() )
+
+            # the initial guess is the homogeneous model
+            p = self.__P[k]
+            if synapse == 'chem':
+                p0, bounds = (_logit(p), 0.5, 0.5, 0.), \
+                    ((-10, 10), (0, 5), (0, 5), (-0.95, 0.95))
+            else:
+                p0, bounds = (_logit(p), 0.5), ((-10, 10), (0, 5))
+            if self.distance:
+                p0 = (0.,) + p0[1:]
+
+            res = minimize(_propensity_nll, p0, args=(synapse, planes,
+                offsets, Z), method='L-BFGS-B', bounds=bounds)
+            myfit.append( tuple(float(x) for x in res.x) )
+
+        return( tuple(myfit) )
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates the propensities of all cells and then their
+        synapses. The recordings with the same number of PV-cells of
+        all iterations are simulated at once.
+
+        Arguments:
+        n_iter: int
+            Number of iterations (datasets) to simulate.
+        rng: RandomState
+            the random number generator.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        sizes = sorted(self.__planes)
+        ndraws = [len(self.__planes[n][0])*(3*n + 2*n*n) for n in sizes]
+        R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        start = 0
+        for n, size in zip(sizes, ndraws):
+            Ochem, Oelec = self.__offsets[n]
+            nRecord = len(Ochem)
+            myR = R[:, start:start+size].reshape(n_iter, nRecord, -1)
+            start += size
+
+            Z = _normal(myR[..., :3*n]).reshape(n_iter, nRecord, 3, n)
+            U = myR[..., 3*n:].reshape(n_iter, nRecord, 2, n, n)
+
+            offdiag = ~np.eye(n, dtype = bool)
+            Pchem = _expit(_chem_logits(self.chem, Z[:, :, :2], Ochem))
+            Pelec = _expit(_elec_logits(self.elec, Z[:, :, 2], Oelec))
+            chem = (U[:, :, 0] < Pchem) & offdiag
+            elec = (U[:, :, 1] < Pelec) & np.triu(offdiag)
+
+            # sum all recordings of the same iteration
+            chem = chem.reshape(n_iter*nRecord, n, n)
+            elec = elec.reshape(n_iter*nRecord, n, n)
+            mycount = _count(chem, elec).reshape(n_iter, nRecord, -1)
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # random numbers (float), logits and probabilities (float) and
+        # planes (bool), plus the padded planes to pack them
+        nbytes = 0
+        for n, (C, E) in self.__planes.items():
+            nbytes += len(C) * ((3*n + 2*n*n)*(8 + 8) + 2*n*n*(8 + 2) +
+                2*NMAX*NMAX)
+
+        return( nbytes )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the parameters of chemical and
+        electrical synapses and, if they depend on the distance, the
+        parameters of the sigmoid functions.
+        """
+        mydict = dict(distance = self.distance)
+        mydict['chem'] = list(self.chem)
+        mydict['elec'] = list(self.elec)
+        if self.distance:
+            mydict['chem_param'] = list(self.chem_param)
+            mydict['elec_param'] = list(self.elec_param)
+
+        return( mydict )
+
+    def _setparameters(self, chem = None, elec = None):
+        """
+        Changes the parameters of chemical (mu, sout, sin, rho) or
+        electrical (mue, se) synapses (see with_parameters).
+        """
+        if chem is not None:
+            self.__chem = tuple(chem)
+        if elec is not None:
+            self.__elec = tuple(elec)
+
+    # only getters for private attributes
+    distance = property(lambda self: self.__distance)
+    chem = property(lambda self: self.__chem)
+    elec = property(lambda self: self.__elec)
+    chem_param = property(lambda self: self.__chem_param)
+    elec_param = property(lambda self: self.__elec_param)
+    planes = property(lambda self: self.__planes)
+
+#-------------------------------------------------------------------------
+# Degree-preserving rewiring: every move is applied at once to a stack of
+# matrices, with uniform random numbers given as arguments (one per 
+# matrix). Moves that are not valid in a matrix leave it unchanged.
+#-------------------------------------------------------------------------
+
+def _pick(A, u):
+    """
+    picks an edge of every matrix of a stack with a uniform random 
+    number per matrix. Returns the arrays of row, column and whether 
+    the matrix has edges.
+    """
+    K, n = A.shape[0], A.shape[-1]
+    cs = np.cumsum(A.reshape(K, n*n), axis=1)
+    m = cs[:, -1]
+
+    target = np.floor(u*m).astype(int) + 1 # the edge number (1 to m)
+    index = np.minimum((cs < target[:, np.newaxis]).sum(1), n*n - 1)
+
+    return( index // n, index % n, m > 0 )
+
+def _swap_chem(A, u1, u2):
+    """
+    double-edge swap of chemical synapses: a->b and c->d are replaced 
+    by a->d and c->b. It preserves in- and out-degrees.
+    """
+    k = np.arange(len(A))
+    a, b, valid = _pick(A, u1)
+    c, d, _ = _pick(A, u2)
+
+    valid &= (a != c) & (b != d) & (a != d) & (c != b)
+    valid &= ~A[k, a, d] & ~A[k, c, b]
+
+    k, a, b, c, d = k[valid], a[valid], b[valid], c[valid], d[valid]
+    A[k, a, b] = A[k, c, d] = False
+    A[k, a, d] = A[k, c, b] = True
+
+def _reverse_triangle(A, u1, u2):
+    """
+    reverses a cycle of chemical synapses a->b->c->a if the reversed 
+    synapses do not exist. It preserves in- and out-degrees, and with 
+    double-edge swaps it reaches all matrices with the same degrees.
+    """
+    k = np.arange(len(A))
+    n = A.shape[-1]
+    a, b, valid = _pick(A, u1)
+    c = np.minimum(np.floor(u2*n).astype(int), n - 1)
+
+    valid &= (c != a) & (c != b)
+    valid &= A[k, b, c] & A[k, c, a]
+    valid &= ~A[k, b, a] & ~A[k, c, b] & ~A[k, a, c]
+
+    k, a, b, c = k[valid], a[valid], b[valid], c[valid]
+    A[k, a, b] = A[k, b, c] = A[k, c, a] = False
+    A[k, b, a] = A[k, c, b] = A[k, a, c] = True
+
+def _swap_elec(E, u1, u2):
+    """
+    double-edge swap of electrical synapses (symmetric matrices): 
+    a-b and c-d are replaced by a-d and c-b. It preserves the number
+    of electrical synapses of every cell.
+    """
+    k = np.arange(len(E))
+    a, b, valid = _pick(E, u1) # random orientation of the edge
+    c, d, _ = _pick(E, u2)
+
+    valid &= (a != c) & (a != d) & (b != c) & (b != d)
+    valid &= ~E[k, a, d] & ~E[k, c, b]
+
+    k, a, b, c, d = k[valid], a[valid], b[valid], c[valid], d[valid]
+    E[k, a, b] = E[k, b, a] = E[k, c, d] = E[k, d, c] = False
+    E[k, a, d] = E[k, d, a] = E[k, c, b] = E[k, b, c] = True
+
+class IIRewiringModel(IIModel):
+    """
+    This is a connectivity model that randomizes the recorded matrices
+    preserving the number of chemical synapses sent and received by 
+    every interneuron, and the number of electrical synapses of every 
+    interneuron. Cells with more synapses in the recordings have the 
+    same number of synapses in the simulations.
+
+    Every iteration rewires all recorded matrices with n_swaps rounds
+    of moves, each one a double-edge swap of chemical synapses, a 
+    reversal of a cycle of three chemical synapses and a double-edge 
+    swap of electrical synapses. The moves are applied to all 
+    recordings with the same number of PV-cells of all iterations at
+    once.
+    """
+    def __init__(self, dataset, n_swaps = 50):
+        """
+        
+        Arguments
+        ---------
+        dataset: DataLoaderObject (see DataLoader in inet module) 
+
+        n_swaps: int
+            the number of rounds of moves to rewire every matrix.
+        """
+        super(IIRewiringModel, self).__init__(dataset)
+        self.__n_swaps = n_swaps
+
+        # recorded chemical and electrical synapses by number of PV-cells
+        self.__planes = dict()
+        for i in range(len(dataset)):
+            nPV = int(dataset.filename(i)[0])
+            if nPV > 1:
+                chem, elec = decode(II_slice(dataset.matrix(i), nPV))
+                C, E = self.__planes.setdefault(nPV, (list(), list()))
+                C.append(chem)
+                E.append(elec)
+
+        for n in self.__planes:
+            C, E = self.__planes[n]
+            self.__planes[n] = ( np.array(C), np.array(E) )
+
+        nRecord = sum(len(C) for C, E in self.__planes.values())
+        print('{:2d} matrices loaded'.format(nRecord))
+
+    def _simulate(self, n_iter, rng):
+        """
+        Simulates n_iter iterations by rewiring the recorded matrices.
+
+        Arguments:
+        n_iter: int
+            Number of iterations (datasets) to simulate.
+        rng: RandomState
+            the random number generator.
+
+        Returns:
+        An integer NumPy array with the motifs found in every iteration
+        (rows) for every motif in motiflist (columns).
+        """
+        sizes = sorted(self.__planes)
+        ndraws = [len(self.__planes[n][0])*self.n_swaps*6 for n in sizes]
+        R = rng.random_sample((n_iter, sum(ndraws)))
+
+        mysim = np.zeros((n_iter, len(self.motiflist)), dtype=int)
+
+        start = 0
+        for n, size in zip(sizes, ndraws):
+            C, E = self.__planes[n]
+            nRecord = len(C)
+            myR = R[:, start:start+size].reshape(n_iter*nRecord, 
+                self.n_swaps, 6)
+            start += size
+
+            chem = np.tile(C, (n_iter, 1, 1))
+            elec = np.tile(E, (n_iter, 1, 1))
+            for u in np.rollaxis(myR, 1):
+                _swap_chem(chem, u[:, 0], u[:, 1])
+                _reverse_triangle(chem, u[:, 2], u[:, 3])
+                _swap_elec(elec, u[:, 4], u[:, 5])
+
+            mycount = _count(chem, np.triu(elec)).reshape(n_iter, nRecord, -1)
+            mysim += mycount.sum(1)
+
+        return( mysim )
+
+    def nbytes(self):
+        """
+        Returns the approximated number of bytes required to simulate
+        one iteration.
+        """
+        # random numbers (float), the planes (bool) and their cumulative
+        # sums (int), plus the padded planes to pack them
+        nbytes = 0
+        for n, (C, E) in self.__planes.items():
+            nbytes += len(C) * (self.n_swaps*6*8 + 2*n*n*(1 + 8) + 
+                2*NMAX*NMAX)
+
+        return( nbytes )
+
+    def parameters(self):
+        """
+        Returns a dictionary with the number of rounds of moves.
+        """
+        return( dict(n_swaps = self.n_swaps) )
+
+    def _setparameters(self, n_swaps = None):
+        """
+        Changes the number of rounds of moves (see with_parameters).
+        """
+        if n_swaps is not None:
+            self.__n_swaps = n_swaps
+
+    # only getters for private attributes 
+    n_swaps = property(lambda self: self.__n_swaps)
+    planes = property(lambda self: self.__planes)
@@ -0,0 +1,269 @@
+"""
+store.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:17:12 UTC 2026
+
+A columnar on-disk store for the motifs simulated by the null models
+(see inet.simulations). A store is a directory with one binary file
+per motif (the motifs of all iterations) and a JSON file with the
+motifs, the number of iterations and the metadata of the simulation
+(model, parameters, seed and dataset fingerprint).
+
+Every motif is read as a memory-mapped array, so that stores with
+millions of iterations can be opened and sliced without loading them
+in memory, and new iterations are appended at the end of the files.
+
+Example
+-------
+>>> from inet.store import ResultStore
+>>> mystore = ResultStore('uniform', mode = 'w', motifs = ['ii_c2'])
+>>> mystore.append( np.array([[3], [5]]) )
+>>> mystore = ResultStore('uniform') # read-only
+>>> mystore['ii_c2'][:10] # memory-mapped
+"""
+
+import os
+import json
+
+import numpy as np
+
+METAFILE = 'metadata.json'
+
+_strings = (str, type(u'')) # motifs read from JSON are unicode in Python 2
+
+def _dumpjson(fname, mydict):
+    """
+    writes a dictionary in a JSON file. The file is replaced at
+    once, so that it is never left half-written.
+    """
+    tmpname = fname + '.tmp'
+    with open(tmpname, 'w') as f:
+        json.dump(mydict, f, indent = 1, sort_keys = True)
+    os.rename(tmpname, fname)
+
+class ResultStore(object):
+    """
+    A store with the motifs (columns) found in every iteration (rows)
+    of a simulation. Rows are read with the usual NumPy indexing,
+    and columns by the name of the motif:
+
+    >>> mystore[:1000] # 2D array of the first 1000 iterations
+    >>> mystore['ii_c2'] # memory-mapped 1D array
+    >>> mystore[:1000, 'ii_c2']
+    """
+
+    def __init__(self, path, mode = 'r', motifs = None, metadata = None,
+        dtype = 'int64'):
+        """
+        Opens or creates a store
+
+        Arguments
+        ---------
+        path : str
+            the directory of the store.
+        mode : str
+            'r' opens an existing store to read, 'a' opens a store to
+            read and write (it is created if it does not exist) and 'w'
+            creates a new store (an existing one is overwritten).
+        motifs : list
+            the names of the motifs (e.g., IIMotifCounter.motiflist).
+            Only required to create a store.
+        metadata : dict
+            JSON serializable metadata of the simulation. Only used to
+            create a store.
+        dtype : str
+            the NumPy type of the motifs. Only used to create a store.
+        """
+        try:
+            if mode not in ('r', 'a', 'w'):
+                raise ValueError("mode must be 'r', 'a' or 'w'")
+        except ValueError:
+            raise
+
+        self.__path = path
+        self.__mode = mode
+        fname = os.path.join(path, METAFILE)
+
+        if mode == 'w' or (mode == 'a' and not os.path.exists(fname)):
+            try:
+                if motifs is None:
+                    raise ValueError('motifs are required to create a store')
+            except ValueError:
+                raise
+
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+            self.__header = dict()
+            self.__header['motifs'] = list(motifs)
+            self.__header['dtype'] = np.dtype(dtype).str
+            self.__header['n_iter'] = 0
+            self.__header['metadata'] = dict() if metadata is None \
+                else dict(metadata)
+
+            for motif in self.motifs: # empty files
+                open(self._fname(motif), 'wb').close()
+            _dumpjson(fname, self.__header)
+
+        else:
+            try:
+                if not os.path.exists(fname):
+                    raise IOError('%s is not a result store' %path)
+            except IOError:
+                raise
+
+            with open(fname) as f:
+                self.__header = json.load(f)
+
+    def _fname(self, motif):
+        """
+        returns the file with the iterations of a motif
+        """
+        return( os.path.join(self.path, '%s.bin' %motif) )
+
+    def _checkmode(self):
+        """
+        raises IOError if the store was opened to read only
+        """
+        try:
+            if self.mode == 'r':
+                raise IOError('store opened in read-only mode')
+        except IOError:
+            raise
+
+    def _writeheader(self):
+        """
+        writes the motifs, number of iterations and metadata
+        """
+        self._checkmode()
+        _dumpjson(os.path.join(self.path, METAFILE), self.__header)
+
+    def column(self, motif):
+        """
+        Returns the iterations of a motif as a memory-mapped 1D array
+        (writable unless the store was opened with mode 'r').
+        """
+        try:
+            if motif not in self.motifs:
+                raise KeyError('unknown motif %s' %motif)
+        except KeyError:
+            raise
+
+        if self.n_iter == 0: # a file of size zero cannot be mapped
+            return( np.empty(0, dtype = self.dtype) )
+
+        mode = 'r' if self.mode == 'r' else 'r+'
+        return( np.memmap(self._fname(motif), dtype = self.dtype,
+            mode = mode, shape = (self.n_iter,)) )
+
+    def __getitem__(self, key):
+        """
+        Returns the motifs of the iterations selected. key is the name
+        of a motif, an index of the iterations, or a tuple with both.
+        """
+        if isinstance(key, tuple):
+            rows, motifs = key
+        elif isinstance(key, _strings):
+            rows, motifs = slice(None), key
+        else:
+            rows, motifs = key, self.motifs
+
+        if isinstance(motifs, _strings):
+            return( self.column(motifs)[rows] )
+
+        return( np.column_stack([self.column(m)[rows] for m in motifs]) )
+
+    def __len__(self):
+        """
+        Returns the number of iterations stored
+        """
+        return( self.n_iter )
+
+    def resize(self, n_iter):
+        """
+        Changes the number of iterations stored. New iterations are
+        set to zero, and can be written later with write().
+        """
+        self._checkmode()
+
+        itemsize = np.dtype(self.dtype).itemsize
+        for motif in self.motifs:
+            with open(self._fname(motif), 'r+b') as f:
+                f.truncate(n_iter*itemsize)
+
+        self.__header['n_iter'] = int(n_iter)
+        self._writeheader()
+
+    def write(self, start, rows):
+        """
+        Writes iterations from the row start on.
+
+        Arguments
+        ---------
+        start : int
+            the first iteration to write.
+        rows : 2D NumPy array or dict
+            the motifs of every iteration (rows) with the columns
+            ordered as in motifs, or a dictionary of 1D arrays whose
+            keys are the motifs.
+        """
+        self._checkmode()
+        columns = self._columns(rows)
+
+        try:
+            if start + len(columns[0]) > self.n_iter:
+                raise IndexError('only %d iterations stored' %self.n_iter)
+        except IndexError:
+            raise
+
+        itemsize = np.dtype(self.dtype).itemsize
+        for motif, values in zip(self.motifs, columns):
+            with open(self._fname(motif), 'r+b') as f:
+                f.seek(start*itemsize)
+                f.write( values.tostring() )
+
+    def append(self, rows):
+        """
+        Appends iterations at the end of the store (see write).
+        """
+        n_iter = self.n_iter
+        self.resize(n_iter + len(self._columns(rows)[0]))
+        self.write(n_iter, rows)
+
+    def _columns(self, rows):
+        """
+        returns a list of arrays with the motifs of every column
+        """
+        if isinstance(rows, dict):
+            columns = [np.asarray(rows[m]) for m in self.motifs]
+        else:
+            rows = np.atleast_2d(rows)
+            try:
+                if rows.shape[1] != len(self.motifs):
+                    raise ValueError('rows must have %d columns' \
+                        %len(self.motifs))
+            except ValueError:
+                raise
+            columns = [rows[:, i] for i in range(len(self.motifs))]
+
+        return( [np.ascontiguousarray(x, dtype = self.dtype)
+            for x in columns] )
+
+    def update(self, **kwargs):
+        """
+        Updates the metadata with the keyword arguments given.
+        """
+        self.__header['metadata'].update(kwargs)
+        self._writeheader()
+
+    # only getters for private attributes
+    path = property(lambda self: self.__path)
+    mode = property(lambda self: self.__mode)
+    motifs = property(lambda self: tuple(str(m) for m in self.__header['motifs']))
+    dtype = property(lambda self: np.dtype(str(self.__header['dtype'])))
+    n_iter = property(lambda self: self.__header['n_iter'])
+    metadata = property(lambda self: self.__header['metadata'])
+    shape = property(lambda self: (self.n_iter, len(self.motifs)))
@@ -0,0 +1,296 @@
+"""
+tissue.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:36:51 UTC 2026
+
+Generates pieces of tissue with cells placed in a 3D slab and
+connections that depend on the distance between somata. Unlike
+chem_distmatrix and elec_distmatrix (see inet.simulations), which
+connect the cells of a recording from its distance matrix, a piece
+of tissue can contain 10^5 cells or more.
+
+Cells of every type (e.g., 'PV' and 'GC') are placed uniformly in a
+slab of size (x, y, z) in um with a given density (cells per mm^3).
+Every connection rule gives the parameters of the sigmoid function
+(see sigmoid in inet.simulations) of the probability of connection
+(in percent) between a presynaptic and a postsynaptic cell type:
+
+{('PV', 'PV', 'chem'): (A, C, r), ('PV', 'PV', 'elec'): (A, C, r)}
+
+The probability of a sigmoid falls below pmin beyond its effective
+range, C + r*log(A/(100*pmin) - 1), so only pairs of cells within
+that range are candidates. They are found with a KD-tree of the
+postsynaptic cells for blocks of presynaptic cells, so that memory
+is bounded by the size of the block. Connections are returned as
+sparse matrices (presynaptic cells in rows).
+
+Example
+-------
+>>> from inet.tissue import Tissue
+>>> mytissue = Tissue(size = (1000, 1000, 300), seed = 0)
+>>> mytissue.chem # sparse matrix of chemical synapses
+>>> PV = mytissue.index('PV') # indices of PV cells
+>>> mytissue.chem[PV][:, PV].sum()
+"""
+
+from __future__ import division
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from inet.simulations import sigmoid, sigmoid_param
+
+_GROUP = 64 # presynaptic cells sharing a random number generator
+
+# cells per mm^3, orders of magnitude in the dentate gyrus. Set the
+# densities of the preparation simulated.
+DENSITY = {'PV': 1500., 'GC': 300000.}
+
+def default_rules():
+    """
+    Returns the connection rules between PV interneurons fitted to the
+    package data (see sigmoid_param in inet.simulations)
+    """
+    return( {('PV', 'PV', 'chem'): sigmoid_param('chem'),
+        ('PV', 'PV', 'elec'): sigmoid_param('elec')} )
+
+def effective_range(param, pmin = 1e-4):
+    """
+    Returns the distance (um) beyond which the probability of
+    connection of a sigmoid is smaller than pmin.
+
+    Arguments
+    ---------
+    param : tuple
+        the parameters (A, C, r) of the sigmoid function.
+    pmin : float
+        the smallest probability (not percent) considered.
+    """
+    A, C, r = param
+    if A/100. <= pmin:
+        return( 0. )
+
+    return( C + r*np.log(A/(100.*pmin) - 1) )
+
+def place_cells(size, density, rng = None):
+    """
+    Places cells uniformly in a slab.
+
+    Arguments
+    ---------
+    size : tuple
+        the size of the slab (x, y, z) in um.
+    density : dict
+        the number of cells per mm^3 of every cell type.
+    rng : RandomState
+        the random number generator (default is NumPy global one)
+
+    Returns
+    -------
+    A tuple (positions, celltypes, counts) with the positions of the
+    cells (cells x 3 NumPy array, um), the cell types sorted and the
+    number of cells of every type. Cells of the same type are
+    consecutive.
+    """
+    if rng is None:
+        rng = np.random
+
+    volume = np.prod(size)*1e-9 # mm^3
+    celltypes = tuple(sorted(density))
+    counts = [int(round(density[c]*volume)) for c in celltypes]
+
+    positions = rng.random_sample((sum(counts), 3))*np.asarray(size, float)
+
+    return( positions, celltypes, counts )
+
+def candidates(pre, post, cutoff):
+    """
+    Finds the pairs of cells within a distance.
+
+    Arguments
+    ---------
+    pre : 2D NumPy array
+        the positions of the presynaptic cells.
+    post : cKDTree
+        the tree of the positions of the postsynaptic cells.
+    cutoff : float
+        the maximal distance (um) between the cells of a pair.
+
+    Returns
+    -------
+    A tuple of NumPy arrays (i, j, dist) with the presynaptic and
+    postsynaptic cells of every pair and their distance, sorted by
+    presynaptic and postsynaptic cell.
+    """
+    pairs = cKDTree(pre).sparse_distance_matrix(post, cutoff,
+        output_type = 'ndarray')
+
+    # the order of the pairs found by the trees is not defined
+    order = np.argsort(pairs['i']*post.n + pairs['j'])
+
+    return( pairs['i'][order], pairs['j'][order], pairs['v'][order] )
+
+class Tissue(object):
+    """
+    A piece of tissue with cells in a slab and distance-dependent
+    chemical and electrical synapses
+    """
+
+    def __init__(self, size = (1000., 1000., 300.), density = DENSITY,
+        rules = None, seed = None, pmin = 1e-4, blocksize = 1000):
+        """
+        Places the cells and samples their connections
+
+        Arguments
+        ---------
+        size : tuple
+            the size of the slab (x, y, z) in um.
+        density : dict
+            the number of cells per mm^3 of every cell type.
+        rules : dict
+            the parameters (A, C, r) of the sigmoid function of every
+            connection (pre, post, synapse), where synapse is 'chem' or
+            'elec' (default the PV rules of default_rules).
+        seed : int
+            seed for the random number generators. If None, a seed is
+            chosen randomly.
+        pmin : float
+            the smallest probability of connection sampled (see
+            effective_range).
+        blocksize : int
+            the number of presynaptic cells whose candidates are
+            found at once (rounded to a multiple of 64). The
+            connections do not depend on it.
+        """
+        if rules is None:
+            rules = default_rules()
+        if seed is None:
+            seed = np.random.RandomState().randint(2**31)
+
+        try:
+            for pre, post, synapse in rules:
+                if synapse not in ('chem', 'elec'):
+                    raise ValueError("synapse must be 'chem' or 'elec'")
+                if pre not in density or post not in density:
+                    raise ValueError("no density of %s or %s" %(pre, post))
+        except ValueError:
+            raise
+
+        self.__size = tuple(float(x) for x in size)
+        self.__rules = dict(rules)
+        self.__seed = seed
+        self.__pmin = pmin
+
+        rng = np.random.RandomState([seed, 0])
+        self.__positions, self.__celltypes, counts = place_cells(size,
+            density, rng)
+        self.__start = dict(zip(self.__celltypes, np.cumsum([0] + counts)))
+        self.__count = dict(zip(self.__celltypes, counts))
+
+        n = len(self.__positions)
+        connections = {'chem': ([], []), 'elec': ([], [])}
+        for r, key in enumerate(sorted(self.__rules)):
+            pre, post, synapse = key
+            i, j = self._sample(key, r + 1, blocksize)
+            if synapse == 'elec': # gap junctions are symmetric
+                i, j = np.concatenate((i, j)), np.concatenate((j, i))
+            connections[synapse][0].append(i)
+            connections[synapse][1].append(j)
+
+        for synapse, (i, j) in connections.items():
+            i = np.concatenate(i) if i else np.empty(0, dtype = int)
+            j = np.concatenate(j) if j else np.empty(0, dtype = int)
+            mymatrix = sparse.coo_matrix((np.ones(len(i), dtype = bool),
+                (i, j)), shape = (n, n)).tocsr()
+            mymatrix.sum_duplicates()
+            if synapse == 'chem':
+                self.__chem = mymatrix
+            else:
+                self.__elec = mymatrix
+
+    def _sample(self, key, r, blocksize):
+        """
+        samples the connections of a rule, for blocks of presynaptic
+        cells
+        """
+        pre, post, synapse = key
+        same = pre == post
+        symmetric = same and synapse == 'elec'
+
+        post_index = self.index(post)
+        tree = cKDTree(self.__positions[post_index])
+
+        pre_index = self.index(pre)
+        param = self.__rules[key]
+        cutoff = effective_range(param, self.__pmin)
+        blocksize = _GROUP*max(1, blocksize//_GROUP)
+
+        ilist, jlist = list(), list()
+        for start in range(0, len(pre_index), blocksize):
+            stop = min(start + blocksize, len(pre_index))
+            i, j, dist = candidates(self.__positions[pre_index[start:stop]],
+                tree, cutoff)
+            i += start
+            if symmetric:
+                keep = i < j
+            elif same:
+                keep = i != j
+            else:
+                keep = np.ones(len(i), dtype = bool)
+            i, j, dist = i[keep], j[keep], dist[keep]
+
+            # one generator per group of presynaptic cells, so that
+            # the connections do not depend on the size of the block
+            group = i//_GROUP
+            bounds = np.searchsorted(group, np.unique(group))
+            u = np.empty(len(i))
+            for g, a, b in zip(group[bounds], bounds,
+                np.append(bounds[1:], len(i))):
+                rng = np.random.RandomState([self.__seed, r, g])
+                u[a:b] = rng.random_sample(b - a)
+
+            found = u < sigmoid(dist, *param)/100.
+            ilist.append( pre_index[i[found]] )
+            jlist.append( post_index[j[found]] )
+
+        return( np.concatenate(ilist), np.concatenate(jlist) )
+
+    def index(self, celltype):
+        """
+        Returns the indices of the cells of a type
+        """
+        try:
+            if celltype not in self.__start:
+                raise KeyError("unknown cell type %s" %celltype)
+        except KeyError:
+            raise
+
+        start = self.__start[celltype]
+        return( np.arange(start, start + self.__count[celltype]) )
+
+    def distance(self, i, j):
+        """
+        Returns the distances (um) between cells i and j
+        """
+        return( np.sqrt(np.sum((self.__positions[i] -
+            self.__positions[j])**2, axis = -1)) )
+
+    def __len__(self):
+        """
+        Returns the number of cells
+        """
+        return( len(self.__positions) )
+
+    # only getters for private attributes
+    size = property(lambda self: self.__size)
+    rules = property(lambda self: self.__rules)
+    seed = property(lambda self: self.__seed)
+    positions = property(lambda self: self.__positions)
+    celltypes = property(lambda self: self.__celltypes)
+    count = property(lambda self: dict(self.__count))
+    chem = property(lambda self: self.__chem)
+    elec = property(lambda self: self.__elec)
@@ -0,0 +1,145 @@
+"""
+unittest_bayesian.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:46:07 UTC 2026
+
+Unittest environment to test the summary statistics and the
+algorithms of the approximate Bayesian computation
+"""
+
+import unittest
+
+import numpy as np
+from loader import DataLoader
+from bayesian import ABC, PRIORS, _planes, _summaries
+
+def _data(dist, bins):
+    """
+    returns the distances and bins of recordings of 3 cells, as
+    ABC stores them
+    """
+    offdiag = ~np.eye(3, dtype=bool)
+    index = np.digitize(dist, bins) - 1
+    C = np.array([(index == b) & offdiag for b in range(len(bins) - 1)])
+    E = C & np.triu(offdiag)
+    tested = np.array([C.sum(-1).sum(-1).sum(-1), E.sum(-1).sum(-1).sum(-1)])
+
+    return( dict(dist = {3: dist}, bins = {3: (C.astype(float),
+        E.astype(float))}, tested = tested) )
+
+class TestSummaries(unittest.TestCase):
+    """
+    A major unittest class to test the summary statistics of datasets
+    """
+    dist = np.array([[[0, 20, 80], [20, 0, 60], [80, 60, 0]]], float)
+    bins = np.array([0, 50, 100])
+
+    def test_summaries(self):
+        """
+        Motifs and probabilities by distance of a known recording
+        """
+        data = _data(self.dist, self.bins)
+        chem = np.zeros((1, 1, 3, 3), dtype=bool)
+        elec = np.zeros((1, 1, 3, 3), dtype=bool)
+        chem[0, 0, 0, 1] = chem[0, 0, 1, 0] = True # bidirectional, 20 um
+        chem[0, 0, 0, 2] = True # 80 um
+        elec[0, 0, 0, 1] = True # 20 um
+
+        stats = _summaries({3: chem}, {3: elec}, data)[0]
+
+        self.assertEquals(3, stats[0]) # ii_chem
+        self.assertEquals(1, stats[1]) # ii_elec
+        self.assertEquals(1, stats[4]) # ii_c2
+        self.assertEquals(1, stats[3]) # ii_c2e
+        # chemical: 2 of 2 pairs at 20 um, 1 of 4 pairs at 60-80 um
+        np.testing.assert_allclose([1., 0.25, 1., 0.], stats[8:])
+
+    def test_planes(self):
+        """
+        Chemical synapses of the conditional model follow the electrical
+        ones if PC1 = 1 and PC0 = 0
+        """
+        R = np.random.RandomState(0).random_sample((50, 1, 2, 3, 3))
+        theta = np.tile([1., 0., 0.5], (50, 1))
+
+        chem, elec = _planes('conditional', theta, self.dist, R)
+        coupled = elec | np.swapaxes(elec, -1, -2)
+        self.assertTrue( (chem == coupled).all() )
+        self.assertTrue( 0 < elec.sum() < 50*3 )
+
+        # uniform probabilities do not depend on the distance
+        theta = np.tile([0., 1.], (50, 1))
+        chem, elec = _planes('uniform', theta, self.dist, R)
+        self.assertEquals(0, chem.sum())
+        self.assertEquals(50*3, elec.sum())
+
+class TestABC(unittest.TestCase):
+    """
+    A major unittest class to test rejection and sequential Monte Carlo
+    ABC
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+        cls.abc = ABC(cls.dataset, models = ('uniform', 'conditional'))
+
+    def test_rejection(self):
+        """
+        The quantile of the simulations closest to the data is accepted
+        """
+        mydict = self.abc.rejection(n_sim = 2000, quantile = 0.05, seed = 0)
+
+        self.assertEquals(100, sum(len(w) for w in mydict['weights'].values()))
+        self.assertAlmostEquals(1., mydict['P'].sum())
+        for model in self.abc.models:
+            lower, upper = self.abc.bounds(model).T
+            theta = mydict['posterior'][model]
+            self.assertTrue( ((theta >= lower) & (theta <= upper)).all() )
+
+        # a tolerance larger than all distances accepts every simulation
+        mydict = self.abc.rejection(n_sim = 2000, seed = 0,
+            epsilon = np.inf, scale = mydict['scale'])
+        self.assertEquals(2000, sum(len(w) for w in mydict['weights'].values()))
+
+    def test_n_jobs(self):
+        """
+        Posteriors do not depend on the number of processes
+        """
+        mydict = self.abc.rejection(n_sim = 2000, quantile = 0.05, seed = 1)
+        mydict2 = self.abc.rejection(n_sim = 2000, quantile = 0.05, seed = 1,
+            n_jobs = 2)
+        self.assertTrue( (mydict['P'] == mydict2['P']).all() )
+
+        mydict = self.abc.smc(n_particles = 100, n_generations = 1, seed = 2)
+        mydict2 = self.abc.smc(n_particles = 100, n_generations = 1, seed = 2,
+            n_jobs = 2)
+        self.assertTrue( (mydict['P'] == mydict2['P']).all() )
+        for model in self.abc.models:
+            self.assertTrue( (mydict['posterior'][model] ==
+                mydict2['posterior'][model]).all() )
+            self.assertTrue( (mydict['weights'][model] ==
+                mydict2['weights'][model]).all() )
+
+    def test_model_probabilities(self):
+        """
+        SMC gives the probabilities of the models of rejection with its
+        last tolerance, also if the models have priors of different
+        volumes and numbers of parameters
+        """
+        priors = dict(PRIORS, uniform = (('PC', (0., 0.25)),
+            ('PE', (0., 0.25))))
+        myabc = ABC(self.dataset, models = ('uniform', 'conditional'),
+            priors = priors)
+
+        mysmc = myabc.smc(n_particles = 300, n_generations = 2, seed = 0)
+        myrej = myabc.rejection(n_sim = 20000, seed = 1,
+            epsilon = mysmc['epsilon'][-1], scale = mysmc['scale'])
+
+        self.assertTrue( np.abs(mysmc['P'] - myrej['P']).max() < 0.1 )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+unittest_bitplanes.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 21:42:26 UTC 2026
+
+Unittest environment to test the bit-plane representation of matrices
+"""
+
+import unittest
+
+import numpy as np
+from motifs import iicounter
+from bitplanes import decode, encode, pack, unpack, transpose
+from bitplanes import syn2planes, planes2syn, iicount
+
+class TestConversion(unittest.TestCase):
+    """
+    Test conversions between the *.syn encoding and packed planes
+    """
+    B1 = np.array(([0,3],[1,0]))
+    C2 = np.array(([0,0],[2,0]))
+
+    def test_decode_symmetric_elec(self):
+        """
+        Gap junctions are symmetric in the electrical plane
+        """
+        chem, elec = decode(self.C2)
+        self.assertEquals(0, chem.sum())
+        self.assertEquals(2, elec.sum())
+        self.assertTrue( (elec == elec.T).all() )
+
+    def test_encode_canonical(self):
+        """
+        Gap junctions in the lower triangle are written in the upper one
+        """
+        chem, elec = decode(self.C2)
+        self.assertTrue( (encode(chem, elec) == self.C2.T).all() )
+
+        chem, elec = decode(self.B1)
+        self.assertTrue( (encode(chem, elec) == self.B1).all() )
+
+    def test_pack_unpack(self):
+        """
+        Packing and unpacking random stacks returns the same stack
+        """
+        mask = np.random.rand(100, 8, 8) < 0.5
+        self.assertTrue( (unpack(pack(mask), 8) == mask).all() )
+
+        mask = np.random.rand(100, 3, 3) < 0.5
+        self.assertTrue( (unpack(pack(mask), 3) == mask).all() )
+
+    def test_transpose(self):
+        """
+        Transposed planes are the planes of the transposed matrices
+        """
+        mask = np.random.rand(100, 8, 8) < 0.5
+        words = transpose(pack(mask))
+        self.assertTrue( (words == pack(mask.transpose(0,2,1))).all() )
+
+    def test_roundtrip(self):
+        """
+        Canonical matrices are recovered from their planes
+        """
+        chem = np.random.rand(100, 5, 5) < 0.5
+        chem[:, range(5), range(5)] = False
+        elec = np.random.rand(100, 5, 5) < 0.5
+        S = encode(chem, elec)
+        self.assertTrue( (planes2syn(*syn2planes(S), n=5) == S).all() )
+
+class TestIICount(unittest.TestCase):
+    """
+    Test the motifs counted in planes against IIMotifCounter
+    """
+    set56 = np.array([[0, 0, 0],[1, 0, 3],[3, 1, 0]])
+
+    def test_known_matrix(self):
+        """
+        Test motifs of a matrix with known connections
+        """
+        mycount = iicount(*syn2planes(self.set56))
+
+        self.assertEquals(4, mycount['ii_chem'])
+        self.assertEquals(2, mycount['ii_elec'])
+        self.assertEquals(3, mycount['ii_c1e'])
+        self.assertEquals(1, mycount['ii_c2e'])
+        self.assertEquals(1, mycount['ii_c2'])
+        self.assertEquals(1, mycount['ii_con'])
+        self.assertEquals(2, mycount['ii_div'])
+        self.assertEquals(2, mycount['ii_lin'])
+
+    def test_random_stack(self):
+        """
+        Motifs counted in a stack are the motifs of iicounter
+        """
+        for n in range(2, 9):
+            chem = np.random.rand(50, n, n) < 0.4
+            chem[:, range(n), range(n)] = False
+            elec = np.random.rand(50, n, n) < 0.4
+            S = encode(chem, elec)
+
+            mycount = iicount(*syn2planes(S))
+            for i, matrix in enumerate(S):
+                counter = iicounter(matrix)
+                for key in counter:
+                    self.assertEquals(counter[key]['found'], mycount[key][i])
+
+if __name__ == '__main__':
+    unittest.main()
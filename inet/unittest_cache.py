@@ -0,0 +1,154 @@
+"""
+unittest_cache.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:38:55 UTC 2026
+
+Unittest environment to test results memoized on disk
+"""
+
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from cache import Cache, fingerprint
+from loader import DataLoader
+from engine import RecordingEngine, DistanceRecordingModel
+
+class TestFingerprint(unittest.TestCase):
+    """
+    A major unittest class to test keys of the content of objects
+    """
+
+    def test_values(self):
+        """
+        Objects with the same content have the same fingerprint
+        """
+        self.assertEquals(fingerprint(0), fingerprint(np.int64(0)))
+        self.assertEquals(fingerprint({'a': [1, 2.5], 'b': None}),
+            fingerprint({'b': None, 'a': [1, 2.5]}))
+        self.assertEquals(fingerprint(np.arange(4)), fingerprint(np.arange(4)))
+
+        self.assertNotEquals(fingerprint(1), fingerprint(1.5))
+        self.assertNotEquals(fingerprint(np.arange(4)),
+            fingerprint(np.arange(4).reshape(2, 2)))
+
+    def test_unknown(self):
+        """
+        Objects without a content raise TypeError
+        """
+        self.assertRaises(TypeError, fingerprint, object())
+        self.assertRaises(TypeError, fingerprint, lambda x: x)
+
+class TestCache(unittest.TestCase):
+    """
+    A major unittest class to test the memoization of results
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.ncalls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def square(self, x):
+        """
+        counts the calls to the function memoized
+        """
+        self.ncalls += 1
+        return( np.arange(x)**2 )
+
+    def test_memoize(self):
+        """
+        Results are computed only once, also by another object
+        """
+        square = Cache(self.path).memoize(self.square)
+        square(10)
+        square(10)
+        square(20)
+        self.assertEquals(2, self.ncalls)
+
+        mycache = Cache(self.path)
+        self.assertTrue( (mycache.call(self.square, 10) == np.arange(10)**2).all() )
+        self.assertEquals(2, self.ncalls)
+        self.assertEquals(1, mycache.hits)
+        self.assertEquals(0, mycache.misses)
+
+    def test_invalidate(self):
+        """
+        Results invalidated are computed again
+        """
+        mycache = Cache(self.path)
+        mycache.call(self.square, 10)
+        self.assertEquals(1, mycache.invalidate(key = mycache.key(
+            '%s.square' %__name__, 10)))
+        mycache.call(self.square, 10)
+        self.assertEquals(2, self.ncalls)
+
+        mycache.clear()
+        self.assertEquals(0, len(mycache))
+
+    def test_lru(self):
+        """
+        The least recently used results are removed first
+        """
+        mycache = Cache(self.path)
+        for x in (1000, 1001, 1002):
+            mycache.call(self.square, x)
+        time.sleep(0.05)
+        mycache.call(self.square, 1000) # most recently used
+
+        mycache = Cache(self.path, max_size = 2*mycache.size()//3 + 1)
+        mycache.evict()
+        self.assertEquals(2, len(mycache))
+
+        mycache.call(self.square, 1000)
+        self.assertEquals(3, self.ncalls)
+
+class TestRun(unittest.TestCase):
+    """
+    A major unittest class to test the memoization of simulations
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def engine(self, scale):
+        """
+        returns an engine whose chemical synapses decay with the distance
+        """
+        mymodel = DistanceRecordingModel({'ii_chem':
+            lambda x: np.exp(-x/scale), 'ii_elec': 0.1})
+        return( RecordingEngine(self.dataset, mymodel) )
+
+    def test_run(self):
+        """
+        Simulations are read only for the same model and seed
+        """
+        mycache = Cache(self.path)
+        nchem = mycache.run(self.engine(50.), 200, seed = 0).nchem.copy()
+
+        self.assertTrue( (nchem == mycache.run(self.engine(50.), 200,
+            seed = 0).nchem).all() )
+        self.assertEquals(1, mycache.hits)
+
+        # another distance function or seed is simulated
+        mycache.run(self.engine(100.), 200, seed = 0)
+        mycache.run(self.engine(50.), 200, seed = 1)
+        self.assertEquals(1, mycache.hits)
+        self.assertEquals(3, len(mycache))
+
+if __name__ == '__main__':
+    unittest.main()
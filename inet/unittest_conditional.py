@@ -0,0 +1,81 @@
+"""
+unittest_conditional.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:41:06 UTC 2026
+
+Unittest environment to test the model of chemical synapses
+conditioned on electrical coupling
+"""
+
+import unittest
+
+import numpy as np
+from loader import DataLoader
+from simulations import IIConditionalModel
+
+class TestConditional(unittest.TestCase):
+    """
+    A major unittest class to test simulations of chemical synapses
+    given the electrical ones
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+        cls.model = IIConditionalModel(cls.dataset)
+
+    def test_coupled_only(self):
+        """
+        With PC1 = 1 and PC0 = 0, only coupled cells have chemical
+        synapses, and they are bidirectional
+        """
+        mymodel = self.model.with_parameters(PC = (1., 0.))
+        mymodel.run(500, seed = 0)
+
+        nelec = mymodel.nelec
+        self.assertTrue( nelec.sum() > 0 )
+        self.assertTrue( (mymodel.nchem == 2*nelec).all() )
+        self.assertTrue( (mymodel.nbid == nelec).all() )
+        self.assertTrue( (mymodel.nc2e == nelec).all() )
+
+    def test_n_jobs(self):
+        """
+        Motifs simulated do not depend on the number of processes nor
+        on the iterations simulated at once
+        """
+        for distance in (False, True):
+            mymodel = IIConditionalModel(self.dataset, distance = distance)
+            mymodel.run(2500, seed = 1)
+            nc1e = mymodel.nc1e.copy()
+
+            mymodel.run(2500, seed = 1, n_jobs = 2, max_memory = 2**14)
+            self.assertTrue( (nc1e == mymodel.nc1e).all() )
+
+    def test_stateprobabilities(self):
+        """
+        The probabilities of the states of the pairs used by
+        run_importance give the motifs simulated directly
+        """
+        for distance in (False, True):
+            mymodel = IIConditionalModel(self.dataset, distance = distance)
+            mymodel.run(5000, seed = 2)
+
+            # the average of a tilt of zero is the average of the model
+            for key in ('ii_chem', 'ii_c1e', 'ii_c2e', 'ii_c2'):
+                sim = mymodel.simulated(key)
+                self.assertTrue( abs(mymodel.tiltmean(key, 0.) - sim.mean())
+                    < 4*sim.std()/np.sqrt(len(sim)), msg = key )
+
+        # P-values of importance sampling are the direct ones
+        mymodel = self.model
+        mymodel.run(20000, seed = 3)
+        P = np.mean(mymodel.nc2e > mymodel.found['ii_c2e'])
+        mydict = mymodel.run_importance('ii_c2e', n_iter = 4000, seed = 4)
+        SE = np.sqrt(P*(1 - P)/20000 + mydict['SE']**2)
+        self.assertTrue( abs(mydict['P'] - P) < 4*SE )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+unittest_crossval.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:47:32 UTC 2026
+
+Unittest environment to test the cross-validation of connectivity
+models
+"""
+
+import unittest
+
+import numpy as np
+from crossval import assign_folds, _predict
+
+class TestCrossval(unittest.TestCase):
+    """
+    A major unittest class to test folds and held-out predictions
+    """
+    pairs = dict(x = np.array([10., 30., 60., 100., 150., 200.]),
+        y = np.array([1., 1., 0., 1., 0., 0.]),
+        coupled = np.array([1., 0., 1., 0., 1., 0.]))
+
+    def test_folds(self):
+        """
+        Every fold has (almost) the same number of recordings
+        """
+        folds = assign_folds(11, 3, n_repeats = 4, seed = 0)
+        self.assertEquals((4, 11), folds.shape)
+        for partition in folds:
+            self.assertEquals([4, 4, 3], list(np.bincount(partition)))
+
+        # partitions are drawn with their own generators
+        self.assertTrue( (folds[:3] == assign_folds(11, 3, 3, 0)).all() )
+        self.assertRaises(ValueError, assign_folds, 11, 1)
+
+    def test_predict(self):
+        """
+        Constant probabilities are fitted to the training pairs only
+        """
+        train = np.array([[1., 1., 1., 0., 0., 0.], [0., 0., 0., 1., 1., 1.]])
+
+        P = _predict('uniform', 'chem', self.pairs, train)
+        np.testing.assert_allclose([2/3., 1/3.], P[:, 0])
+
+        # coupled pairs: 1 of 2 and 0 of 1; uncoupled: 1 of 1 and 1 of 2
+        P = _predict('conditional', 'chem', self.pairs, train)
+        np.testing.assert_allclose([0.5, 1., 0.5, 1., 0.5, 1.], P[0])
+        np.testing.assert_allclose([0., 0.5, 0., 0.5, 0., 0.5], P[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+unittest_engine.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:19:16 UTC 2026
+
+Unittest environment to test the simulation engine of full recordings
+"""
+
+import unittest
+import warnings
+import shutil
+import tempfile
+
+import numpy as np
+from motifs import iicounter, eicounter, iecounter, eecounter
+from utils import II_slice, IE_slice, EI_slice, EE_slice
+from bitplanes import encode
+from loader import DataLoader
+from engine import count_recordings, UniformRecordingModel, RecordingEngine
+from engine import DistanceRecordingModel
+
+class TestCountRecordings(unittest.TestCase):
+    """
+    Test the motifs counted in stacks of recordings against the counters
+    """
+
+    def test_random_recordings(self):
+        """
+        Motifs counted in a stack are the motifs of all counters
+        """
+        for n, nIN in [(8, 1), (8, 2), (6, 3), (4, 4), (5, 1)]:
+            chem = np.random.rand(20, n, n) < 0.4
+            chem[:, range(n), range(n)] = False
+            elec = np.random.rand(20, n, n) < 0.4
+            S = encode(chem, elec)
+
+            mycount = count_recordings(S, nIN)
+            for i, matrix in enumerate(S):
+                counter = iicounter(II_slice(matrix, nIN))
+                if nIN < n:
+                    counter = counter + eicounter(EI_slice(matrix, nIN)) \
+                        + iecounter(IE_slice(matrix, nIN)) \
+                        + eecounter(EE_slice(matrix, nIN))
+                for key in counter:
+                    self.assertEquals(counter[key]['found'], mycount[key][i],
+                        msg = key)
+
+class TestUniformRecordingModel(unittest.TestCase):
+    """
+    Test recordings simulated with uniform probabilities
+    """
+
+    def test_sample(self):
+        """
+        Only chemical synapses are simulated with probability one
+        """
+        mymodel = UniformRecordingModel({'ii_chem': 1, 'ie': 1, 'ei': 1,
+            'ee_chem': 1})
+        R = np.random.rand(3, 2, 2, 5, 5)
+        S = mymodel.sample(R, 2, np.full((2, 5, 5), np.nan))
+
+        self.assertEquals((3, 2, 5, 5), S.shape)
+        self.assertTrue( (S == 1 - np.eye(5)).all() )
+
+class TestRecordingEngine(unittest.TestCase):
+    """
+    Test the simulations of a dataset of principal cells only
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore') # distances not found
+            cls.dataset = DataLoader('../data/CA3')
+
+    def test_ee_dataset(self):
+        """
+        Motifs between principal cells are simulated with the
+        probabilities of the dataset, and there are no interneurons
+        """
+        mymodel = UniformRecordingModel.from_dataset(self.dataset)
+        self.assertEquals(0, mymodel.prob['ii_chem'])
+
+        engine = RecordingEngine(self.dataset, mymodel)
+        engine.run(400, seed = 0)
+
+        self.assertEquals(0, engine.found['ii_chem'])
+        self.assertEquals(0, engine.simulated('ii_chem').sum())
+        for key in ('ee_chem', 'ee_elec'):
+            sim = engine.simulated(key)
+            found = self.dataset.motif[key]['found']
+            self.assertEquals(found, engine.found[key])
+            self.assertTrue( abs(sim.mean() - found) <
+                4*sim.std()/np.sqrt(len(sim)), msg = key )
+
+    def test_unavailable(self):
+        """
+        Methods that change the parameters of IIModel raise errors
+        """
+        engine = RecordingEngine(self.dataset,
+            UniformRecordingModel({'ee_chem': 0.1}))
+        self.assertRaises(NotImplementedError, engine.with_parameters,
+            prob = 0.2)
+        self.assertRaises(NotImplementedError, engine.sweep, [{}], 10)
+        self.assertRaises(NotImplementedError, engine.run_importance,
+            'ee_chem')
+
+class SamplerModel(UniformRecordingModel):
+    """
+    A model that overrides the sampler of its probabilities
+    """
+
+    def sample(self, R, nIN, dist):
+        return( super(SamplerModel, self).sample(R, nIN, dist) )
+
+class TestParameters(unittest.TestCase):
+    """
+    Test the parameters that identify the model of an engine
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def test_distance_functions(self):
+        """
+        Engines with other distance functions have other parameters,
+        and engines with the same ones have the same parameters
+        """
+        def parameters(f):
+            mymodel = DistanceRecordingModel({'ii_chem': f, 'ii_elec': 0.1})
+            return( RecordingEngine(self.dataset, mymodel).parameters() )
+
+        steep = parameters(lambda x: np.exp(-x/50.))
+        self.assertEquals(steep, parameters(lambda x: np.exp(-x/50.)))
+        self.assertNotEquals(steep, parameters(lambda x: np.exp(-x/100.)))
+
+    def test_sampler(self):
+        """
+        Models that override the sampler are not checkpointed
+        """
+        engine = RecordingEngine(self.dataset, SamplerModel({'ii_chem': 0.1}))
+        self.assertRaises(TypeError, engine.parameters)
+
+        path = tempfile.mkdtemp()
+        try:
+            self.assertRaises(TypeError, engine.run, 100, seed = 0,
+                checkpoint = path)
+        finally:
+            shutil.rmtree(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+unittest_ergm.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:28:36 UTC 2026
+
+Unittest environment to test the Metropolis chains of the ERGM
+"""
+
+import unittest
+
+import numpy as np
+from ergm import _dyads, _init_worker, _run_chain
+
+class TestChains(unittest.TestCase):
+    """
+    A major unittest class to test samples of Metropolis chains
+    """
+    matrices = [np.zeros((3, 3), dtype = int)]*10 # 60 chem, 30 elec
+
+    def test_dyads(self):
+        """
+        Every ordered pair may have a chemical synapse, and every
+        unordered pair a gap junction
+        """
+        mydyads = _dyads(self.matrices)
+        self.assertEquals(90, len(mydyads))
+        self.assertEquals(60, sum(d[1] == 'chem' for d in mydyads))
+
+    def test_zero_parameters(self):
+        """
+        Synapses are independent with probability 1/2 if theta is zero
+        """
+        _init_worker( (self.matrices, ('ii_chem', 'ii_elec', 'ii_c2')) )
+        S = _run_chain( ((0, 0), np.zeros(3), 2000, 900, 90) )
+        self.assertTrue( abs(S[:, 0].mean() - 30) < 0.5 )
+        self.assertTrue( abs(S[:, 1].mean() - 15) < 0.5 )
+        self.assertTrue( abs(S[:, 2].mean() - 7.5) < 0.5 )
+
+    def test_dyadic_parameters(self):
+        """
+        Synapses are found with the logistic function of their terms
+        """
+        theta = np.log([0.2/0.8, 0.7/0.3])
+        _init_worker( (self.matrices, ('ii_chem', 'ii_elec')) )
+        S = _run_chain( ((0, 1), theta, 2000, 900, 90) )
+        self.assertTrue( abs(S[:, 0].mean() - 12) < 0.5 )
+        self.assertTrue( abs(S[:, 1].mean() - 21) < 0.5 )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+unittest_exact.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 21:47:22 UTC 2026
+
+Unittest environment to test the exact distributions of motifs
+"""
+
+import unittest
+import warnings
+
+import numpy as np
+from scipy.stats import binom
+from bitplanes import pack, iicount
+from exact import convolve, recording_pmf, dataset_pmf, pvalue
+from exact import lin_histogram, _enumerate_lin, _orbit_lin, MAXENUM
+from loader import DataLoader
+from simulations import IIUniformModel
+
+def enumerate_pmf(n, pchem, pelec):
+    """
+    Computes the distribution of all motifs in a recording of n cells
+    by enumerating all chemical and electrical configurations.
+    """
+    offdiag = [(i,j) for i in range(n) for j in range(n) if i != j]
+    upper = [(i,j) for i in range(n) for j in range(n) if i < j]
+
+    nchem, nelec = len(offdiag), len(upper)
+    chem = np.zeros((2**nchem, n, n), dtype=bool)
+    for b, (i,j) in enumerate(offdiag):
+        chem[:, i, j] = (np.arange(2**nchem) >> b) & 1
+    elec = np.zeros((2**nelec, n, n), dtype=bool)
+    for b, (i,j) in enumerate(upper):
+        elec[:, i, j] = elec[:, j, i] = (np.arange(2**nelec) >> b) & 1
+
+    C = np.repeat(pack(chem), 2**nelec)
+    E = np.tile(pack(elec), 2**nchem)
+    kc = np.repeat(chem.sum(axis=(1,2)), 2**nelec)
+    ke = np.tile(elec.sum(axis=(1,2))//2, 2**nchem)
+    weight = pchem**kc * (1-pchem)**(nchem-kc) * pelec**ke * (1-pelec)**(nelec-ke)
+
+    mydict = dict()
+    for key, found in iicount(C, E).items():
+        mydict[key] = np.bincount(found, weights=weight)
+
+    return( mydict )
+
+class TestExact(unittest.TestCase):
+    """
+    A major unittest class to test exact distributions of motifs
+    """
+
+    def test_convolve(self):
+        """
+        Convolutions keep the relative precision of small probabilities
+        """
+        a = np.array([0.2, 0.5, 0.3])
+        b = np.array([0.6, 0.4])
+        self.assertTrue( np.allclose(np.convolve(a, b), convolve([a, b])) )
+
+        # ii_c2e in a dataset of pairs is binomial, with P-values far
+        # below the round-off errors of FFTs
+        pmf = dataset_pmf('ii_c2e', [(2, 41), (3, 10)], 0.3, 0.4)
+        for n_found in (10, 20, 30):
+            P = binom.sf(n_found, 41 + 3*10, 0.4*0.3**2)
+            self.assertTrue( abs(pvalue(pmf, n_found) - P) < 1e-9*P )
+
+    def test_recording_pmf(self):
+        """
+        Distributions are the distributions of all configurations
+        """
+        for n in (2, 3):
+            mydict = enumerate_pmf(n, 0.3, 0.6)
+            for key in mydict:
+                pmf = recording_pmf(key, n, 0.3, 0.6)
+                size = max(len(pmf), len(mydict[key]))
+                mypmf = np.zeros(size)
+                mypmf[:len(mydict[key])] = mydict[key]
+                pmf = np.append(pmf, np.zeros(size - len(pmf)))
+                self.assertTrue( np.allclose(mypmf, pmf), msg = key )
+
+    def test_dataset_pmf(self):
+        """
+        Test the distribution of the number of chemical synapses
+        """
+        pmf = dataset_pmf('ii_chem', [(2, 3), (3,1)], 0.5, 0.5)
+        self.assertEquals(13, len(pmf))
+        self.assertAlmostEquals(0.5**12, pmf[0])
+        self.assertAlmostEquals(0.5**12, pvalue(pmf, 11))
+        self.assertAlmostEquals(1.0, pvalue(pmf, 13, larger=False))
+
+    def test_orbits(self):
+        """
+        Enumerations up to isomorphism are full enumerations
+        """
+        for n in (3, 4, 5):
+            self.assertTrue( (_enumerate_lin(n) == _orbit_lin(n)).all() )
+        self.assertRaises(ValueError, lin_histogram, MAXENUM + 1)
+
+    def test_fallback(self):
+        """
+        Simulations of motifs that cannot be enumerated do not change
+        the motifs simulated by the model
+        """
+        mymodel = IIUniformModel(DataLoader('../data/PV'))
+        mymodel.PVconf.append( (MAXENUM + 1, 1) )
+        mymodel.run(500, seed = 0)
+        nlin = mymodel.nlin.copy()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            mydict = mymodel.pvalues(n_iter = 1000, seed = 1)
+
+        self.assertEquals('simulation', mydict['ii_lin'][1])
+        self.assertEquals('exact', mydict['ii_chem'][1])
+        self.assertEquals(500, len(mymodel.nlin))
+        self.assertTrue( (nlin == mymodel.nlin).all() )
+
+if __name__ == '__main__':
+    unittest.main()
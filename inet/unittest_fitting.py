@@ -0,0 +1,72 @@
+"""
+unittest_fitting.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:21:00 UTC 2026
+
+Unittest environment to test the fit of sigmoid functions
+"""
+
+import unittest
+
+import numpy as np
+from scipy.optimize import check_grad
+from loader import DataLoader
+from fitting import negloglik, fit_sigmoid, bootstrap, fit_dataset
+
+class TestFitSigmoid(unittest.TestCase):
+    """
+    A major unittest class to test maximum likelihood fits
+    """
+    param = (60., 120., 25.)
+
+    def setUp(self):
+        """
+        Simulates pairs tested with a known sigmoid function
+        """
+        A, C, r = self.param
+        rng = np.random.RandomState(0)
+        self.x = rng.uniform(0, 300, 20000)
+        p = A/(1 + np.exp((self.x - C)/r))/100.
+        self.y = (rng.rand(20000) < p).astype(int)
+
+    def test_gradient(self):
+        """
+        The gradient is the derivative of the log-likelihood
+        """
+        f = lambda p: negloglik(p, self.x, self.y)[0]
+        df = lambda p: negloglik(p, self.x, self.y)[1]
+        err = check_grad(f, df, [40., 150., 30.])
+        self.assertTrue( err < 1e-3*np.abs(df([40., 150., 30.])).max() )
+
+    def test_fit(self):
+        """
+        The parameters of the simulations are recovered
+        """
+        myfit = fit_sigmoid(self.x, self.y)
+        for p, q in zip(self.param, myfit):
+            self.assertTrue( abs(p - q)/p < 0.05 )
+
+    def test_bootstrap(self):
+        """
+        Bootstrap does not depend on the number of processes
+        """
+        x, y = self.x[:500], self.y[:500]
+        params = bootstrap(x, y, n_boot = 4, seed = 3)
+        self.assertEquals((4, 3), params.shape)
+        self.assertTrue( (params == bootstrap(x, y, 4, 3, n_jobs=2)).all() )
+
+    def test_confident(self):
+        """
+        Confident intervals of 0.975 are two-tailed 95% intervals, as in
+        inet.math
+        """
+        myfit = fit_dataset(DataLoader('../data/PV'), 'elec', n_boot = 20,
+            seed = 0)
+        np.testing.assert_allclose(myfit['CI'],
+            np.percentile(myfit['bootstrap'], [2.5, 97.5], axis = 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@ import unittest
 
 import numpy as np
 from motifs import iicounter, eicounter, iecounter, eecounter
+from motifs import IIDeltaCounter
 
 class TestIIMotifCounter(unittest.TestCase):
     """
@@ -435,5 +436,52 @@ class TestCA3MotifCounter(unittest.TestCase):
         """
         self.assertEquals(1, self.gap.ee_elec_found)
 
+class TestIIDeltaCounter(unittest.TestCase):
+    """
+    A major unittest class to test updates of IIDeltaCounter
+    """
+
+    def test_random_toggles(self):
+        """
+        Motifs updated after every toggle are those of a full recount
+        """
+        rng = np.random.RandomState(0)
+        for n in (2, 3, 5, 8):
+            S = (rng.rand(n, n) < 0.3) + 2*np.triu(rng.rand(n, n) < 0.2, 1)
+            S[range(n), range(n)] = 0
+            mycounter = IIDeltaCounter(S)
+            self.assertTrue( mycounter.verify() )
+
+            for _ in range(200):
+                i, j = rng.choice(n, 2, replace = False)
+                if rng.rand() < 0.7:
+                    mycounter.toggle_chem(i, j)
+                else:
+                    mycounter.toggle_elec(i, j)
+                self.assertTrue( mycounter.verify() )
+
+    def test_delta_does_not_toggle(self):
+        """
+        delta_chem returns the change without changing the matrix
+        """
+        mycounter = IIDeltaCounter(np.array(([0,3],[0,0])))
+        mydelta = mycounter.delta_chem(1, 0)
+        self.assertEquals(1, mydelta['ii_c2e'])
+        self.assertEquals(0, mycounter.ii_c2e_found)
+
+        mycounter.toggle_chem(1, 0)
+        self.assertEquals(1, mycounter.ii_c2e_found)
+        self.assertEquals(2, mycounter.ii_c1e_found)
+
+    def test_toggle_twice(self):
+        """
+        Toggling a synapse twice returns the empty matrix
+        """
+        mycounter = IIDeltaCounter(n = 3)
+        mycounter.toggle_elec(0, 2)
+        mycounter.toggle_elec(2, 0)
+        self.assertEquals(0, mycounter.ii_elec_found)
+        self.assertEquals(0, mycounter.matrix.sum())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+"""
+unittest_permutation.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:22:30 UTC 2026
+
+Unittest environment to test permutations within strata
+"""
+
+import unittest
+
+import numpy as np
+from loader import DataLoader
+from fitting import tested_pairs
+from permutation import permute, permutation_test, _pvalue
+
+class TestPermute(unittest.TestCase):
+    """
+    A major unittest class to test permutations of connections
+    """
+    y = np.array([1, 0, 0, 1, 1, 0, 1, 1])
+    strata = np.array([3, 1, 3, 1, 3, 2, 2, 1])
+
+    def test_strata(self):
+        """
+        Connections are only permuted within every stratum
+        """
+        perm = permute(self.y, self.strata, 500, np.random.RandomState(0))
+        for label in np.unique(self.strata):
+            mask = self.strata == label
+            self.assertTrue( (perm[:, mask].sum(1) == self.y[mask].sum()).all() )
+
+        # all orders of the stratum 2 are found
+        self.assertEquals(2, len(set(map(tuple, perm[:, self.strata == 2]))))
+
+    def test_single_strata(self):
+        """
+        Strata with one pair are never permuted
+        """
+        perm = permute(self.y, np.arange(8), 10, np.random.RandomState(0))
+        self.assertTrue( (perm == self.y).all() )
+
+    def test_pvalue(self):
+        """
+        P-values count the observed statistic as a permutation
+        """
+        null = np.array([-3., -1., 0., 2., 5.])
+        self.assertAlmostEquals(3/6., _pvalue(null, 2., 'greater'))
+        self.assertAlmostEquals(3/6., _pvalue(null, -1., 'less'))
+        self.assertAlmostEquals(4/6., _pvalue(null, 2., 'two-sided'))
+
+        # two-sided p-values are distances to the center
+        self.assertAlmostEquals(4/6., _pvalue(null, 3., 'two-sided', 1.))
+        self.assertAlmostEquals(3/6., _pvalue(null, 3., 'two-sided'))
+
+class TestPermutationTest(unittest.TestCase):
+    """
+    A major unittest class to test the slope of permutations
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def test_expected(self):
+        """
+        The mean slope of the permutations within strata is the one
+        computed
+        """
+        x, y, recording = tested_pairs(self.dataset, 'chem', groups = True)
+        xc = (x - x.mean())/np.sum((x - x.mean())**2)
+
+        mytest = permutation_test(self.dataset, 'chem', n_perm = 100,
+            strata = 'recording', seed = 0)
+        null = np.dot(permute(y, recording, 20000, np.random.RandomState(1)),
+            xc)
+        self.assertTrue( abs(null.mean() - mytest['slope']['expected']) <
+            4*null.std()/np.sqrt(len(null)) )
+        self.assertTrue( abs(null.mean()) > 4*null.std()/np.sqrt(len(null)) )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+unittest_propensity.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:43:13 UTC 2026
+
+Unittest environment to test the model of heterogeneous propensities
+"""
+
+import unittest
+
+import numpy as np
+from loader import DataLoader
+from simulations import IIPropensityModel, IIUniformModel
+from simulations import _propensity_nll, _normal, _logit
+
+class TestPropensity(unittest.TestCase):
+    """
+    A major unittest class to test the likelihood of propensities
+    """
+
+    def test_homogeneous(self):
+        """
+        Without heterogeneity, the likelihood is the binomial one
+        """
+        rng = np.random.RandomState(0)
+        A = rng.rand(20, 3, 3) < 0.3
+        A[:, range(3), range(3)] = False
+        planes, offsets = {3: A}, {3: np.zeros((20, 3, 3))}
+        Z = {3: rng.standard_normal((100, 2, 3))}
+
+        mu = -1.
+        k, n = A.sum(), 20*6
+        nll = -k*np.log(1/(1 + np.exp(-mu))) - (n - k)*np.log(1/(1 + np.exp(mu)))
+
+        self.assertAlmostEquals(nll, _propensity_nll((mu, 0, 0, 0), 'chem',
+            planes, offsets, Z))
+
+        # heterogeneity is more likely if synapses share a presynaptic cell
+        A = np.zeros((20, 3, 3), dtype=bool)
+        A[:, 0, 1:] = True
+        planes = {3: A}
+        self.assertTrue( _propensity_nll((mu, 2, 0, 0), 'chem', planes,
+            offsets, Z) < _propensity_nll((mu, 0, 0, 0), 'chem', planes,
+            offsets, Z) )
+
+    def test_normal(self):
+        """
+        Uniform random numbers of zero give finite normal numbers
+        """
+        self.assertTrue( np.isfinite(_normal(np.array([0., 0.5]))).all() )
+
+class TestPropensityModel(unittest.TestCase):
+    """
+    A major unittest class to test fits and simulations of propensities
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def test_homogeneous_model(self):
+        """
+        Without heterogeneity, the model simulates the motifs of
+        IIUniformModel
+        """
+        uniform = IIUniformModel(self.dataset)
+        uniform.run(4000, seed = 0)
+
+        mymodel = IIPropensityModel(self.dataset, chem = (_logit(uniform.PC),
+            0., 0., 0.), elec = (_logit(uniform.PE), 0.))
+        mymodel.run(4000, seed = 1)
+
+        for key in mymodel.motiflist:
+            a, b = uniform.simulated(key), mymodel.simulated(key)
+            SE = np.sqrt(a.var()/len(a) + b.var()/len(b))
+            self.assertTrue( abs(a.mean() - b.mean()) < 4*SE, msg = key )
+
+    def test_fit(self):
+        """
+        Fits are reproducible and within the bounds, and electrical
+        synapses without heterogeneity have the probability found
+        """
+        mymodel = IIPropensityModel(self.dataset, n_draws = 300, seed = 0)
+        self.assertEquals((mymodel.chem, mymodel.elec), mymodel.fit(300, 0))
+
+        mu, sout, sin, rho = mymodel.chem
+        self.assertTrue( sout >= 0 and sin >= 0 and abs(rho) <= 0.95 )
+
+        motif = self.dataset.motif
+        PE = motif.ii_elec_found/float(motif.ii_elec_tested)
+        self.assertAlmostEquals(_logit(PE), mymodel.elec[0], 2)
+        self.assertAlmostEquals(0., mymodel.elec[1], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+unittest_resampling.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:21:33 UTC 2026
+
+Unittest environment to test the resampling of recordings
+"""
+
+import unittest
+
+import numpy as np
+from resampling import bootstrap_counts, jackknife_counts
+from resampling import replicate_probabilities
+
+class TestResampling(unittest.TestCase):
+    """
+    A major unittest class to test replicates of recordings
+    """
+    found = np.array([[1, 0], [2, 1], [0, 0], [3, 2]])
+    tested = np.array([[2, 1], [4, 1], [2, 0], [6, 3]])
+
+    def test_bootstrap_counts(self):
+        """
+        Every replicate draws all recordings
+        """
+        counts = bootstrap_counts(4, 100, np.random.RandomState(0))
+        self.assertEquals((100, 4), counts.shape)
+        self.assertTrue( (counts.sum(1) == 4).all() )
+
+    def test_jackknife(self):
+        """
+        Replicates are the recordings without one recording
+        """
+        P = replicate_probabilities(jackknife_counts(4), self.found,
+            self.tested)
+        for i in range(4):
+            keep = np.arange(4) != i
+            p = self.found[keep].sum(0)/self.tested[keep].sum(0).astype(float)
+            self.assertTrue( np.allclose(p, P[i]) )
+
+    def test_untested(self):
+        """
+        Probabilities of replicates without motifs tested are NaN
+        """
+        counts = np.array([[0, 0, 4, 0]])
+        P = replicate_probabilities(counts, self.found, self.tested)
+        self.assertEquals(0, P[0, 0])
+        self.assertTrue( np.isnan(P[0, 1]) )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+unittest_rewiring.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:24:07 UTC 2026
+
+Unittest environment to test the degree-preserving rewiring model
+"""
+
+import unittest
+
+import numpy as np
+from loader import DataLoader
+from simulations import IIRewiringModel
+from simulations import _swap_chem, _reverse_triangle, _swap_elec
+
+class TestRewiring(unittest.TestCase):
+    """
+    A major unittest class to test degree-preserving moves
+    """
+
+    def test_degrees(self):
+        """
+        Rewired matrices have the degrees of the original ones
+        """
+        rng = np.random.RandomState(0)
+        C = rng.rand(200, 6, 6) < 0.4
+        C[:, range(6), range(6)] = False
+        E = np.triu(rng.rand(200, 6, 6) < 0.4, 1)
+        E = E | E.transpose(0, 2, 1)
+
+        chem, elec = C.copy(), E.copy()
+        for _ in range(50):
+            _swap_chem(chem, rng.rand(200), rng.rand(200))
+            _reverse_triangle(chem, rng.rand(200), rng.rand(200))
+            _swap_elec(elec, rng.rand(200), rng.rand(200))
+
+        self.assertTrue( (chem.sum(1) == C.sum(1)).all() )
+        self.assertTrue( (chem.sum(2) == C.sum(2)).all() )
+        self.assertTrue( (elec.sum(2) == E.sum(2)).all() )
+        self.assertTrue( (elec == elec.transpose(0, 2, 1)).all() )
+        self.assertFalse( chem[:, range(6), range(6)].any() )
+        self.assertTrue( (chem != C).any() )
+
+    def test_model(self):
+        """
+        Rewired datasets have the chemical and electrical synapses, and
+        the convergent and divergent motifs, of the dataset
+        """
+        mymodel = IIRewiringModel(DataLoader('../data/PV'))
+        mymodel.run(200, seed = 0)
+
+        for key in ('ii_chem', 'ii_elec', 'ii_con', 'ii_div'):
+            self.assertTrue( (mymodel.simulated(key) == 
+                mymodel.found[key]).all(), msg = key )
+        self.assertTrue( (mymodel.simulated('ii_c2') != 
+            mymodel.found['ii_c2']).any() )
+
+if __name__ == '__main__':
+    unittest.main()
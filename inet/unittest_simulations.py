@@ -0,0 +1,230 @@
+"""
+unittest_simulations.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:14:27 UTC 2026
+
+Unittest environment to test the runs of the null models
+"""
+
+import unittest
+import shutil
+import tempfile
+import os
+
+import numpy as np
+from loader import DataLoader
+from store import ResultStore
+from simulations import IIUniformModel, IISigmoidModel
+from exact import dataset_pmf, pvalue
+
+class TestRun(unittest.TestCase):
+    """
+    A major unittest class to test reproducible runs of the null models
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def simulated(self, model):
+        return( np.column_stack([model.simulated(motif)
+            for motif in model.motiflist]) )
+
+    def test_n_jobs(self):
+        """
+        Motifs simulated do not depend on the number of processes nor
+        on the memory used to simulate iterations at once
+        """
+        for mymodel in (IIUniformModel(self.dataset),
+            IISigmoidModel(self.dataset)):
+            mymodel.run(2500, seed = 3)
+            mysim = self.simulated(mymodel)
+
+            mymodel.run(2500, seed = 3, n_jobs = 2, max_memory = 2**16)
+            self.assertTrue( (mysim == self.simulated(mymodel)).all() )
+
+            mymodel.run(2500, seed = 4)
+            self.assertFalse( (mysim == self.simulated(mymodel)).all() )
+
+    def test_sequential(self):
+        """
+        Motifs far from alpha are decided after one block, and the
+        decisions do not depend on the number of processes
+        """
+        mymodel = IIUniformModel(self.dataset)
+        mydict = mymodel.run_sequential(alpha = 0.02, max_iter = 6000,
+            seed = 0)
+
+        self.assertEquals(1000, mydict['ii_chem']['n_iter'])
+        self.assertFalse( mydict['ii_chem']['significant'] )
+        self.assertEquals(1000, mydict['ii_c2e']['n_iter'])
+        self.assertTrue( mydict['ii_c2e']['significant'] )
+        self.assertEquals(6000, len(mymodel.nchem))
+
+        # ii_c1e is close to alpha and not decided after max_iter
+        self.assertEquals(6000, mydict['ii_c1e']['n_iter'])
+        self.assertEquals(None, mydict['ii_c1e']['significant'])
+
+        mydict2 = mymodel.run_sequential(alpha = 0.02, max_iter = 6000,
+            seed = 0, n_jobs = 3)
+        for key in mymodel.motiflist:
+            self.assertEquals(mydict[key]['n_iter'], mydict2[key]['n_iter'])
+            self.assertEquals(mydict[key]['P'], mydict2[key]['P'])
+            self.assertEquals(mydict[key]['significant'],
+                mydict2[key]['significant'])
+
+    def test_single(self):
+        """
+        Simulations with 32-bit random integers have the average
+        synapses of the probabilities of the model
+        """
+        mymodel = IISigmoidModel(self.dataset, precision = 'single')
+        self.assertTrue( mymodel.nbytes() <
+            IISigmoidModel(self.dataset).nbytes() )
+
+        mymodel.run(4000, seed = 0)
+        nchem, nelec = mymodel.nchem, mymodel.nelec
+        self.assertTrue( nchem.dtype.kind == 'i' )
+
+        chem = sum(P[:, ~np.eye(n, dtype=bool)].sum() 
+            for n, (P, _) in mymodel._probabilities().items())
+        elec = sum(P[:, np.triu(~np.eye(n, dtype=bool))].sum()
+            for n, (_, P) in mymodel._probabilities().items())
+        for sim, mean in ((nchem, chem), (nelec, elec)):
+            self.assertTrue( abs(sim.mean() - mean) < 
+                4*sim.std()/np.sqrt(len(sim)) )
+
+        mymodel.run(4000, seed = 0, n_jobs = 2)
+        self.assertTrue( (nchem == mymodel.nchem).all() )
+
+    def test_resume(self):
+        """
+        A run interrupted and resumed from its checkpoint is identical
+        to an uninterrupted run
+        """
+        mymodel = IIUniformModel(self.dataset)
+        mymodel.run(3500, seed = 5)
+        mysim = self.simulated(mymodel)
+
+        path = os.path.join(tempfile.mkdtemp(), 'checkpoint')
+        try:
+            # the third block fails
+            simulate_block = mymodel.simulate_block
+            def failing(seed, block, n_iter, max_memory):
+                if block == 2:
+                    raise KeyboardInterrupt
+                return( simulate_block(seed, block, n_iter, max_memory) )
+
+            mymodel.simulate_block = failing
+            self.assertRaises(KeyboardInterrupt, mymodel.run, 3500,
+                seed = 5, checkpoint = path)
+            del mymodel.simulate_block
+            self.assertEquals([0, 1], ResultStore(path).metadata['done'])
+
+            mymodel.run(3500, checkpoint = path)
+            self.assertEquals(5, mymodel.seed)
+            self.assertEquals([0, 1, 2, 3],
+                sorted(ResultStore(path).metadata['done']))
+            self.assertTrue( (mysim == self.simulated(mymodel)).all() )
+
+            # checkpoints of other parameters or datasets are not resumed
+            self.assertRaises(ValueError, mymodel.with_parameters(PC = 0.5).run,
+                3500, checkpoint = path)
+            othermodel = IIUniformModel(self.dataset)
+            othermodel.fingerprint = 'another dataset'
+            self.assertRaises(ValueError, othermodel.run, 3500,
+                checkpoint = path)
+
+            IISigmoidModel(self.dataset).run(10, checkpoint = path + '2')
+            self.assertRaises(ValueError, IISigmoidModel(self.dataset,
+                precision = 'single').run, 10, checkpoint = path + '2')
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+class TestSweep(unittest.TestCase):
+    """
+    A major unittest class to test sweeps of parameters
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = DataLoader('../data/PV')
+
+    def test_common_random_numbers(self):
+        """
+        Grid points are simulated with the same random numbers: more
+        probable chemical synapses add synapses in every iteration and
+        do not change electrical synapses
+        """
+        mymodel = IIUniformModel(self.dataset)
+        mysweep = mymodel.sweep([{'PC': 0.2}, {'PC': 0.3}], 2000, seed = 1)
+        chem = mymodel.motiflist.index('ii_chem')
+        elec = mymodel.motiflist.index('ii_elec')
+
+        self.assertEquals((2, 2000, len(mymodel.motiflist)), mysweep.shape)
+        self.assertTrue( (mysweep[0, :, chem] <= mysweep[1, :, chem]).all() )
+        self.assertTrue( (mysweep[0, :, chem] < mysweep[1, :, chem]).any() )
+        self.assertTrue( (mysweep[0, :, elec] == mysweep[1, :, elec]).all() )
+
+        # every grid point is a run of the model with its parameters
+        point = mymodel.with_parameters(PC = 0.3)
+        point.run(2000, seed = 1)
+        self.assertTrue( (point.nchem == mysweep[1, :, chem]).all() )
+
+    def test_n_jobs(self):
+        """
+        Sweeps do not depend on the number of processes
+        """
+        mymodel = IISigmoidModel(self.dataset)
+        grid = [{'chem_param': (40., 150., 30.)}, {'precision': 'single'},
+            {'elec_param': (80., 120., 20.)}]
+        mysweep = mymodel.sweep(grid, 1500, seed = 2)
+        self.assertTrue( (mysweep == mymodel.sweep(grid, 1500, seed = 2,
+            n_jobs = 2)).all() )
+
+    def test_unknown_parameters(self):
+        """
+        Parameters that are not parameters of the model raise errors
+        """
+        mymodel = IISigmoidModel(self.dataset)
+        self.assertRaises(ValueError, mymodel.with_parameters, PC = 0.2)
+        self.assertRaises(ValueError, mymodel.sweep, [{'PC': 0.2}], 10)
+        self.assertRaises(ValueError, mymodel.with_parameters,
+            precision = 'float32')
+
+class TestImportance(unittest.TestCase):
+    """
+    A major unittest class to test P-values by importance sampling
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = IIUniformModel(DataLoader('../data/PV'))
+
+    def test_pair_motifs(self):
+        """
+        P-values of pair motifs are the exact P-values, also far below
+        1/n_iter
+        """
+        mymodel = self.model
+        for motif in ('ii_c2', 'ii_c2e'):
+            mydict = mymodel.run_importance(motif, n_iter = 4000, seed = 0)
+            pmf = dataset_pmf(motif, mymodel.PVconf, mymodel.PC, mymodel.PE)
+            P = pvalue(pmf, mymodel.found[motif])
+
+            self.assertTrue( abs(mydict['P'] - P) < 4*mydict['SE'], 
+                msg = motif )
+            self.assertTrue( abs(mydict['P'] - P) < 0.1*P, msg = motif )
+
+    def test_triplet_motifs(self):
+        """
+        Motifs of three cells cannot be tilted
+        """
+        for motif in ('ii_con', 'ii_div', 'ii_lin'):
+            self.assertRaises(ValueError, self.model.run_importance, motif)
+
+if __name__ == '__main__':
+    unittest.main()
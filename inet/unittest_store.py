@@ -0,0 +1,71 @@
+"""
+unittest_store.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:17:12 UTC 2026
+
+Unittest environment to test the on-disk store of simulations
+"""
+
+import unittest
+import shutil
+import tempfile
+import os
+
+import numpy as np
+from store import ResultStore
+
+class TestResultStore(unittest.TestCase):
+    """
+    A major unittest class to test stores of simulated motifs
+    """
+    motifs = ['ii_chem', 'ii_elec', 'ii_c2']
+
+    def setUp(self):
+        """
+        Creates a store with 100 random iterations
+        """
+        self.path = os.path.join(tempfile.mkdtemp(), 'mystore')
+        self.data = np.random.randint(0, 50, size=(100, 3))
+
+        mystore = ResultStore(self.path, mode='w', motifs=self.motifs,
+            metadata={'model': 'IIUniformModel', 'seed': 7})
+        mystore.append(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def test_read(self):
+        """
+        Iterations are read by rows, motifs and both
+        """
+        mystore = ResultStore(self.path)
+        self.assertEquals((100, 3), mystore.shape)
+        self.assertEquals(7, mystore.metadata['seed'])
+        self.assertTrue( (mystore[:] == self.data).all() )
+        self.assertTrue( (mystore['ii_elec'] == self.data[:,1]).all() )
+        self.assertTrue( (mystore[10:20, 'ii_c2'] == self.data[10:20,2]).all() )
+
+    def test_append(self):
+        """
+        Appended iterations follow the ones stored
+        """
+        mystore = ResultStore(self.path, mode='a')
+        mystore.append( dict(ii_chem=[1], ii_elec=[2], ii_c2=[3]) )
+
+        mystore = ResultStore(self.path)
+        self.assertEquals(101, len(mystore))
+        self.assertTrue( (mystore[100] == [1, 2, 3]).all() )
+        self.assertTrue( (mystore[:100] == self.data).all() )
+
+    def test_readonly(self):
+        """
+        Stores opened to read cannot be written
+        """
+        mystore = ResultStore(self.path)
+        self.assertRaises(IOError, mystore.append, self.data)
+
+if __name__ == '__main__':
+    unittest.main()
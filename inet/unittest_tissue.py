@@ -0,0 +1,69 @@
+"""
+unittest_tissue.py
+
+Jose Guzman, sjm.guzman@gmail.com
+Claudia Espinoza, claudia.espinoza@ist.ac.at
+
+Created: Sun Oct 18 22:36:51 UTC 2026
+
+Unittest environment to test the generation of pieces of tissue
+"""
+
+import unittest
+
+import numpy as np
+from tissue import Tissue, effective_range, place_cells
+from simulations import sigmoid
+
+class TestTissue(unittest.TestCase):
+    """
+    A major unittest class to test cells and connections in a slab
+    """
+    param = (50., 100., 20.)
+    rules = {('PV', 'PV', 'chem'): param, ('PV', 'PV', 'elec'): param,
+        ('GC', 'PV', 'chem'): param}
+    density = {'PV': 20000., 'GC': 40000.}
+
+    def test_effective_range(self):
+        """
+        The probability of connection is pmin at the effective range
+        """
+        x = effective_range(self.param, 1e-4)
+        self.assertAlmostEquals(1e-4, sigmoid(x, *self.param)/100.)
+
+    def test_place_cells(self):
+        """
+        Cells are placed in the slab with their densities
+        """
+        pos, celltypes, counts = place_cells((500, 500, 100),
+            self.density, np.random.RandomState(0))
+        self.assertEquals(('GC', 'PV'), celltypes)
+        self.assertEquals([1000, 500], counts)
+        self.assertTrue( (pos.max(0) <= [500, 500, 100]).all() )
+
+    def test_connections(self):
+        """
+        Gap junctions are symmetric, and there are no autapses or
+        connections without a rule
+        """
+        mytissue = Tissue((500, 500, 100), self.density, self.rules, seed = 0)
+        PV, GC = mytissue.index('PV'), mytissue.index('GC')
+
+        self.assertEquals(0, (mytissue.elec != mytissue.elec.T).nnz)
+        self.assertEquals(0, mytissue.chem.diagonal().sum())
+        self.assertEquals(0, mytissue.chem[PV][:, GC].nnz)
+        self.assertEquals(0, mytissue.elec[GC].nnz)
+        self.assertTrue( mytissue.chem[GC][:, PV].nnz > 0 )
+
+    def test_blocksize(self):
+        """
+        Connections do not depend on the size of the blocks
+        """
+        T1 = Tissue((500, 500, 100), self.density, self.rules, seed = 1)
+        T2 = Tissue((500, 500, 100), self.density, self.rules, seed = 1,
+            blocksize = 64)
+        self.assertEquals(0, (T1.chem != T2.chem).nnz)
+        self.assertEquals(0, (T1.elec != T2.elec).nnz)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,8 +11,8 @@ Unittest environment to test the utils of motifs
 import unittest
 
 import numpy as np
-from utils import chem_squarematrix 
-from utils import elec_squarematrix 
+from simulations import chem_squarematrix 
+from simulations import elec_squarematrix 
 
 class Testchem_squarematrix(unittest.TestCase):
     """
@@ -22,6 +22,8 @@ setup(
         # And include any *.syn files found in the 'data' subdirectory
         # of the 'PVNet' package, also:
         'PVNet': ['data/*.syn'],
+        # parameters of the sigmoid functions (see inet.simulations)
+        'inet': ['data/*.p'],
     },
     url = 'https://github.com/ClaudiaEsp/inet.git',
     license = 'LICENSE',